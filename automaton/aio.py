@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import asyncio
+import codecs
+
+from .semantics import create_matches
+
+# number of letters scanned before giving the hand back to the event loop
+SLICE_SIZE = 1 << 14
+
+
+async def scan_(automaton, state, chunk, offset, matches, slice_size, executor, offload_size):
+    if executor is not None and len(chunk) >= offload_size:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(executor, automaton.det_search_, state, chunk, offset, matches)
+    for start in range(0, len(chunk), slice_size):
+        state = automaton.det_search_(state, chunk[start:start + slice_size], offset + start, matches)
+        if state is None:
+            break
+        await asyncio.sleep(0)
+    return state
+
+
+async def search_stream(automaton, reader, chunk_size, encoding, semantics, slice_size=SLICE_SIZE,
+                        executor=None, offload_size=None):
+    """
+    search the data of an asyncio StreamReader, the state of the automaton is kept between reads
+    the next chunk is read only when the matches of the previous one are consumed,
+    so a slow consumer slows down the reads and the transport applies its flow control
+    :param automaton:
+    :param reader: asyncio.StreamReader or any object with a coroutine read(n) returning bytes
+    :param chunk_size: max number of bytes of a read
+    :param encoding: encoding of the data, None to search the bytes
+    :param semantics: see Automaton.search
+    :param slice_size: max number of letters scanned between two yields to the event loop
+    :param executor: if not None, a thread pool executor scanning the chunks of at least offload_size letters
+    off the event loop, the scan shares its state with the coroutine so it can not run in another process
+    :param offload_size: defaults to slice_size
+    :return: async generator of (output, start, end) with offsets in the whole stream
+    """
+    if offload_size is None:
+        offload_size = slice_size
+    decoder = None if encoding is None else codecs.getincrementaldecoder(encoding)()
+    state = automaton.get_initial_state()
+    offset = 0
+    matches = create_matches(automaton, semantics)
+    while state is not None:
+        data = await reader.read(chunk_size)
+        final = len(data) == 0
+        chunk = data if decoder is None else decoder.decode(data, final)
+        if len(chunk) != 0:
+            state = await scan_(automaton, state, chunk, offset, matches, slice_size, executor, offload_size)
+            offset += len(chunk)
+            matches.reach(offset, state)
+            for output in matches.pop_matches():
+                yield output
+        if final:
+            break
+    for output in matches.finish():
+        yield output
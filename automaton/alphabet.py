@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+from collections import defaultdict
+
+# class of the letters outside the alphabet
+OTHER_CLASS = 0
+
+
+def get_effective_target(automaton, source, letter):
+    # target used by det_search : the letters without transition follow the target of the letters outside the alphabet
+    return automaton.get_next_state_(source, letter)
+
+
+def get_word_classes(wordLetters, letters=None):
+    """
+    letter classes of the DMA of words, computed before its construction :
+    two letters of the words never lead to the same child in the trie, so each one is a class,
+    the other letters of letters lead to the same states as the letters outside the alphabet, they are in OTHER_CLASS
+    :param wordLetters: letters of the words
+    :param letters: alphabet of the DMA, None for the letters of the words
+    :return: dict letter -> class id, number of classes
+    """
+    letterIds = dict((letter, classId) for classId, letter in enumerate(sorted(wordLetters), 1))
+    if letters is not None:
+        for letter in letters:
+            letterIds.setdefault(letter, OTHER_CLASS)
+    return letterIds, len(wordLetters) + 1
+
+
+def get_letter_classes(automaton):
+    """
+    partition the letters of an automaton in equivalence classes :
+    letters of a class have the same target in every state
+    the letters with the same transitions are in the same class, since the letters without transition
+    follow the same fallback ( other target, default successor or failure links )
+    the letters whose transitions all lead to the target of the letters outside the alphabet
+    are in the class OTHER_CLASS
+    the partition is computed from the transitions, without looking up every letter in every state
+    :param automaton:
+    :return: dict letter -> class id, number of classes
+    """
+    transitions = defaultdict(list)
+    for source, letter, target in automaton.iter_transitions():
+        transitions[letter].append((source, target))
+    classes = {}
+    letterClasses = {}
+    for letter in automaton.get_letters():
+        signature = transitions[letter]
+        if all(target == automaton.get_other_target(source) for source, target in signature):
+            letterClasses[letter] = OTHER_CLASS
+        else:
+            letterClasses[letter] = classes.setdefault(tuple(signature), len(classes) + 1)
+    return letterClasses, len(classes) + 1
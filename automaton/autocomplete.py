@@ -0,0 +1,38 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import heapq
+
+
+def complete(automaton, prefix, k):
+    """
+    best first search of the top k weighted words starting with prefix in a trie built by build_trie with weights
+    a state is expanded only when the max weight of its words is among the best ones,
+    so about k states and their successors are visited after the walk of the prefix
+    :param automaton: weighted trie
+    :param prefix:
+    :param k:
+    :return: list of (output, weight) by decreasing weight, the smaller words first on ties
+    """
+    state = automaton.get_initial_state()
+    for letter in prefix:
+        state = automaton.get_target(state, letter)
+        if state is None:
+            return []
+    completions = []
+    weight = automaton.get_max_weight(state)
+    if weight is None or k <= 0:
+        return completions
+    # (-weight, path, 0 for the words of the state of path or 1 for the state itself, state)
+    heap = [(-weight, (), 1, state)]
+    while len(heap) != 0 and len(completions) < k:
+        weight, path, isState, state = heapq.heappop(heap)
+        if not isState:
+            for output in automaton.get_sorted_outputs(state):
+                completions.append((output, -weight))
+            continue
+        if automaton.get_weight(state) is not None:
+            heapq.heappush(heap, (-automaton.get_weight(state), path, 0, state))
+        for letter, target in automaton.get_transitions(state).items():
+            heapq.heappush(heap, (-automaton.get_max_weight(target), path + (letter,), 1, target))
+    return completions[:k]
@@ -1,8 +1,22 @@
 # -*- coding: utf-8 -*-
 # @author <lambda.coder@gmail.com>
 
+from collections import Counter
+from collections import OrderedDict
 from collections import defaultdict
-
+from collections import deque
+from itertools import chain
+
+from .alphabet import OTHER_CLASS
+from .alphabet import get_letter_classes
+from .autocomplete import complete
+from .fuzzy import lookup_fuzzy
+from .fuzzy import search_fuzzy
+from .patterns import OutputIds
+from .semantics import ALL
+from .semantics import create_matches
+from .transition_matrix import CompactTransitionMatrix
+from .transition_matrix import LetterClassTransitionMatrix
 from .transition_matrix import MutableTransitionMatrix
 from .transition_matrix import MutableTransitionMatrixWithDefaultSuccessor
 
@@ -17,6 +31,25 @@ class Automaton:
         self.transitionMatrix_ = matrix
         self.finals_ = finals
         self.output_ = outputs
+        # target of the letters outside the alphabet, None to stop the scan
+        self.otherSuccessor_ = None
+        # output -> order of first addition, used by the leftmost-first semantics
+        self.ranks_ = {}
+        self.maxOutputLength_ = None
+        # state -> tuple of the sorted outputs, computed on the first hit of the state
+        self.sortedOutputs_ = {}
+        # PatternTable when the outputs are pattern ids
+        self.patterns_ = None
+        self.sortedFinals_ = None
+        # state -> weight of its words and max weight of the words going through it, see build_trie
+        self.weights_ = {}
+        self.maxWeights_ = {}
+        # see get_prefilter_, None until computed
+        self.prefilter_ = None
+        # see get_state_depth, None until computed
+        self.depths_ = None
+        # see set_profiler
+        self.profiler_ = None
 
     def get_num_states(self):
         return self.transitionMatrix_.get_num_states()
@@ -28,7 +61,12 @@ class Automaton:
         return self.initialState_
 
     def get_final_states(self):
-        return sorted(self.finals_)
+        if self.sortedFinals_ is None:
+            self.sortedFinals_ = sorted(self.finals_)
+        return list(self.sortedFinals_)
+
+    def get_num_final_states(self):
+        return len(self.finals_)
 
     def is_final_state(self, state):
         if not self.transitionMatrix_.has_state(state):
@@ -44,34 +82,297 @@ class Automaton:
     # set get_target method
     get_target_function = get_target
 
+    def get_other_target(self, source):
+        # target of source for the letters outside the alphabet
+        return self.otherSuccessor_
+
+    def get_transitions(self, source):
+        return self.transitionMatrix_.get_transitions(source)
+
+    def get_letter_classes(self):
+        """
+        :return: dict letter -> class id, number of classes, see alphabet.get_letter_classes
+        """
+        return get_letter_classes(self)
+
+    def iter_transitions(self):
+        """
+        :return: generator of the (source, letter, target) transitions, without copying the transition matrix
+        """
+        return self.transitionMatrix_.iter_transitions()
+
     def get_outputs(self, state):
         if not self.transitionMatrix_.has_state(state):
             raise AutomatonException('Unknown state : %s' % str(state))
         return self.output_.get(state, set())
 
+    def get_sorted_outputs(self, state):
+        outputs = self.sortedOutputs_.get(state, None)
+        if outputs is None:
+            outputs = self.sortedOutputs_[state] = tuple(sorted(self.get_outputs(state)))
+        return outputs
+
+    def get_patterns(self):
+        return self.patterns_
+
+    def get_output_length_function(self):
+        # length of the match of an output : the output itself or the pattern of the id
+        return len if self.patterns_ is None else self.patterns_.get_length
+
+    def get_weight(self, state):
+        return self.weights_.get(state, None)
+
+    def get_max_weight(self, state):
+        return self.maxWeights_.get(state, None)
+
+    def get_output_rank(self, output):
+        # the ids of a PatternTable are in the order of addition
+        if self.patterns_ is not None:
+            return output
+        return self.ranks_.get(output, len(self.ranks_))
+
+    def get_max_output_length(self):
+        if self.patterns_ is not None:
+            return self.patterns_.get_max_length()
+        if self.maxOutputLength_ is None:
+            length = self.get_output_length_function()
+            self.maxOutputLength_ = max((length(output) for outputs in self.output_.values() for output in outputs),
+                                        default=0)
+        return self.maxOutputLength_
+
+    def get_state_depth(self, state):
+        """
+        :return: distance of state from the initial state, None if it is not reachable
+        a letter lengthens by at most one the beginnings of words ending in the states of a search automaton,
+        so no beginning of word longer than the depth ends in state, see semantics.LeftmostMatches
+        """
+        if self.depths_ is None:
+            depths = {self.initialState_: 0}
+            queue = deque([self.initialState_])
+            while len(queue) != 0:
+                source = queue.popleft()
+                for target in self.get_transitions(source).values():
+                    if target not in depths:
+                        depths[target] = depths[source] + 1
+                        queue.append(target)
+            self.depths_ = depths
+        return self.depths_.get(state, None)
+
     def get_stats(self):
-        return {'numStates': self.get_num_states(), 'numFinalStates': len(self.get_final_states()),
-                'numTransitions': self.transitionMatrix_.get_num_transitions() }
+        return {'numStates': self.get_num_states(), 'numFinalStates': self.get_num_final_states(),
+                'numTransitions': self.transitionMatrix_.get_num_transitions()}
 
     def accept(self, word):
         state = self.get_initial_state()
         for letter in word:
-            state = self.get_target_function(state, letter)
+            state = self.get_next_state_(state, letter)
             if state is None:
                 return False
         return self.is_final_state(state)
 
     def det_search(self, word):
         outputs = []
+        self.det_search_(self.get_initial_state(), word, 0, outputs)
+        return outputs
+
+    def search(self, word, semantics=ALL):
+        """
+        :param word:
+        :param semantics: ALL, NON_OVERLAPPING, LEFTMOST_LONGEST or LEFTMOST_FIRST, see semantics.py
+        :return: list of (output, start, end), overlaps are resolved during the scan
+        """
+        if semantics == ALL:
+            return self.det_search(word)
+        matches = create_matches(self, semantics)
+        self.det_search_(self.get_initial_state(), word, 0, matches)
+        return matches.finish()
+
+    def get_prefilter_(self, word):
+        # compiled expression skipping the letters looping on the initial state, None if it does not apply to word
+        if self.prefilter_ is None:
+            # re is only imported by the first search
+            from .prefilter import build_prefilter
+            self.prefilter_ = build_prefilter(self)
+        wordType, prefilter = self.prefilter_
+        return prefilter if isinstance(word, wordType) else None
+
+    def get_next_state_(self, state, letter):
+        # target followed by the scans : the letters without transition follow the target of the letters outside
+        # the alphabet, None to stop the scan
+        target = self.get_target_function(state, letter)
+        return self.get_other_target(state) if target is None else target
+
+    def set_profiler(self, profiler):
+        """
+        :param profiler: profiling.SearchProfiler recording the scans of every search, None to remove it
+        """
+        self.profiler_ = profiler
+        return self
+
+    def get_profiler(self):
+        return self.profiler_
+
+    def scan_(self, state, word, offset, visit):
+        # scan loop shared by the searches : scan word from state, word starting at position offset of the text,
+        # call visit(state, end) on each final state reached, the scan stops when visit returns True
+        # return the reached state ( None if the scan is stopped )
+        if self.profiler_ is not None:
+            return self.profiler_.scan_(state, word, offset, visit)
+        return self.scan_word_(state, word, offset, visit)
+
+    def scan_word_(self, state, word, offset, visit):
+        # scan_ without profiler, the letters looping on the initial state are skipped with the prefilter
+        finals = self.finals_
+        next_state = self.get_next_state_
+        prefilter = self.get_prefilter_(word)
+        if prefilter is None:
+            for i, letter in enumerate(word, offset + 1):
+                state = next_state(state, letter)
+                if state is None or (state in finals and visit(state, i)):
+                    return None
+            return state
+        initial = self.initialState_
+        i = 0
+        end = len(word)
+        while i < end:
+            if state == initial:
+                match = prefilter.search(word, i)
+                if match is None:
+                    return state
+                i = match.start()
+            state = next_state(state, word[i])
+            i += 1
+            if state is None or (state in finals and visit(state, offset + i)):
+                return None
+        return state
+
+    def det_search_(self, state, word, offset, outputs):
+        # scan word from state, word starting at position offset of the text
+        # append the matches to outputs ( a list or a sink of semantics.py )
+        # and return the reached state ( None if the scan is stopped )
+        length = self.get_output_length_function()
+        get_sorted_outputs = self.get_sorted_outputs
+        append = outputs.append
+
+        def visit(state, end):
+            for x in get_sorted_outputs(state):
+                append((x, end - length(x), end))
+
+        return self.scan_(state, word, offset, visit)
+
+    def contains_any(self, word):
+        """
+        :return: True if word contains a match, the scan stops at the first final state
+        """
+        hits = []
+
+        def visit(state, end):
+            hits.append(end)
+            return True
+
+        self.scan_(self.get_initial_state(), word, 0, visit)
+        return len(hits) != 0
+
+    def count_matches(self, word):
+        """
+        :return: Counter output -> number of matches in word, the final states are counted during the scan
+        """
+        return count_outputs_(self, self.count_final_states_(word))
+
+    def count_final_states_(self, word):
+        visits = defaultdict(int)
+
+        def visit(state, end):
+            visits[state] += 1
+
+        self.scan_(self.get_initial_state(), word, 0, visit)
+        return visits
+
+    def iter_search(self, source, chunk_size=None, encoding=None, semantics=ALL):
+        """
+        search a text given by chunks, the state of the automaton is kept between chunks
+        :param source: a string, an iterable of chunks or a file object
+        :param chunk_size: size of the chunks read from a file object, None for stream.CHUNK_SIZE
+        :param encoding: encoding of the bytes chunks, None for utf-8 if the letters of the automaton are str,
+        the bytes chunks are searched as they are if its letters are bytes
+        :param semantics: see search
+        :return: generator of (output, start, end) with offsets in the whole text
+        """
+        from .stream import CHUNK_SIZE
+        from .stream import decode_chunks
+        from .stream import iter_chunks
+        if chunk_size is None:
+            chunk_size = CHUNK_SIZE
         state = self.get_initial_state()
-        for i, letter in enumerate(word):
-            state = self.get_target_function(state, letter)
+        offset = 0
+        matches = create_matches(self, semantics)
+        for chunk in decode_chunks(iter_chunks(source, chunk_size), self.get_chunk_encoding_(encoding)):
+            state = self.det_search_(state, chunk, offset, matches)
+            offset += len(chunk)
+            matches.reach(offset, state)
+            for output in matches.pop_matches():
+                yield output
             if state is None:
                 break
-            if self.is_final_state(state):
-                for x in sorted(self.get_outputs(state)):
-                    outputs.append((x, i - len(x) + 1, i + 1))
-        return outputs
+        for output in matches.finish():
+            yield output
+
+    def search_stream(self, reader, chunk_size=None, encoding=None, semantics=ALL, slice_size=None,
+                      executor=None, offload_size=None):
+        """
+        search the data of an asyncio StreamReader, see aio.search_stream
+        asyncio is only imported by the first call
+        usage : async for output, start, end in automaton.search_stream(reader): ...
+        :param chunk_size: None for stream.CHUNK_SIZE
+        :param encoding: see iter_search
+        :param slice_size: None for aio.SLICE_SIZE
+        """
+        from .aio import SLICE_SIZE
+        from .aio import search_stream
+        from .stream import CHUNK_SIZE
+        return search_stream(self, reader, CHUNK_SIZE if chunk_size is None else chunk_size,
+                             self.get_chunk_encoding_(encoding), semantics,
+                             SLICE_SIZE if slice_size is None else slice_size, executor, offload_size)
+
+    def get_chunk_encoding_(self, encoding):
+        # the letters of an automaton searching bytes are ints, its bytes chunks are not decoded
+        if encoding is not None:
+            return encoding
+        letters = self.get_letters()
+        return None if len(letters) != 0 and isinstance(letters[0], int) else 'utf-8'
+
+    def lookup_fuzzy(self, query, max_distance):
+        """
+        outputs of the words within max_distance of query, the automaton must be acyclic, see fuzzy.lookup_fuzzy
+        """
+        return lookup_fuzzy(self, query, max_distance)
+
+    def search_fuzzy(self, text, max_distance):
+        """
+        approximate occurrences of the words in text, the automaton must be acyclic, see fuzzy.search_fuzzy
+        """
+        return search_fuzzy(self, text, max_distance)
+
+    def complete(self, prefix, k):
+        """
+        top k weighted words starting with prefix, see autocomplete.complete
+        """
+        return complete(self, prefix, k)
+
+    def search_many(self, documents, workers=None, batch_size=None, ordered=True, start_method=None):
+        """
+        search many documents with a pool of processes, see parallel.search_many
+        multiprocessing is only imported by the first call
+        :param batch_size: None for parallel.BATCH_SIZE
+        """
+        from .parallel import BATCH_SIZE
+        from .parallel import search_many
+        return search_many(self, documents, workers, BATCH_SIZE if batch_size is None else batch_size, ordered,
+                           start_method)
+
+    def get_binary_file_name(self):
+        # file mapped by the automaton, see frozen.load_binary
+        return None
 
     def to_dict(self):
         d = {'transitions': self.transitionMatrix_.to_dict(), 'initial': self.initialState_,
@@ -84,24 +385,34 @@ class Automaton:
         d['outputs'] = outputs
         return d
 
-    def to_dot(self):
-        dot = ["""digraph automaton {
+    def iter_dot_(self):
+        yield """digraph automaton {
 rankdir = LR;
 label = "";
 center = 1;
 ranksep = "0.4";
-nodesep = "0.25";"""]
-        states = self.get_states()
-        for state in states:
-            dot.append('%d [label = "%d", shape = %s, style = bold, fontsize = 14]' % (
-                state, state, 'doublecircle' if self.is_final_state(state) else 'circle'))
+nodesep = "0.25";"""
+        for state in self.get_states():
+            yield '%d [label = "%d", shape = %s, style = bold, fontsize = 14]' % (
+                state, state, 'doublecircle' if self.is_final_state(state) else 'circle')
             successors = self.transitionMatrix_.get_transitions(state)
-            letters = successors.keys()
-            for letter in sorted(letters):
-                target = successors[letter]
-                dot.append('\t%d -> %d [label = "%s", fontsize = 14];' % (state, target, letter))
-        dot.append('}')
-        return '\n'.join(dot)
+            for letter in sorted(successors):
+                yield '\t%d -> %d [label = "%s", fontsize = 14];' % (state, successors[letter], letter)
+        yield '}'
+
+    def to_dot(self):
+        return '\n'.join(self.iter_dot_())
+
+    def write_dot(self, dotFile):
+        """
+        write the dot of the automaton line by line
+        :param dotFile: text file object
+        """
+        for i, line in enumerate(self.iter_dot_()):
+            if i != 0:
+                dotFile.write('\n')
+            dotFile.write(line)
+        return self
 
     def dump_(self, outputFileName, output):
         outputFile = open(outputFileName, 'wb')
@@ -112,6 +423,38 @@ nodesep = "0.25";"""]
     def dump_dot(self, dotFileName):
         return self.dump_(dotFileName, self.to_dot())
 
+    def write_json_lines(self, jsonFile):
+        """
+        write the automaton state by state : a first line with the initial state and the stats,
+        then one line per state with its finality, sorted outputs and transitions
+        bytes outputs are written as lists of ints
+        :param jsonFile: text file object
+        """
+        import json
+        header = {'initial': self.get_initial_state()}
+        header.update(self.get_stats())
+        jsonFile.write(json.dumps(header, sort_keys=True) + '\n')
+        for state in self.get_states():
+            line = {'state': state, 'final': self.is_final_state(state),
+                    'outputs': list(self.get_sorted_outputs(state)),
+                    'transitions': [[letter, target] for letter, target in self.get_transitions(state).items()]}
+            jsonFile.write(json.dumps(line, sort_keys=True, default=list) + '\n')
+        return self
+
+    def dump_json_lines(self, jsonFileName):
+        with open(jsonFileName, 'w', encoding='utf-8') as jsonFile:
+            self.write_json_lines(jsonFile)
+        return self
+
+
+def count_outputs_(automaton, visits):
+    # number of matches of each output from the number of visits of the final states
+    counts = Counter()
+    for state, count in visits.items():
+        for output in automaton.get_sorted_outputs(state):
+            counts[output] += count
+    return counts
+
 
 class MutableAutomatonException(AutomatonException):
     pass
@@ -124,13 +467,60 @@ class AbstractMutableAutomaton(Automaton):
     def set_final_state(self, state):
         if not self.transitionMatrix_.has_state(state):
             raise MutableAutomatonException('Unknown state : %s' % str(state))
-        self.finals_.add(state)
+        if state not in self.finals_:
+            self.finals_.add(state)
+            self.sortedFinals_ = None
+            self.prefilter_ = None
+        return self
+
+    def set_weight(self, state, weight):
+        # the weight of a state with several words is the max of their weights
+        if not self.transitionMatrix_.has_state(state):
+            raise MutableAutomatonException('Unknown state : %s' % str(state))
+        current = self.weights_.get(state, None)
+        if current is None or weight > current:
+            self.weights_[state] = weight
+        return self
+
+    def set_max_weight(self, state, weight):
+        if not self.transitionMatrix_.has_state(state):
+            raise MutableAutomatonException('Unknown state : %s' % str(state))
+        current = self.maxWeights_.get(state, None)
+        if current is None or weight > current:
+            self.maxWeights_[state] = weight
+        return self
+
+    def set_patterns(self, patterns):
+        # the pattern ids are stored in arrays, see OutputIds
+        if patterns is not None and not isinstance(self.output_, OutputIds):
+            outputs = OutputIds()
+            for state, ids in sorted(self.output_.items()):
+                for patternId in ids:
+                    outputs.add(state, patternId)
+            self.output_ = outputs
+        self.patterns_ = patterns
+        self.maxOutputLength_ = None
+        return self
+
+    def set_other_successor(self, state):
+        if state is not None and not self.transitionMatrix_.has_state(state):
+            raise MutableAutomatonException('Unknown state : %s' % str(state))
+        self.otherSuccessor_ = state
+        self.prefilter_ = None
         return self
 
     def add_output(self, state, output):
         if not self.transitionMatrix_.has_state(state):
             raise MutableAutomatonException('Unknown state : %s' % str(state))
-        self.output_[state].add(output)
+        if self.patterns_ is None:
+            self.output_[state].add(output)
+        else:
+            self.output_.add(state, output)
+        if len(self.sortedOutputs_) != 0:
+            self.sortedOutputs_.clear()
+        if self.patterns_ is None and output not in self.ranks_:
+            self.ranks_[output] = len(self.ranks_)
+            self.maxOutputLength_ = None
         return self
 
     def add_outputs(self, state, outputs):
@@ -138,11 +528,44 @@ class AbstractMutableAutomaton(Automaton):
             self.add_output(state, output)
         return self
 
+    def add_final_outputs_(self, states, outputs):
+        """
+        set the final states of outputs, in the order of outputs so their ranks are kept, without checking the states
+        :param states: final state of each output, None for no state
+        :param outputs:
+        :return: self
+        """
+        for state, output in zip(states, outputs):
+            if state is None:
+                continue
+            self.finals_.add(state)
+            if self.patterns_ is None:
+                self.output_[state].add(output)
+                if output not in self.ranks_:
+                    self.ranks_[output] = len(self.ranks_)
+            else:
+                self.output_.add(state, output)
+        self.sortedFinals_ = None
+        self.prefilter_ = None
+        self.sortedOutputs_.clear()
+        self.maxOutputLength_ = None
+        return self
+
     def add_state(self):
         return self.transitionMatrix_.add_state()
 
+    def add_states_(self, successors, letterCounts):
+        """
+        add states after the last one with their transitions, without checking them
+        :param successors: list of the dicts letter -> target of the new states
+        :param letterCounts: number of transitions of successors per letter
+        :return: first new state
+        """
+        self.depths_ = None
+        return self.transitionMatrix_.add_states_(successors, letterCounts)
+
     def add_transition(self, source, letter, target):
-        if len(letter) == 0:
+        if not isinstance(letter, int) and len(letter) == 0:
             raise MutableAutomatonException(
                 'Epsilon transition not allowed : source state : %s , target state : %s ' % (source, target))
         if not self.transitionMatrix_.has_state(source):
@@ -150,6 +573,9 @@ class AbstractMutableAutomaton(Automaton):
         if not self.transitionMatrix_.has_state(target):
             raise MutableAutomatonException('Unknown target state : %s' % str(target))
         self.transitionMatrix_.add_transition(source, letter, target)
+        self.depths_ = None
+        if source == self.initialState_:
+            self.prefilter_ = None
         return self
 
 
@@ -158,6 +584,47 @@ class MutableAutomaton(AbstractMutableAutomaton):
         AbstractMutableAutomaton.__init__(self, 0, MutableTransitionMatrix(0))
 
 
+class CompactMutableAutomaton(AbstractMutableAutomaton):  # see CompactTransitionMatrix
+    def __init__(self):
+        AbstractMutableAutomaton.__init__(self, 0, CompactTransitionMatrix(0))
+
+
+class MutableAutomatonWithLetterClasses(AbstractMutableAutomaton):  # see build_dma_complete
+    def __init__(self, letterIds, width):
+        AbstractMutableAutomaton.__init__(self, 0, LetterClassTransitionMatrix(0, letterIds, width))
+
+    def get_next_state_(self, state, letter):
+        matrix = self.transitionMatrix_
+        classId = matrix.letterIds_.get(letter, None)
+        target = -1 if classId is None else matrix.rows_[state - matrix.initial_][classId]
+        return self.otherSuccessor_ if target < 0 else target
+
+    def get_letter_classes(self):
+        # the classes of the matrix, when its letters of OTHER_CLASS lead to the target
+        # of the letters outside the alphabet
+        matrix = self.transitionMatrix_
+        other = -1 if self.otherSuccessor_ is None else self.otherSuccessor_
+        if all(row[OTHER_CLASS] in (other, -1) for row in matrix.rows_):
+            return matrix.get_letter_classes()
+        return get_letter_classes(self)
+
+
+class MinimizedAutomaton(MutableAutomaton):  # see minimize.py
+    def __init__(self):
+        MutableAutomaton.__init__(self)
+        self.originalStats_ = None
+
+    def set_original_stats(self, numStates, numTransitions):
+        self.originalStats_ = (numStates, numTransitions)
+        return self
+
+    def get_stats(self):
+        stats = MutableAutomaton.get_stats(self)
+        if self.originalStats_ is not None:
+            stats['numOriginalStates'], stats['numOriginalTransitions'] = self.originalStats_
+        return stats
+
+
 class MutableAutomatonWithDefaultSuccessor(AbstractMutableAutomaton):  # D for default successor
     def __init__(self):
         AbstractMutableAutomaton.__init__(self, 0, MutableTransitionMatrixWithDefaultSuccessor(0))
@@ -167,3 +634,124 @@ class MutableAutomatonWithDefaultSuccessor(AbstractMutableAutomaton):  # D for d
 
     # set get_target method
     get_target_function = get_target_by_default
+
+    def get_other_target(self, source):
+        return self.transitionMatrix_.defaultSuccessor_
+
+
+class MutableAutomatonWithFailureLinks(AbstractMutableAutomaton):  # failure and output links, see build_dma_failure
+    def __init__(self):
+        AbstractMutableAutomaton.__init__(self, 0, MutableTransitionMatrix(0))
+        self.failures_ = {}
+        self.outputLinks_ = {}
+
+    def set_failure(self, state, target):
+        if not self.transitionMatrix_.has_state(state):
+            raise MutableAutomatonException('Unknown state : %s' % str(state))
+        self.failures_[state] = target
+        return self
+
+    def get_failure(self, state):
+        return self.failures_.get(state, None)
+
+    def set_output_link(self, state, target):
+        if not self.transitionMatrix_.has_state(state):
+            raise MutableAutomatonException('Unknown state : %s' % str(state))
+        self.outputLinks_[state] = target
+        return self
+
+    def get_output_link(self, state):
+        return self.outputLinks_.get(state, None)
+
+    def has_own_outputs(self, state):
+        return len(self.output_.get(state, ())) != 0
+
+    def get_outputs(self, state):
+        outputs = set(Automaton.get_outputs(self, state))
+        state = self.outputLinks_.get(state, None)
+        while state is not None:
+            outputs.update(self.output_[state])
+            state = self.outputLinks_.get(state, None)
+        return outputs
+
+    def get_sorted_outputs(self, state):
+        # only the own outputs of the states are cached : the outputs reached through the output links are merged
+        # at each hit, so the cache stays as large as the stored outputs
+        outputs = self.get_own_sorted_outputs_(state)
+        state = self.outputLinks_.get(state, None)
+        if state is None:
+            return outputs
+        runs = [outputs]
+        while state is not None:
+            runs.append(self.get_own_sorted_outputs_(state))
+            state = self.outputLinks_.get(state, None)
+        # sorted merges the sorted runs
+        return sorted(chain.from_iterable(runs))
+
+    def get_own_sorted_outputs_(self, state):
+        outputs = self.sortedOutputs_.get(state, None)
+        if outputs is None:
+            outputs = self.sortedOutputs_[state] = tuple(sorted(Automaton.get_outputs(self, state)))
+        return outputs
+
+    def get_target_by_failure(self, source, letter):
+        target = self.transitionMatrix_.get_target(source, letter)
+        while target is None:
+            if source == self.initialState_:
+                return source
+            source = self.failures_[source]
+            target = self.transitionMatrix_.get_target(source, letter)
+        return target
+
+    # set get_target method
+    get_target_function = get_target_by_failure
+
+    def get_other_target(self, source):
+        return self.initialState_
+
+    def get_next_state_(self, state, letter):
+        # the failure links give a target to every letter
+        return self.get_target_function(state, letter)
+
+
+class CompactMutableAutomatonWithFailureLinks(MutableAutomatonWithFailureLinks):  # see CompactTransitionMatrix
+    def __init__(self):
+        MutableAutomatonWithFailureLinks.__init__(self)
+        self.transitionMatrix_ = CompactTransitionMatrix(0)
+
+
+class LazyAutomaton(MutableAutomatonWithFailureLinks):  # see build_dma_lazy
+    def __init__(self, max_cache_size):
+        MutableAutomatonWithFailureLinks.__init__(self)
+        self.maxCacheSize_ = max_cache_size
+        # (source, letter) -> target computed through the failure links, least recently used first
+        self.cache_ = OrderedDict()
+
+    def get_target_lazily(self, source, letter):
+        target = self.transitionMatrix_.get_target(source, letter)
+        if target is not None:
+            return target
+        key = (source, letter)
+        target = self.cache_.get(key, None)
+        if target is not None:
+            self.cache_.move_to_end(key)
+            return target
+        target = self.cache_[key] = self.get_target_by_failure(source, letter)
+        if len(self.cache_) > self.maxCacheSize_:
+            self.cache_.popitem(False)
+        return target
+
+    # set get_target method
+    get_target_function = get_target_lazily
+
+    def get_cache_size(self):
+        return len(self.cache_)
+
+    def clear_cache(self):
+        self.cache_.clear()
+        return self
+
+    def get_stats(self):
+        stats = MutableAutomatonWithFailureLinks.get_stats(self)
+        stats['numCachedTransitions'] = self.get_cache_size()
+        return stats
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+from .automaton import Automaton
+from .encoding import encode_words
+
+
+class ShiftAndMatcher:
+    """
+    bit-parallel multi pattern matcher ( Shift-And ) with the search interface of the automata
+    the patterns are laid end to end in the bits of a single integer, its state : the bit of a letter of a pattern
+    is set when the letters of the pattern up to it end at the current position,
+    so one shift, one or and one and scan all the patterns with a letter
+    it is fast when the total length of the patterns fits a machine word, see planner.py
+
+    see https://en.wikipedia.org/wiki/Bitap_algorithm
+    """
+
+    def __init__(self, words, encoding=None):
+        if encoding is not None:
+            words = encode_words(words, encoding)
+        # letter -> bits of the positions of the letter in the patterns
+        self.masks_ = {}
+        # bits of the positions matching the letters without mask
+        self.otherMask_ = 0
+        self.initials_ = 0
+        self.finals_ = 0
+        # bit -> length of the beginning of its pattern up to it
+        self.depths_ = []
+        # final bit -> output
+        self.outputs_ = {}
+        self.ranks_ = {}
+        # final bits -> tuple of the sorted outputs, computed on the first hit
+        self.sortedOutputs_ = {}
+        self.numBits_ = 0
+        for word in words:
+            if len(word) == 0 or word in self.ranks_:
+                continue
+            self.ranks_[word] = len(self.ranks_)
+            self.add_pattern_(word, word)
+
+    def add_pattern_(self, letters, output):
+        # lay the letters of a pattern after the last bit, None for a position matching the letters without mask
+        self.initials_ |= 1 << self.numBits_
+        for depth, letter in enumerate(letters, 1):
+            if letter is None:
+                self.otherMask_ |= 1 << self.numBits_
+            else:
+                self.masks_[letter] = self.masks_.get(letter, 0) | (1 << self.numBits_)
+            self.depths_.append(depth)
+            self.numBits_ += 1
+        self.finals_ |= 1 << (self.numBits_ - 1)
+        self.outputs_[self.numBits_ - 1] = output
+
+    def get_initial_state(self):
+        return 0
+
+    def get_num_bits(self):
+        return self.numBits_
+
+    def get_letters(self):
+        return sorted(self.masks_)
+
+    def get_output_length_function(self):
+        return len
+
+    def get_output_rank(self, output):
+        return self.ranks_.get(output, len(self.ranks_))
+
+    def get_max_output_length(self):
+        return max((len(output) for output in self.ranks_), default=0)
+
+    def get_state_depth(self, state):
+        # see Automaton.get_state_depth, the longest beginning of pattern of the bits
+        depth = 0
+        while state != 0:
+            bit = state & -state
+            depth = max(depth, self.depths_[bit.bit_length() - 1])
+            state ^= bit
+        return depth
+
+    def get_sorted_outputs(self, hits):
+        # hits : final bits of the state
+        outputs = self.sortedOutputs_.get(hits, None)
+        if outputs is None:
+            outputs = []
+            bits = hits
+            while bits != 0:
+                bit = bits & -bits
+                outputs.append(self.outputs_[bit.bit_length() - 1])
+                bits ^= bit
+            outputs = self.sortedOutputs_[hits] = tuple(sorted(outputs))
+        return outputs
+
+    def scan_(self, state, word, offset, visit):
+        # same contract as Automaton.scan_, the state is the integer of the bits
+        # and visit is called with the final bits of the state
+        masks = self.masks_
+        other = self.otherMask_
+        initials = self.initials_
+        finals = self.finals_
+        for i, letter in enumerate(word, offset + 1):
+            state = ((state << 1) | initials) & masks.get(letter, other)
+            if state & finals and visit(state & finals, i):
+                return None
+        return state
+
+    # the searches of the automata, built on scan_
+    det_search_ = Automaton.det_search_
+    det_search = Automaton.det_search
+    search = Automaton.search
+    contains_any = Automaton.contains_any
+    count_matches = Automaton.count_matches
+    count_final_states_ = Automaton.count_final_states_
+    iter_search = Automaton.iter_search
+    get_chunk_encoding_ = Automaton.get_chunk_encoding_
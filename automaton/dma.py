@@ -2,79 +2,182 @@
 # @author <lambda.coder@gmail.com>
 
 
+from array import array
+from collections import deque
+
+from .alphabet import OTHER_CLASS
+from .alphabet import get_word_classes
+from .automaton import AutomatonException
+from .automaton import LazyAutomaton
 from .automaton import MutableAutomatonWithDefaultSuccessor
+from .automaton import MutableAutomatonWithFailureLinks
+from .automaton import MutableAutomatonWithLetterClasses
+from .encoding import encode_words
 from .trie import build_trie
 
+MAX_CACHE_SIZE = 1 << 16
+
 
 def get_letters(words):
     return set(letter for word in words for letter in word)
 
 
-def build_dma_complete(words, letters=None):
+def build_dma_complete(words, letters=None, encoding=None, workers=None, wildcard=None):
     """
     build a complete Dictionary Matching Automaton ( aka DMA )
-    the transition matrix of the automaton is complete
+    the transition matrix of the automaton is complete on letters, the other letters lead to the initial state
+    the transitions are stored per letter class ( see alphabet.get_word_classes ) : the row of a state
+    is copied from the row of its failure state and updated with its children in the trie
     :param words:
-    :param letters:
+    :param letters: alphabet of the DMA, None for the letters of the words
+    :param encoding: if not None, the words are encoded and the DMA searches bytes
+    :param workers: if not None, number of processes building the trie, see trie.build_trie_parallel
+    :param wildcard: must be None, an AutomatonException is raised otherwise : a DMA has no wildcard transitions,
+    the patterns with wildcards are matched by wildcard.build_wildcard_matcher
     :return: DMA automaton computed by Aho-Corasick algorithm
 
     see https://en.wikipedia.org/wiki/Aho–Corasick_algorithm
     """
-    automaton = build_trie(words)
-    initial = automaton.get_initial_state()
-    queue = []
-    if letters is None:
-        letters = get_letters(words)
-    for letter in letters:
-        target = automaton.get_target(initial, letter)
-        if target is None:
-            automaton.add_transition(initial, letter, initial)
-        else:
+    if wildcard is not None:
+        raise AutomatonException('A DMA has no wildcard transitions, use wildcard.build_wildcard_matcher')
+    if encoding is not None:
+        words = encode_words(words, encoding)
+    trie = build_trie(words, workers=workers)
+    letterIds, width = get_word_classes(trie.get_letters(), letters)
+    # as before the classes, the states reached by letters of the words outside letters are left as in the trie
+    completed = [True] * width if letters is None else [False] * width
+    for letter, classId in letterIds.items():
+        completed[classId] = letters is None or letter in letters
+    completed[OTHER_CLASS] = True
+    uncompleted = [classId for classId in range(width) if not completed[classId]]
+    initial = trie.get_initial_state()
+    rows = [None] * trie.get_num_states()
+    root = array('i', [initial]) * width
+    for classId in uncompleted:
+        root[classId] = -1
+    queue = deque()
+    for letter, target in trie.get_transitions(initial).items():
+        classId = letterIds[letter]
+        root[classId] = target
+        if completed[classId]:
             queue.append((target, initial))
+    rows[initial] = root
     while len(queue) != 0:
-        p, r = queue.pop(0)
-        if automaton.is_final_state(r):
-            automaton.set_final_state(p)
-            automaton.add_outputs(p, automaton.get_outputs(r))
-        for letter in letters:
-            q = automaton.get_target(p, letter)
-            s = automaton.get_target(r, letter)
-            if q is None:
-                automaton.add_transition(p, letter, s)
-            else:
-                queue.append((q, s))
+        p, r = queue.popleft()
+        if trie.is_final_state(r):
+            trie.set_final_state(p)
+            trie.add_outputs(p, trie.get_outputs(r))
+        failureRow = rows[r]
+        row = array('i', failureRow)
+        for classId in uncompleted:
+            row[classId] = -1
+        for letter, q in trie.get_transitions(p).items():
+            classId = letterIds[letter]
+            row[classId] = q
+            if completed[classId]:
+                queue.append((q, failureRow[classId]))
+        rows[p] = row
+    for state, row in enumerate(rows):
+        if row is None:
+            row = rows[state] = array('i', [-1]) * width
+            for letter, target in trie.get_transitions(state).items():
+                row[letterIds[letter]] = target
+    automaton = MutableAutomatonWithLetterClasses(letterIds, width)
+    automaton.transitionMatrix_.set_rows_(rows)
+    automaton.set_patterns(trie.get_patterns())
+    automaton.set_other_successor(initial)
+    for state in trie.get_final_states():
+        automaton.set_final_state(state)
+        automaton.add_outputs(state, trie.get_outputs(state))
+    # the outputs are added in the order of the states, the ranks are the ones of the trie
+    automaton.ranks_ = trie.ranks_
     return automaton
 
 
-def build_dma_default(words, letters=None):
+def build_dma_default(words, letters=None, encoding=None, workers=None, wildcard=None):
     """
     build a Dictionary Matching Automaton ( aka DMA )
+    a state only keeps the transitions of its failure state not leading to the initial state,
+    so the construction goes through the stored transitions instead of every letter of every state
     :param words:
-    :param letters:
+    :param letters: alphabet of the DMA, None for the letters of the words
+    :param encoding: if not None, the words are encoded and the DMA searches bytes
+    :param workers: if not None, number of processes building the trie, see trie.build_trie_parallel
+    :param wildcard: must be None, an AutomatonException is raised otherwise : a DMA has no wildcard transitions,
+    the patterns with wildcards are matched by wildcard.build_wildcard_matcher
     :return: DMA automaton computed by Aho-Corasick algorithm
 
     see https://en.wikipedia.org/wiki/Aho–Corasick_algorithm
     """
-    automaton = build_trie(words, fst_factory=MutableAutomatonWithDefaultSuccessor)
+    if wildcard is not None:
+        raise AutomatonException('A DMA has no wildcard transitions, use wildcard.build_wildcard_matcher')
+    if encoding is not None:
+        words = encode_words(words, encoding)
+    automaton = build_trie(words, fst_factory=MutableAutomatonWithDefaultSuccessor, workers=workers)
+    if letters is not None:
+        letters = set(letters)
     initial = automaton.get_initial_state()
-    queue = []
-    if letters is None:
-        letters = get_letters(words)
-    for letter in letters:
-        target = automaton.get_target(initial, letter)
-        if target is not None:
-            queue.append((target, initial))
+    queue = deque((target, initial) for letter, target in automaton.get_transitions(initial).items()
+                  if letters is None or letter in letters)
     while len(queue) != 0:
-        p, r = queue.pop(0)
+        p, r = queue.popleft()
         if automaton.is_final_state(r):
             automaton.set_final_state(p)
             automaton.add_outputs(p, automaton.get_outputs(r))
-        for letter in letters:
-            q = automaton.get_target(p, letter)
-            s = automaton.get_target_by_default(r, letter)
-            if q is None:
-                if s != initial:
-                    automaton.add_transition(p, letter, s)
-            else:
-                queue.append((q, s))
+        children = [(letter, q) for letter, q in automaton.get_transitions(p).items()
+                    if letters is None or letter in letters]
+        for letter, s in automaton.get_transitions(r).items():
+            if (letters is None or letter in letters) and automaton.get_target(p, letter) is None:
+                automaton.add_transition(p, letter, s)
+        for letter, q in children:
+            queue.append((q, automaton.get_target_by_default(r, letter)))
     return automaton
+
+
+def build_dma_failure(words, encoding=None, fst_factory=MutableAutomatonWithFailureLinks, workers=None,
+                      wildcard=None):
+    """
+    build a Dictionary Matching Automaton ( aka DMA ) storing failure links and output links
+    the outputs of a state are not copied from its suffixes, they are reached through the output links
+    :param words:
+    :param encoding: if not None, the words are encoded and the DMA searches bytes
+    :param fst_factory: MutableAutomatonWithFailureLinks or a subclass
+    :param workers: if not None, number of processes building the trie, see trie.build_trie_parallel
+    :param wildcard: must be None, an AutomatonException is raised otherwise : a DMA has no wildcard transitions,
+    the patterns with wildcards are matched by wildcard.build_wildcard_matcher
+    :return: DMA automaton computed by Aho-Corasick algorithm
+
+    see https://en.wikipedia.org/wiki/Aho–Corasick_algorithm
+    """
+    if wildcard is not None:
+        raise AutomatonException('A DMA has no wildcard transitions, use wildcard.build_wildcard_matcher')
+    automaton = build_trie(words, fst_factory=fst_factory, encoding=encoding, workers=workers)
+    initial = automaton.get_initial_state()
+    queue = deque()
+    for target in automaton.get_transitions(initial).values():
+        automaton.set_failure(target, initial)
+        queue.append(target)
+    while len(queue) != 0:
+        r = queue.popleft()
+        for letter, p in automaton.get_transitions(r).items():
+            queue.append(p)
+            s = automaton.get_target_by_failure(automaton.get_failure(r), letter)
+            automaton.set_failure(p, s)
+            if automaton.is_final_state(s):
+                automaton.set_final_state(p)
+                automaton.set_output_link(p, s if automaton.has_own_outputs(s) else automaton.get_output_link(s))
+    return automaton
+
+
+def build_dma_lazy(words, max_cache_size=MAX_CACHE_SIZE, encoding=None, workers=None):
+    """
+    build a Dictionary Matching Automaton ( aka DMA ) computing its transitions on demand
+    only the trie and the failure links are built, a missing transition is computed through the failure links
+    the first time it is needed and kept in a cache of the max_cache_size least recently used transitions
+    :param words:
+    :param max_cache_size:
+    :param encoding: if not None, the words are encoded and the DMA searches bytes
+    :param workers: if not None, number of processes building the trie, see trie.build_trie_parallel
+    :return: LazyAutomaton
+    """
+    return build_dma_failure(words, encoding, lambda: LazyAutomaton(max_cache_size), workers)
@@ -0,0 +1,236 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import heapq
+import threading
+
+from .automaton import Automaton
+from .dma import build_dma_complete
+from .semantics import ALL
+
+MAX_DELTA = 1024
+
+
+class DMASnapshot:
+    """
+    immutable state of a DynamicDMA : a base DMA, the words removed from it and a small DMA of the added words
+    it has the searches of the automata, its states are the pairs of the states of the two DMAs
+    """
+
+    def __init__(self, base, baseWords, delta, deltaWords, removed):
+        self.base_ = base
+        self.baseWords_ = baseWords
+        self.delta_ = delta
+        self.deltaWords_ = deltaWords
+        self.removed_ = removed
+
+    def has_word(self, word):
+        return word in self.deltaWords_ or (word in self.baseWords_ and word not in self.removed_)
+
+    def get_words(self):
+        return sorted((self.baseWords_ - self.removed_) | self.deltaWords_)
+
+    def get_num_words(self):
+        return len(self.baseWords_) - len(self.removed_) + len(self.deltaWords_)
+
+    def det_search(self, word):
+        outputs = self.base_.det_search(word)
+        if len(self.removed_) != 0:
+            outputs = [output for output in outputs if output[0] not in self.removed_]
+        if len(self.deltaWords_) != 0:
+            # both lists are in the order of the DMA of all the words : by end position then by output
+            outputs = list(heapq.merge(outputs, self.delta_.det_search(word), key=get_order_))
+        return outputs
+
+    def contains_any(self, word):
+        if len(self.removed_) == 0:
+            found = self.base_.contains_any(word)
+        else:
+            found = any(output[0] not in self.removed_ for output in self.base_.det_search(word))
+        return found or (len(self.deltaWords_) != 0 and self.delta_.contains_any(word))
+
+    def count_matches(self, word):
+        counts = self.base_.count_matches(word)
+        for output in self.removed_:
+            counts.pop(output, None)
+        if len(self.deltaWords_) != 0:
+            counts.update(self.delta_.count_matches(word))
+        return counts
+
+    def get_initial_state(self):
+        return self.base_.get_initial_state(), self.delta_.get_initial_state()
+
+    def get_letters(self):
+        return sorted(set(self.base_.get_letters()) | set(self.delta_.get_letters()))
+
+    def get_max_output_length(self):
+        return max(self.base_.get_max_output_length(), self.delta_.get_max_output_length())
+
+    def get_output_rank(self, output):
+        # the added words come after the words of the base
+        if output in self.baseWords_:
+            return self.base_.get_output_rank(output)
+        return len(self.baseWords_) + self.delta_.get_output_rank(output)
+
+    def get_state_depth(self, state):
+        depths = [automaton.get_state_depth(s) for automaton, s in zip((self.base_, self.delta_), state)
+                  if s is not None]
+        return None if None in depths else max(depths, default=0)
+
+    def det_search_(self, state, word, offset, outputs):
+        # see Automaton.det_search_, the scan stops when both DMAs are stopped
+        baseState, deltaState = state
+        baseOutputs = []
+        deltaOutputs = []
+        if baseState is not None:
+            baseState = self.base_.det_search_(baseState, word, offset, baseOutputs)
+        if deltaState is not None and len(self.deltaWords_) != 0:
+            deltaState = self.delta_.det_search_(deltaState, word, offset, deltaOutputs)
+        if len(self.removed_) != 0:
+            baseOutputs = [output for output in baseOutputs if output[0] not in self.removed_]
+        for output in heapq.merge(baseOutputs, deltaOutputs, key=get_order_):
+            outputs.append(output)
+        if baseState is None and deltaState is None:
+            return None
+        return baseState, deltaState
+
+    # the searches of the automata, built on det_search_
+    search = Automaton.search
+    iter_search = Automaton.iter_search
+    get_chunk_encoding_ = Automaton.get_chunk_encoding_
+
+
+def get_order_(output):
+    return output[2], output[0]
+
+
+class DynamicDMA:
+    """
+    Dictionary Matching Automaton supporting the addition and the removal of words
+    the added words are searched by a small DMA rebuilt at each update, the removed words are filtered out,
+    so the cost of an update depends on the number of pending updates, not on the number of words
+    once the number of pending updates exceeds max_delta, the whole DMA is rebuilt by a background thread
+    which installs it with the updates made in the meantime
+    each update installs a new snapshot : a search runs on the snapshot current at its start
+    """
+
+    def __init__(self, words=(), builder=build_dma_complete, max_delta=MAX_DELTA):
+        self.builder_ = builder
+        self.maxDelta_ = max_delta
+        self.lock_ = threading.Lock()
+        self.snapshot_ = self.build_snapshot_(words)
+        # background rebuild and words updated since its start
+        self.rebuilder_ = None
+        self.updatedWords_ = None
+
+    def build_snapshot_(self, words):
+        words = frozenset(word for word in words if len(word) != 0)
+        return DMASnapshot(self.builder_(sorted(words)), words, self.builder_([]), frozenset(), frozenset())
+
+    def get_snapshot(self):
+        return self.snapshot_
+
+    def has_word(self, word):
+        return self.snapshot_.has_word(word)
+
+    def get_words(self):
+        return self.snapshot_.get_words()
+
+    def det_search(self, word):
+        return self.snapshot_.det_search(word)
+
+    def search(self, word, semantics=ALL):
+        return self.snapshot_.search(word, semantics)
+
+    def iter_search(self, source, chunk_size=None, encoding=None, semantics=ALL):
+        # the chunks are searched by the snapshot current at the call
+        return self.snapshot_.iter_search(source, chunk_size, encoding, semantics)
+
+    def contains_any(self, word):
+        return self.snapshot_.contains_any(word)
+
+    def count_matches(self, word):
+        return self.snapshot_.count_matches(word)
+
+    def add_word(self, word):
+        with self.lock_:
+            snapshot = self.snapshot_
+            if len(word) == 0 or snapshot.has_word(word):
+                return self
+            if word in snapshot.removed_:
+                self.update_(word, snapshot.delta_, snapshot.deltaWords_, snapshot.removed_ - {word})
+            else:
+                deltaWords = snapshot.deltaWords_ | {word}
+                self.update_(word, self.builder_(sorted(deltaWords)), deltaWords, snapshot.removed_)
+        return self
+
+    def remove_word(self, word):
+        with self.lock_:
+            snapshot = self.snapshot_
+            if not snapshot.has_word(word):
+                return self
+            if word in snapshot.deltaWords_:
+                deltaWords = snapshot.deltaWords_ - {word}
+                self.update_(word, self.builder_(sorted(deltaWords)), deltaWords, snapshot.removed_)
+            else:
+                self.update_(word, snapshot.delta_, snapshot.deltaWords_, snapshot.removed_ | {word})
+        return self
+
+    def compact(self):
+        """
+        rebuild the whole DMA now, after the background rebuild if any
+        :return: self
+        """
+        self.wait_rebuild()
+        with self.lock_:
+            self.snapshot_ = self.build_snapshot_(self.snapshot_.get_words())
+        return self
+
+    def wait_rebuild(self):
+        """
+        wait for the end of the background rebuild if any
+        :return: self
+        """
+        rebuilder = self.rebuilder_
+        while rebuilder is not None:
+            rebuilder.join()
+            rebuilder = self.rebuilder_
+        return self
+
+    def update_(self, word, delta, deltaWords, removed):
+        snapshot = self.snapshot_
+        self.snapshot_ = DMASnapshot(snapshot.base_, snapshot.baseWords_, delta, deltaWords, removed)
+        if self.updatedWords_ is not None:
+            self.updatedWords_.add(word)
+        self.start_rebuild_()
+
+    def start_rebuild_(self):
+        # called with the lock
+        snapshot = self.snapshot_
+        if self.rebuilder_ is None and len(snapshot.deltaWords_) + len(snapshot.removed_) > self.maxDelta_:
+            self.updatedWords_ = set()
+            self.rebuilder_ = threading.Thread(target=self.rebuild_, args=(snapshot,), daemon=True)
+            self.rebuilder_.start()
+
+    def rebuild_(self, snapshot):
+        rebuilt = False
+        try:
+            words = (snapshot.baseWords_ - snapshot.removed_) | snapshot.deltaWords_
+            base = self.builder_(sorted(words))
+            with self.lock_:
+                # the words updated during the rebuild are pending updates of the new base
+                current = self.snapshot_
+                deltaWords = frozenset(word for word in self.updatedWords_
+                                       if word not in words and current.has_word(word))
+                removed = frozenset(word for word in self.updatedWords_
+                                    if word in words and not current.has_word(word))
+                delta = current.delta_ if deltaWords == current.deltaWords_ else self.builder_(sorted(deltaWords))
+                self.snapshot_ = DMASnapshot(base, words, delta, deltaWords, removed)
+            rebuilt = True
+        finally:
+            with self.lock_:
+                self.rebuilder_ = None
+                self.updatedWords_ = None
+                # the updates made during the rebuild may need another one, a failed rebuild waits for the next update
+                if rebuilt:
+                    self.start_rebuild_()
@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+from .patterns import PatternTable
+
+# second to last bytes of an utf-8 encoded character
+CONTINUATION_BYTES = bytes(range(0x80, 0xc0))
+
+
+def encode_words(words, encoding='utf-8'):
+    """
+    :param words: iterable of words or PatternTable
+    :param encoding:
+    :return: list of the words as byte sequences, strings are encoded and bytes kept as they are
+    ( a PatternTable of the encoded words for a PatternTable )
+    """
+    if isinstance(words, PatternTable):
+        return words.encode(encoding)
+    return [word if isinstance(word, (bytes, bytearray)) else word.encode(encoding) for word in words]
+
+
+def to_char_offsets(data, matches):
+    """
+    map the byte offsets of matches found in utf-8 encoded data to code point offsets
+    :param data: bytes, bytearray or memoryview
+    :param matches: list of (output, start, end) with byte offsets
+    :return: list of (output, start, end) with code point offsets
+    """
+    positions = sorted(set(position for _, start, end in matches for position in (start, end)))
+    offsets = {}
+    previous = 0
+    count = 0
+    for position in positions:
+        count += len(bytes(data[previous:position]).translate(None, CONTINUATION_BYTES))
+        offsets[position] = count
+        previous = position
+    return [(output, offsets[start], offsets[end]) for output, start, end in matches]
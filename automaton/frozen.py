@@ -0,0 +1,394 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import json
+import mmap
+import struct
+import sys
+from array import array
+from itertools import repeat
+
+from .alphabet import OTHER_CLASS
+from .alphabet import get_effective_target
+from .automaton import Automaton
+from .automaton import AutomatonException
+from .patterns import PatternTable
+
+# binary format : header followed by 8 bytes aligned sections, integers are little endian
+#   letters         json list of the [letter, class id] pairs
+#   table           int32 * numStates * width
+#   finals          bitmap of (numStates + 7) // 8 bytes
+#   state outputs   uint32 * (numStates + 1) offsets in output ids
+#   output ids      uint32 * numOutputIds
+#   output offsets  uint32 * (numOutputs + 1) offsets in output data
+#   output lengths  uint32 * numOutputs, only for pattern ids
+#   output data     concatenated outputs in the order of their ranks, utf-8 encoded if they are strings
+#   payloads        json list of the payloads of the patterns, only for pattern ids with payloads
+# the outputs of an automaton built from a PatternTable are the pattern ids, the outputs written are its patterns
+BINARY_MAGIC = b'AUTOMATN'
+BINARY_VERSION = 1
+BINARY_HEADER = struct.Struct('<8sIIIIIIIII')
+BINARY_BYTES_OUTPUTS = 1  # flag : outputs are bytes
+BINARY_PATTERN_IDS = 2  # flag : outputs are pattern ids
+
+
+class OutputTable:
+    """
+    read only sequence of the sorted outputs of each state : the output ids of the states are stored in one array,
+    the outputs are the ids themselves ( pattern ids ) or they are decoded on demand from a binary buffer
+    """
+
+    def __init__(self, stateOffsets, outputIds, outputOffsets=None, data=None, bytesOutputs=False):
+        self.stateOffsets_ = stateOffsets
+        self.outputIds_ = outputIds
+        self.outputOffsets_ = outputOffsets
+        self.data_ = data
+        self.bytesOutputs_ = bytesOutputs
+        self.cache_ = {}
+
+    def __len__(self):
+        return len(self.stateOffsets_) - 1
+
+    def get_output(self, outputId):
+        output = bytes(self.data_[self.outputOffsets_[outputId]:self.outputOffsets_[outputId + 1]])
+        return output if self.bytesOutputs_ else output.decode('utf-8')
+
+    def get_ranks(self):
+        # the outputs are written in the order of their ranks
+        return dict((self.get_output(outputId), outputId) for outputId in range(len(self.outputOffsets_) - 1))
+
+    def __getitem__(self, state):
+        if self.outputOffsets_ is None:
+            return tuple(self.outputIds_[self.stateOffsets_[state]:self.stateOffsets_[state + 1]])
+        outputs = self.cache_.get(state, None)
+        if outputs is None:
+            ids = self.outputIds_[self.stateOffsets_[state]:self.stateOffsets_[state + 1]]
+            outputs = self.cache_[state] = tuple(self.get_output(outputId) for outputId in ids)
+        return outputs
+
+
+class FrozenTransitionMatrix:
+    """
+    immutable transition matrix with dense integer states
+    the letters are mapped to equivalence classes ( see get_letter_classes ),
+    the targets are stored in a flat array indexed by state * width + class id,
+    the class OTHER_CLASS holds the target of the letters outside the alphabet
+    a missing transition is stored as -1
+    """
+
+    def __init__(self, letterIds, width, table):
+        self.letters_ = sorted(letterIds)
+        self.letterIds_ = letterIds
+        self.width_ = width
+        self.table_ = table
+        self.numTransitions_ = None
+        # class ids of the bytes when the letters are bytes, used to translate bytes at C speed
+        self.byteIds_ = None
+        if all(isinstance(letter, int) and 0 <= letter < 256 for letter in letterIds) and width <= 256:
+            self.byteIds_ = bytes(self.get_letter_id(letter) for letter in range(256))
+
+    def get_letter_id(self, letter):
+        return self.letterIds_.get(letter, OTHER_CLASS)
+
+    def get_letter_ids(self, word):
+        if self.byteIds_ is not None and isinstance(word, (bytes, bytearray)):
+            return word.translate(self.byteIds_)
+        return map(self.letterIds_.get, word, repeat(OTHER_CLASS))
+
+    def get_target(self, source, letter):
+        if not self.has_state(source):
+            raise RuntimeError('Unknown source state : %s' % str(source))
+        target = self.table_[source * self.width_ + self.get_letter_id(letter)]
+        return None if target < 0 else target
+
+    def get_transitions(self, source):
+        row = source * self.width_
+        return dict((letter, self.table_[row + self.letterIds_[letter]]) for letter in self.letters_
+                    if self.table_[row + self.letterIds_[letter]] >= 0)
+
+    def iter_transitions(self):
+        for state in self.get_states():
+            for letter, target in self.get_transitions(state).items():
+                yield state, letter, target
+
+    def get_num_transitions(self):
+        if self.numTransitions_ is None:
+            self.numTransitions_ = sum(len(self.get_transitions(state)) for state in self.get_states())
+        return self.numTransitions_
+
+    def has_state(self, state):
+        return isinstance(state, int) and 0 <= state < self.get_num_states()
+
+    def get_num_states(self):
+        return len(self.table_) // self.width_
+
+    def get_states(self):
+        return list(range(self.get_num_states()))
+
+    def get_letters(self):
+        return list(self.letters_)
+
+    def to_dict(self):
+        return dict((state, self.get_transitions(state)) for state in self.get_states())
+
+
+class FrozenAutomaton(Automaton):
+    """
+    immutable automaton compiled by freeze
+    final states are stored in a bitset, outputs as sorted tuples indexed by state
+    the ranks of a loaded automaton are None, they are read from its outputs table when needed
+    the binary file name of a loaded automaton is kept to map it again in other processes
+    """
+
+    def __init__(self, initial, matrix, finals, outputs, ranks=None, patterns=None, binary_file_name=None):
+        Automaton.__init__(self, initial, matrix, finals, outputs)
+        # None : read from the outputs table when needed
+        self.ranks_ = ranks
+        self.patterns_ = patterns
+        self.binaryFileName_ = binary_file_name
+
+    def get_binary_file_name(self):
+        return self.binaryFileName_
+
+    def get_output_rank(self, output):
+        if self.ranks_ is None and self.patterns_ is None:
+            self.ranks_ = self.output_.get_ranks()
+        return Automaton.get_output_rank(self, output)
+
+    def get_max_output_length(self):
+        if self.patterns_ is None and self.maxOutputLength_ is None:
+            length = self.get_output_length_function()
+            self.maxOutputLength_ = max((length(output) for state in range(len(self.output_))
+                                         for output in self.output_[state]), default=0)
+        return Automaton.get_max_output_length(self)
+
+    def get_final_states(self):
+        if self.sortedFinals_ is None:
+            self.sortedFinals_ = [state for state in self.get_states() if self.is_final_state(state)]
+        return list(self.sortedFinals_)
+
+    def get_num_final_states(self):
+        if self.sortedFinals_ is None:
+            self.get_final_states()
+        return len(self.sortedFinals_)
+
+    def is_final_state(self, state):
+        if not self.transitionMatrix_.has_state(state):
+            raise AutomatonException('Unknown state : %s' % str(state))
+        return self.finals_[state >> 3] & (1 << (state & 7)) != 0
+
+    def get_outputs(self, state):
+        if not self.transitionMatrix_.has_state(state):
+            raise AutomatonException('Unknown state : %s' % str(state))
+        return set(self.output_[state])
+
+    def get_sorted_outputs(self, state):
+        return self.output_[state]
+
+    def get_other_target(self, source):
+        target = self.transitionMatrix_.table_[source * self.transitionMatrix_.width_ + OTHER_CLASS]
+        return None if target < 0 else target
+
+    def accept(self, word):
+        matrix = self.transitionMatrix_
+        table = matrix.table_
+        width = matrix.width_
+        state = self.initialState_
+        for letter in matrix.get_letter_ids(word):
+            state = table[state * width + letter]
+            if state < 0:
+                return False
+        return self.finals_[state >> 3] & (1 << (state & 7)) != 0
+
+    def scan_word_(self, state, word, offset, visit):
+        matrix = self.transitionMatrix_
+        table = matrix.table_
+        width = matrix.width_
+        finals = self.finals_
+        prefilter = self.get_prefilter_(word)
+        if prefilter is None:
+            for i, letter in enumerate(matrix.get_letter_ids(word), offset + 1):
+                state = table[state * width + letter]
+                if state < 0 or (finals[state >> 3] & (1 << (state & 7)) and visit(state, i)):
+                    return None
+            return state
+        if matrix.byteIds_ is not None and isinstance(word, (bytes, bytearray)):
+            letterIds = word.translate(matrix.byteIds_)
+        else:
+            letterIds = None
+            getLetterId = matrix.letterIds_.get
+        initial = self.initialState_
+        i = 0
+        end = len(word)
+        while i < end:
+            if state == initial:
+                match = prefilter.search(word, i)
+                if match is None:
+                    return state
+                i = match.start()
+            state = table[state * width + (getLetterId(word[i], OTHER_CLASS) if letterIds is None else letterIds[i])]
+            i += 1
+            if state < 0 or (finals[state >> 3] & (1 << (state & 7)) and visit(state, offset + i)):
+                return None
+        return state
+
+    def to_dict(self):
+        d = Automaton.to_dict(self)
+        d['finals'] = set(self.get_final_states())
+        return d
+
+    def dump_binary(self, binaryFileName):
+        """
+        write the automaton in the binary format read by load_binary
+        the outputs must be all strings or all bytes, or pattern ids with json payloads
+        """
+        matrix = self.transitionMatrix_
+        numStates = self.get_num_states()
+        patterns = self.patterns_
+        if patterns is None:
+            outputs = sorted(set(output for state in range(numStates) for output in self.output_[state]),
+                             key=self.get_output_rank)
+            bytesOutputs = len(outputs) != 0 and all(isinstance(output, bytes) for output in outputs)
+            if not bytesOutputs and not all(isinstance(output, str) for output in outputs):
+                raise AutomatonException('Binary format only supports string or bytes outputs')
+            outputIds = dict((output, i) for i, output in enumerate(outputs)).__getitem__
+            encoded = [output if bytesOutputs else output.encode('utf-8') for output in outputs]
+            outputOffsets = array('I', [0])
+            for output in encoded:
+                outputOffsets.append(outputOffsets[-1] + len(output))
+            data = b''.join(encoded)
+            lengths = array('I')
+            payloads = b''
+            flags = BINARY_BYTES_OUTPUTS if bytesOutputs else 0
+        else:
+            outputIds = int
+            data = patterns.data_
+            outputOffsets = array('I', patterns.offsets_)
+            lengths = array('I', patterns.lengths_)
+            try:
+                payloads = b'' if patterns.payloads_ is None else json.dumps(patterns.payloads_).encode('utf-8')
+            except TypeError:
+                raise AutomatonException('Binary format only supports json payloads')
+            flags = BINARY_PATTERN_IDS | (BINARY_BYTES_OUTPUTS if patterns.bytesWords_ else 0)
+        stateOffsets = array('I', [0])
+        ids = array('I')
+        for state in range(numStates):
+            for output in self.output_[state]:
+                ids.append(outputIds(output))
+            stateOffsets.append(len(ids))
+        letters = json.dumps([[letter, matrix.letterIds_[letter]] for letter in matrix.letters_]).encode('utf-8')
+        table = array('i', matrix.table_)
+        sections = [letters, table, bytes(self.finals_), stateOffsets, ids, outputOffsets, lengths, data, payloads]
+        if sys.byteorder != 'little':
+            for section in sections[1:]:
+                if isinstance(section, array):
+                    section.byteswap()
+        with open(binaryFileName, 'wb') as binaryFile:
+            binaryFile.write(BINARY_HEADER.pack(BINARY_MAGIC, BINARY_VERSION, flags,
+                                                numStates, matrix.width_, self.initialState_,
+                                                len(letters), len(ids), len(outputOffsets) - 1, len(payloads)))
+            for section in sections:
+                write_aligned_(binaryFile, section)
+        return self
+
+
+def freeze(automaton):
+    """
+    compile an automaton ( e.g. a DMA built by build_dma_complete or build_dma_default )
+    into an immutable automaton with dense integer states and one column per class of letters
+    :param automaton:
+    :return: FrozenAutomaton, the initial state is 0
+    """
+    initial = automaton.get_initial_state()
+    states = [initial] + [state for state in automaton.get_states() if state != initial]
+    ids = dict((state, i) for i, state in enumerate(states))
+    ids[None] = -1
+    letterIds, width = automaton.get_letter_classes()
+    representatives = dict((classId, letter) for letter, classId in letterIds.items())
+    table = array('i', [-1]) * (len(states) * width)
+    finals = bytearray((len(states) + 7) // 8)
+    patterns = automaton.get_patterns()
+    # the pattern ids of the states are stored in one array, see OutputTable
+    outputs = [] if patterns is None else OutputTable(array('I', [0]), array('I'))
+    for i, state in enumerate(states):
+        row = i * width
+        table[row + OTHER_CLASS] = ids[automaton.get_other_target(state)]
+        for classId, letter in representatives.items():
+            table[row + classId] = ids[get_effective_target(automaton, state, letter)]
+        if automaton.is_final_state(state):
+            finals[i >> 3] |= 1 << (i & 7)
+        if patterns is None:
+            outputs.append(tuple(sorted(automaton.get_outputs(state))))
+        else:
+            outputs.outputIds_.extend(sorted(automaton.get_outputs(state)))
+            outputs.stateOffsets_.append(len(outputs.outputIds_))
+    ranks = None if patterns is not None else \
+        dict((output, automaton.get_output_rank(output)) for state_outputs in outputs for output in state_outputs)
+    return FrozenAutomaton(0, FrozenTransitionMatrix(letterIds, width, table), finals, outputs, ranks, patterns)
+
+
+def write_aligned_(binaryFile, section):
+    binaryFile.write(section)
+    size = len(section) * (section.itemsize if isinstance(section, array) else 1)
+    binaryFile.write(b'\0' * (-size % 8))
+
+
+def load_binary(binaryFileName):
+    """
+    load an automaton written by FrozenAutomaton.dump_binary
+    the file is memory mapped, the arrays of the automaton are views on the mapped pages
+    :param binaryFileName:
+    :return: FrozenAutomaton
+    """
+    with open(binaryFileName, 'rb') as binaryFile:
+        # the header is checked before mapping, an empty file cannot be mapped
+        header = binaryFile.read(BINARY_HEADER.size)
+        if len(header) < BINARY_HEADER.size:
+            raise AutomatonException('Not an automaton binary file : %s' % binaryFileName)
+        magic, version, flags, numStates, width, initial, lettersSize, numOutputIds, numOutputs, payloadsSize = \
+            BINARY_HEADER.unpack(header)
+        if magic != BINARY_MAGIC:
+            raise AutomatonException('Not an automaton binary file : %s' % binaryFileName)
+        if version != BINARY_VERSION:
+            raise AutomatonException('Unsupported binary format version : %d' % version)
+        buffer = mmap.mmap(binaryFile.fileno(), 0, access=mmap.ACCESS_READ)
+    view = memoryview(buffer)
+    position = [BINARY_HEADER.size]
+
+    def section(size, typecode=None):
+        start = position[0]
+        end = start + size * (1 if typecode is None else array(typecode).itemsize)
+        if end > len(view):
+            raise AutomatonException('Truncated automaton binary file : %s' % binaryFileName)
+        position[0] = end + (-(end - start) % 8)
+        if typecode is None:
+            return view[start:end]
+        if sys.byteorder != 'little':
+            values = array(typecode, view[start:end])
+            values.byteswap()
+            return values
+        return view[start:end].cast(typecode)
+
+    letterIds = dict((letter, classId) for letter, classId in json.loads(bytes(section(lettersSize)).decode('utf-8')))
+    table = section(numStates * width, 'i')
+    finals = section((numStates + 7) // 8)
+    stateOffsets = section(numStates + 1, 'I')
+    outputIds = section(numOutputIds, 'I')
+    outputOffsets = section(numOutputs + 1, 'I')
+    lengths = section(numOutputs if flags & BINARY_PATTERN_IDS else 0, 'I')
+    data = section(outputOffsets[-1])
+    payloads = section(payloadsSize)
+    if flags & BINARY_PATTERN_IDS:
+        outputs = OutputTable(stateOffsets, outputIds)
+        # the patterns are views on the mapped pages too
+        patterns = PatternTable()
+        patterns.data_ = data
+        patterns.offsets_ = outputOffsets
+        patterns.lengths_ = lengths
+        patterns.bytesWords_ = flags & BINARY_BYTES_OUTPUTS != 0
+        patterns.payloads_ = json.loads(bytes(payloads).decode('utf-8')) if payloadsSize != 0 else None
+    else:
+        outputs = OutputTable(stateOffsets, outputIds, outputOffsets, data, flags & BINARY_BYTES_OUTPUTS != 0)
+        patterns = None
+    return FrozenAutomaton(initial, FrozenTransitionMatrix(letterIds, width, table), finals, outputs,
+                           patterns=patterns, binary_file_name=binaryFileName)
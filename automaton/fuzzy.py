@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+
+def next_row_(row, letter, columns):
+    # Levenshtein DP row of the path extended by letter against the prefixes of columns
+    new = [row[0] + 1]
+    for j, column in enumerate(columns, 1):
+        new.append(min(row[j] + 1, new[j - 1] + 1, row[j - 1] + (letter != column)))
+    return new
+
+
+def walk_(automaton, row, columns, max_distance, visit):
+    # depth first walk of an acyclic automaton, the branches whose row exceeds max_distance are pruned
+    # a final state without outputs ( e.g. of build_minimal_acyclic ) is visited with the word of its path
+    stack = [(automaton.get_initial_state(), row, ())]
+    while len(stack) != 0:
+        state, row, path = stack.pop()
+        if automaton.is_final_state(state):
+            outputs = automaton.get_outputs(state)
+            if len(outputs) == 0:
+                outputs = (bytes(path) if len(path) != 0 and isinstance(path[0], int) else ''.join(path),)
+            visit(outputs, row)
+        for letter, target in automaton.get_transitions(state).items():
+            new = next_row_(row, letter, columns)
+            if min(new) <= max_distance:
+                stack.append((target, new, path + (letter,)))
+
+
+def lookup_fuzzy(automaton, query, max_distance):
+    """
+    :param automaton: acyclic automaton, e.g. a trie built by build_trie
+    :param query:
+    :param max_distance: max Levenshtein distance
+    :return: sorted list of (output, distance) of the outputs of the words within max_distance of query
+    """
+    distances = {}
+
+    def visit(outputs, row):
+        if row[-1] <= max_distance:
+            for output in outputs:
+                distances[output] = min(row[-1], distances.get(output, row[-1]))
+
+    walk_(automaton, list(range(len(query) + 1)), query, max_distance, visit)
+    return sorted(distances.items())
+
+
+def search_fuzzy(automaton, text, max_distance):
+    """
+    find the approximate occurrences of the words of an acyclic automaton with outputs in text
+    for each start position the trie is walked against the text from that position,
+    then the overlapping occurrences of an output are reduced to the closest one ( the first one on ties )
+    :param automaton: acyclic automaton, e.g. a trie built by build_trie
+    :param text:
+    :param max_distance: max Levenshtein distance
+    :return: list of (output, start, end, distance) sorted by start
+    """
+    maxLength = automaton.get_max_output_length() + max_distance
+    candidates = {}
+    for start in range(len(text)):
+        columns = text[start:start + maxLength]
+
+        def visit(outputs, row):
+            # the occurrences are not empty
+            distance = min(row[1:])
+            if distance <= max_distance:
+                end = start + row.index(distance, 1)
+                for output in outputs:
+                    best = candidates.get((output, start), None)
+                    if best is None or distance < best[1]:
+                        candidates[(output, start)] = (end, distance)
+
+        walk_(automaton, list(range(len(columns) + 1)), columns, max_distance, visit)
+    matches = []
+    last = {}
+    for (output, start), (end, distance) in sorted(candidates.items(), key=lambda item: (item[0][1], item[1][0])):
+        previous = last.get(output, None)
+        if previous is not None and start < matches[previous][2]:
+            if distance < matches[previous][3]:
+                matches[previous] = (output, start, end, distance)
+            continue
+        last[output] = len(matches)
+        matches.append((output, start, end, distance))
+    return sorted(matches, key=lambda match: (match[1], match[2]))
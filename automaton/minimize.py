@@ -0,0 +1,186 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+from collections import deque
+
+from .automaton import AutomatonException
+from .automaton import MinimizedAutomaton
+from .automaton import MutableAutomatonWithFailureLinks
+
+
+def build_minimal_acyclic(words):
+    """
+    build the minimal deterministic acyclic automaton accepting words
+    the states are registered as soon as no more word can go through them, suffixes are shared
+    the automaton has no output, it is meant for accept
+    :param words: sorted words
+    :return: MinimizedAutomaton, its stats report the size of the trie of words
+
+    see Daciuk, Mihov, Watson, Watson : Incremental Construction of Minimal Acyclic Finite-State Automata
+    """
+    transitions = [{}]
+    finals = [False]
+    register = {}
+    unchecked = []  # (parent, letter, child) of the path of the last word
+    # slots of the states replaced by a registered state, reused by the next states
+    # so that the memory is proportional to the minimal automaton plus the last word
+    free = []
+    numCreated = 1
+
+    def replace_or_register(size):
+        while len(unchecked) > size:
+            parent, letter, child = unchecked.pop()
+            signature = (finals[child],) + tuple(item for transition in sorted(transitions[child].items())
+                                                 for item in transition)
+            registered = register.get(signature, None)
+            if registered is None:
+                register[signature] = child
+            else:
+                transitions[parent][letter] = registered
+                transitions[child] = None
+                free.append(child)
+
+    def add_state():
+        if len(free) != 0:
+            state = free.pop()
+            transitions[state] = {}
+            finals[state] = False
+            return state
+        transitions.append({})
+        finals.append(False)
+        return len(transitions) - 1
+
+    previous = None
+    for word in words:
+        if len(word) == 0 or word == previous:
+            continue
+        if previous is not None and word < previous:
+            raise AutomatonException('Words are not sorted : %s after %s' % (str(word), str(previous)))
+        common = 0
+        if previous is not None:
+            while common < min(len(word), len(previous)) and word[common] == previous[common]:
+                common += 1
+        replace_or_register(common)
+        state = unchecked[-1][2] if len(unchecked) != 0 else 0
+        for letter in word[common:]:
+            target = add_state()
+            transitions[state][letter] = target
+            unchecked.append((state, letter, target))
+            state = target
+        numCreated += len(word) - common
+        finals[state] = True
+        previous = word
+    replace_or_register(0)
+    register = None
+    automaton = MinimizedAutomaton()
+    # keep the registered states, the initial state is 0
+    ids = {0: automaton.get_initial_state()}
+    queue = deque([0])
+    while len(queue) != 0:
+        state = queue.popleft()
+        for letter, target in sorted(transitions[state].items()):
+            if target not in ids:
+                ids[target] = automaton.add_state()
+                queue.append(target)
+            automaton.add_transition(ids[state], letter, ids[target])
+        if finals[state]:
+            automaton.set_final_state(ids[state])
+        # the transitions of a state are not needed once copied
+        transitions[state] = None
+    # each created state is a prefix of the trie
+    return automaton.set_original_stats(numCreated, numCreated - 1)
+
+
+def get_stored_transitions_(automaton):
+    # function state -> dict letter -> target of the letters not following get_other_target,
+    # the letters without transition of a state with failure links follow the transitions of its failure state
+    if not isinstance(automaton, MutableAutomatonWithFailureLinks):
+        return automaton.get_transitions
+    initial = automaton.get_initial_state()
+    transitions = {initial: automaton.get_transitions(initial)}
+
+    def get_transitions(state):
+        path = []
+        while state not in transitions:
+            path.append(state)
+            state = automaton.get_failure(state)
+        inherited = transitions[state]
+        for state in reversed(path):
+            inherited = transitions[state] = dict(inherited)
+            inherited.update(automaton.get_transitions(state))
+        return inherited
+
+    return get_transitions
+
+
+def minimize(automaton):
+    """
+    minimize an automaton by partition refinement, states with different outputs are never merged
+    the letters without transition follow get_other_target, so the transitions to the target
+    of the letters outside the alphabet are omitted when it is not None ; this target must not depend on the state
+    the signatures of the states are built from their stored transitions, so the memory is proportional
+    to the transitions of the automaton, not to its states times its letters
+    :param automaton:
+    :return: MinimizedAutomaton equivalent to automaton for accept and det_search
+
+    see https://en.wikipedia.org/wiki/DFA_minimization ( Moore's algorithm )
+    """
+    initial = automaton.get_initial_state()
+    get_transitions = get_stored_transitions_(automaton)
+    # reachable states, their sorted (letter, target) transitions and their target of the other letters
+    states = [initial]
+    reached = {initial}
+    transitions = {}
+    others = {}
+    for state in states:
+        transitions[state] = tuple(sorted(get_transitions(state).items()))
+        others[state] = automaton.get_other_target(state)
+        for target in [target for _, target in transitions[state]] + [others[state]]:
+            if target is not None and target not in reached:
+                reached.add(target)
+                states.append(target)
+    blocks = {}
+    signatures = {}
+    for state in states:
+        final = automaton.is_final_state(state)
+        signature = (final, tuple(sorted(automaton.get_outputs(state))) if final else ())
+        blocks[state] = signatures.setdefault(signature, len(signatures))
+    blocks[None] = None
+    numBlocks = 0
+    while numBlocks != len(signatures):
+        numBlocks = len(signatures)
+        signatures = {}
+        refined = {None: None}
+        for state in states:
+            # the transitions leading to the block of the other target are the same as no transition
+            other = blocks[others[state]]
+            signature = (blocks[state], other) + tuple(item for letter, target in transitions[state]
+                                                       if blocks[target] != other for item in (letter, blocks[target]))
+            refined[state] = signatures.setdefault(signature, len(signatures))
+        blocks = refined
+    minimized = MinimizedAutomaton()
+    minimized.set_patterns(automaton.get_patterns())
+    ids = {blocks[initial]: minimized.get_initial_state()}
+    for state in states:
+        if blocks[state] not in ids:
+            ids[blocks[state]] = minimized.add_state()
+    if len(set(blocks[others[state]] for state in states)) != 1:
+        raise AutomatonException('The letters outside the alphabet must have the same target in every state')
+    other = others[initial]
+    if other is not None:
+        minimized.set_other_successor(ids[blocks[other]])
+    done = set()
+    for state in states:
+        block = blocks[state]
+        if block in done:
+            continue
+        done.add(block)
+        for letter, target in transitions[state]:
+            if blocks[target] != blocks[other]:
+                minimized.add_transition(ids[block], letter, ids[blocks[target]])
+        if automaton.is_final_state(state):
+            minimized.set_final_state(ids[block])
+            minimized.add_outputs(ids[block], automaton.get_outputs(state))
+    minimized.ranks_ = dict((output, automaton.get_output_rank(output)) for output in minimized.ranks_)
+    stats = automaton.get_stats()
+    return minimized.set_original_stats(stats['numStates'], stats['numTransitions'])
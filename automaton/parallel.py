@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import multiprocessing
+
+BATCH_SIZE = 256
+
+# automaton searched by the workers of the pool, set by the initializer of the pool
+automaton_ = None
+
+
+def init_worker_(automaton):
+    global automaton_
+    automaton_ = automaton
+
+
+def load_worker_(binaryFileName):
+    # the worker maps the binary file of a loaded automaton, its memory views cannot be pickled
+    from .frozen import load_binary
+    init_worker_(load_binary(binaryFileName))
+
+
+def search_batch_(batch):
+    start, documents = batch
+    return start, [automaton_.det_search(document) for document in documents]
+
+
+def iter_batches_(documents, batch_size):
+    batch = []
+    start = 0
+    for document in documents:
+        batch.append(document)
+        if len(batch) == batch_size:
+            yield start, batch
+            start += len(batch)
+            batch = []
+    if len(batch) != 0:
+        yield start, batch
+
+
+def create_pool_(automaton, workers, start_method=None, maxtasksperchild=None):
+    # the automaton is given to the initializer, so the workers respawned by the pool get it too
+    if start_method is None and 'fork' in multiprocessing.get_all_start_methods():
+        start_method = 'fork'
+    context = multiprocessing.get_context(start_method)
+    if context.get_start_method() == 'fork':
+        # the initializer arguments are inherited, the workers share the pages of the automaton
+        return context.Pool(workers, init_worker_, (automaton,), maxtasksperchild)
+    binaryFileName = automaton.get_binary_file_name()
+    if binaryFileName is not None:
+        return context.Pool(workers, load_worker_, (binaryFileName,), maxtasksperchild)
+    # the automaton is pickled once per worker
+    return context.Pool(workers, init_worker_, (automaton,), maxtasksperchild)
+
+
+def search_many(automaton, documents, workers=None, batch_size=BATCH_SIZE, ordered=True, start_method=None):
+    """
+    search many documents with a pool of processes sharing the automaton
+    :param automaton:
+    :param documents: iterable of documents
+    :param workers: number of processes, None for the number of cpus
+    :param batch_size: number of documents sent to a worker at once
+    :param ordered: if False the results are yielded as soon as they are computed
+    :param start_method: start method of the processes, None for fork when available
+    :return: generator of the det_search results of the documents in order if ordered,
+    of (document index, det_search result) otherwise
+    """
+    with create_pool_(automaton, workers, start_method) as pool:
+        batches = iter_batches_(documents, batch_size)
+        results = pool.imap(search_batch_, batches) if ordered else pool.imap_unordered(search_batch_, batches)
+        for start, outputs in results:
+            if ordered:
+                for output in outputs:
+                    yield output
+            else:
+                for i, output in enumerate(outputs, start):
+                    yield i, output
@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+from array import array
+
+
+class PatternTable:
+    """
+    patterns registered with integer ids ( 0, 1, ... in the order of addition ) and optional payloads
+    the words are stored utf-8 encoded in a single buffer, their lengths in an array
+
+    an automaton built from a PatternTable ( see build_trie ) has the ids as outputs :
+    its searches return (id, start, end), resolve maps them back to the words
+    """
+
+    def __init__(self, words=()):
+        self.data_ = bytearray()
+        self.offsets_ = array('Q', [0])
+        self.lengths_ = array('I')
+        self.bytesWords_ = None
+        self.payloads_ = None
+        for word in words:
+            self.add(word)
+
+    def add(self, word, payload=None):
+        """
+        :return: id of the pattern
+        """
+        isBytes = isinstance(word, (bytes, bytearray))
+        if self.bytesWords_ is None:
+            self.bytesWords_ = isBytes
+        elif self.bytesWords_ != isBytes:
+            raise ValueError('Patterns must be all strings or all bytes')
+        patternId = len(self.lengths_)
+        self.data_ += word if isBytes else word.encode('utf-8')
+        self.offsets_.append(len(self.data_))
+        self.lengths_.append(len(word))
+        if payload is not None and self.payloads_ is None:
+            self.payloads_ = [None] * patternId
+        if self.payloads_ is not None:
+            self.payloads_.append(payload)
+        return patternId
+
+    def __len__(self):
+        return len(self.lengths_)
+
+    def __iter__(self):
+        for patternId in range(len(self)):
+            yield self.get_word(patternId)
+
+    def items(self):
+        for patternId in range(len(self)):
+            yield patternId, self.get_word(patternId)
+
+    def get_word(self, patternId):
+        word = bytes(self.data_[self.offsets_[patternId]:self.offsets_[patternId + 1]])
+        return word if self.bytesWords_ else word.decode('utf-8')
+
+    def get_length(self, patternId):
+        return self.lengths_[patternId]
+
+    def get_max_length(self):
+        return max(self.lengths_, default=0)
+
+    def get_payload(self, patternId):
+        return None if self.payloads_ is None else self.payloads_[patternId]
+
+    def encode(self, encoding):
+        """
+        :return: PatternTable of the encoded words with the same ids and payloads
+        """
+        patterns = PatternTable()
+        for patternId, word in self.items():
+            patterns.add(word if self.bytesWords_ else word.encode(encoding), self.get_payload(patternId))
+        return patterns
+
+    def resolve(self, matches, payloads=False):
+        """
+        :param matches: list of (id, start, end)
+        :param payloads: if True, add the payload of the pattern to each match
+        :return: list of (word, start, end) or of (word, start, end, payload)
+        """
+        if payloads:
+            return [(self.get_word(patternId), start, end, self.get_payload(patternId))
+                    for patternId, start, end in matches]
+        return [(self.get_word(patternId), start, end) for patternId, start, end in matches]
+
+
+class OutputIds:
+    """
+    outputs of the states of a mutable automaton built from a PatternTable : instead of a set per state,
+    the pattern ids of each state are chained in arrays, 4 bytes per state and 8 bytes per id
+    same read interface as the dict state -> set of outputs
+    """
+
+    def __init__(self):
+        # state -> index in ids_ of the last id added to the state, -1 if the state has no output
+        self.heads_ = array('i')
+        self.ids_ = array('I')
+        # index in ids_ -> index of the previous id of the same state, -1 for the first one
+        self.previous_ = array('i')
+
+    def iter_ids_(self, state):
+        index = self.heads_[state] if state < len(self.heads_) else -1
+        while index >= 0:
+            yield self.ids_[index]
+            index = self.previous_[index]
+
+    def add(self, state, patternId):
+        if state >= len(self.heads_):
+            self.heads_.extend([-1] * (state + 1 - len(self.heads_)))
+        elif patternId in self.iter_ids_(state):
+            return
+        self.ids_.append(patternId)
+        self.previous_.append(self.heads_[state])
+        self.heads_[state] = len(self.ids_) - 1
+
+    def get(self, state, default=None):
+        ids = set(self.iter_ids_(state))
+        return ids if len(ids) != 0 else default
+
+    def __getitem__(self, state):
+        return set(self.iter_ids_(state))
+
+    def items(self):
+        for state in range(len(self.heads_)):
+            if self.heads_[state] >= 0:
+                yield state, self[state]
+
+    def values(self):
+        for _, ids in self.items():
+            yield ids
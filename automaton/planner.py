@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+from .bitparallel import ShiftAndMatcher
+from .dma import build_dma_complete
+from .dma import build_dma_default
+from .dma import get_letters
+from .encoding import encode_words
+from .frozen import freeze
+from .patterns import PatternTable
+
+SHIFT_AND = 'shift-and'
+COMPLETE = 'complete'
+DEFAULT = 'default'
+
+# crossovers measured by benchmarks.engines : the Shift-And integer ops stay cheaper than a table lookup
+# up to a few hundred pattern letters, then the complete DMA is faster as long as its table is not too large
+SHIFT_AND_MAX_BITS = 512
+# with about a hundred short patterns, the hits cost as much as the scan and the frozen DMA catches up
+SHIFT_AND_MAX_PATTERNS = 64
+COMPLETE_MAX_CELLS = 1 << 22
+
+
+def choose_engine(words):
+    """
+    :param words: list of words or PatternTable
+    :return: SHIFT_AND, COMPLETE or DEFAULT from the number of words, their total length and the size of their alphabet
+    """
+    distinct = set(words)
+    totalLength = sum(len(word) for word in distinct)
+    if totalLength <= SHIFT_AND_MAX_BITS and len(distinct) <= SHIFT_AND_MAX_PATTERNS and \
+            not isinstance(words, PatternTable):
+        return SHIFT_AND
+    # the number of states of the DMA is at most the total length of the words,
+    # its rows have a class per letter of the words plus the class of the other letters, see alphabet.get_word_classes
+    if totalLength * (len(get_letters(words)) + 1) <= COMPLETE_MAX_CELLS:
+        return COMPLETE
+    return DEFAULT
+
+
+def build_matcher(words, encoding=None, freeze_dma=True):
+    """
+    build the engine chosen by choose_engine, all have det_search, search, iter_search, contains_any and count_matches
+    the DMA is built on the letters of the words, like the Shift-And matcher, so the engines find the same matches
+    :param words: list of words or PatternTable
+    :param encoding: if not None, the words are encoded and the engine searches bytes
+    :param freeze_dma: if True, a DMA is frozen
+    :return: ShiftAndMatcher or DMA
+    """
+    if encoding is not None:
+        words = encode_words(words, encoding)
+    engine = choose_engine(words)
+    if engine == SHIFT_AND:
+        return ShiftAndMatcher(words)
+    dma = (build_dma_complete if engine == COMPLETE else build_dma_default)(words)
+    return freeze(dma) if freeze_dma else dma
@@ -0,0 +1,47 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import re
+
+from .alphabet import get_effective_target
+
+# prefilter of an automaton without one, no word matches its type
+NO_PREFILTER = ((), None)
+
+
+def build_prefilter(automaton):
+    """
+    regular expression finding the next letter leaving the initial state, det_search skips the letters before it
+    at C speed instead of following the self loops of the initial state one by one
+    the expression is a class of the letters starting a word when the letters outside the alphabet loop
+    on the initial state, the complement of the looping letters otherwise
+    :param automaton:
+    :return: (type of the words it applies to, compiled expression), NO_PREFILTER if the automaton has no prefilter
+    ( the initial state is final or the letters are not single characters or bytes )
+    """
+    initial = automaton.get_initial_state()
+    letters = automaton.get_letters()
+    if automaton.is_final_state(initial) or len(letters) == 0:
+        return NO_PREFILTER
+    if all(isinstance(letter, int) and 0 <= letter < 256 for letter in letters):
+        wordType = (bytes, bytearray)
+        escape = lambda letter: re.escape(bytes([letter]))
+        join = b''.join
+        opening, negation, closing, never = b'[', b'^', b']', b'(?!)'
+    elif all(isinstance(letter, str) and len(letter) == 1 for letter in letters):
+        wordType = str
+        escape = re.escape
+        join = ''.join
+        opening, negation, closing, never = '[', '^', ']', '(?!)'
+    else:
+        return NO_PREFILTER
+    if automaton.get_other_target(initial) == initial:
+        starting = [letter for letter in letters if get_effective_target(automaton, initial, letter) != initial]
+        if len(starting) == 0:
+            # nothing leaves the initial state
+            return wordType, re.compile(never)
+        return wordType, re.compile(join([opening] + [escape(letter) for letter in starting] + [closing]))
+    looping = [letter for letter in letters if get_effective_target(automaton, initial, letter) == initial]
+    if len(looping) == 0:
+        return NO_PREFILTER
+    return wordType, re.compile(join([opening, negation] + [escape(letter) for letter in looping] + [closing]))
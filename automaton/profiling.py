@@ -0,0 +1,114 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import json
+import time
+from collections import Counter
+
+COUNTERS = ('calls', 'letters', 'skippedLetters', 'transitions', 'defaultFallbacks', 'otherFallbacks', 'finalHits',
+            'matches')
+
+
+class SearchProfiler:
+    """
+    instrumented scan loop of an automaton : the profiler is set on the automaton ( see Automaton.set_profiler )
+    and every search of the automaton ( det_search, search, iter_search, contains_any, count_matches, search_many
+    with fork, batch_search ... ) scans through it until detach
+
+    counters :
+        calls             scans, one per search or per chunk of iter_search
+        letters           letters scanned
+        skippedLetters    letters skipped by the prefilter on the initial state
+        transitions       transitions taken
+        defaultFallbacks  letters without transition from the state, the target is given by the default successor
+                          ( see MutableTransitionMatrixWithDefaultSuccessor ) or by the failure links
+        otherFallbacks    letters outside the alphabet
+        finalHits         final states reached
+        matches           matches of the final states reached
+    latencies : histogram of the scans, bucket = power of 2 upper bound in microseconds
+    heatmap : number of visits of each state
+    """
+
+    def __init__(self, automaton):
+        self.automaton_ = automaton
+        self.reset()
+        automaton.set_profiler(self)
+
+    def detach(self):
+        self.automaton_.set_profiler(None)
+        return self
+
+    def reset(self):
+        self.counters_ = Counter(dict((name, 0) for name in COUNTERS))
+        self.latencies_ = Counter()
+        self.heatmap_ = Counter()
+        return self
+
+    def det_search(self, word):
+        return self.automaton_.det_search(word)
+
+    def scan_(self, state, word, offset, visit):
+        # see Automaton.scan_
+        start = time.perf_counter()
+        automaton = self.automaton_
+        counters = self.counters_
+        heatmap = self.heatmap_
+        prefilter = automaton.get_prefilter_(word)
+        initial = automaton.get_initial_state()
+        i = 0
+        end = len(word)
+        while i < end:
+            if prefilter is not None and state == initial:
+                match = prefilter.search(word, i)
+                counters['skippedLetters'] += (end if match is None else match.start()) - i
+                if match is None:
+                    break
+                i = match.start()
+            letter = word[i]
+            i += 1
+            counters['letters'] += 1
+            target = automaton.get_target(state, letter)
+            if target is None:
+                target = automaton.get_target_function(state, letter)
+                if target is not None:
+                    counters['defaultFallbacks'] += 1
+                else:
+                    target = automaton.get_other_target(state)
+                    if target is None:
+                        state = None
+                        break
+                    counters['otherFallbacks'] += 1
+            counters['transitions'] += 1
+            state = target
+            heatmap[state] += 1
+            if automaton.is_final_state(state):
+                counters['finalHits'] += 1
+                counters['matches'] += len(automaton.get_sorted_outputs(state))
+                if visit(state, offset + i):
+                    state = None
+                    break
+        counters['calls'] += 1
+        microseconds = (time.perf_counter() - start) * 1e6
+        self.latencies_[1 << max(0, int(microseconds)).bit_length()] += 1
+        return state
+
+    def get_counters(self):
+        return dict(self.counters_)
+
+    def get_latencies(self):
+        return dict(sorted(self.latencies_.items()))
+
+    def get_heatmap(self):
+        return dict(self.heatmap_)
+
+    def get_hottest_states(self, n=10):
+        return self.heatmap_.most_common(n)
+
+    def to_dict(self):
+        return {'counters': self.get_counters(), 'latencies': self.get_latencies(),
+                'heatmap': dict((str(state), count) for state, count in sorted(self.heatmap_.items()))}
+
+    def dump_json(self, jsonFileName):
+        with open(jsonFileName, 'w') as jsonFile:
+            json.dump(self.to_dict(), jsonFile, sort_keys=True)
+        return self
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+# match semantics of Automaton.search
+ALL = 'all'  # every match, overlapping or not ( det_search )
+NON_OVERLAPPING = 'non-overlapping'  # the match ending first, the longest one, then the next match after it ...
+LEFTMOST_LONGEST = 'leftmost-longest'  # the match starting first, the longest one, then the next match after it ...
+LEFTMOST_FIRST = 'leftmost-first'  # the match starting first, of the first added word, then the next match after it ...
+
+
+class AllMatches:
+    """
+    sink of the matches appended by det_search_, in the order of their end positions
+    """
+
+    def __init__(self):
+        self.matches_ = []
+
+    def append(self, match):
+        self.matches_.append(match)
+
+    def reach(self, end, state):
+        # the scan reached state at position end, None if it is stopped
+        pass
+
+    def pop_matches(self):
+        # matches resolved so far
+        matches = self.matches_
+        self.matches_ = []
+        return matches
+
+    def finish(self):
+        return self.pop_matches()
+
+
+class NonOverlappingMatches(AllMatches):
+    def __init__(self):
+        AllMatches.__init__(self)
+        self.end_ = 0
+        self.candidate_ = None
+
+    def append(self, match):
+        if self.candidate_ is not None and match[2] != self.candidate_[2]:
+            self.commit_()
+        if match[1] >= self.end_ and (self.candidate_ is None or match[1] < self.candidate_[1]):
+            self.candidate_ = match
+
+    def reach(self, end, state):
+        # the next matches end after the candidate
+        if self.candidate_ is not None:
+            self.commit_()
+
+    def commit_(self):
+        self.matches_.append(self.candidate_)
+        self.end_ = self.candidate_[2]
+        self.candidate_ = None
+
+    def finish(self):
+        if self.candidate_ is not None:
+            self.commit_()
+        return self.pop_matches()
+
+
+class LeftmostMatches(AllMatches):
+    """
+    the matches are kept until no match starting before them can be found,
+    i.e. until the scan is more than the maximal output length after their start,
+    or when the scan reaches a state, more than the depth of the state after their start
+    """
+
+    def __init__(self, maxLength, key, depth):
+        AllMatches.__init__(self)
+        self.maxLength_ = maxLength
+        self.key_ = key
+        # state -> max length of the beginnings of words ending in the state, None if unknown
+        self.depth_ = depth
+        self.end_ = 0
+        self.pending_ = []
+
+    def append(self, match):
+        self.resolve_(match[2] - self.maxLength_)
+        if match[1] >= self.end_:
+            self.pending_.append(match)
+
+    def reach(self, end, state):
+        if state is None:
+            self.resolve_(float('inf'))
+        elif len(self.pending_) != 0:
+            depth = self.depth_(state)
+            self.resolve_(end - (self.maxLength_ if depth is None else min(depth, self.maxLength_)))
+
+    def resolve_(self, bound):
+        # commit the best pending matches starting before bound
+        while len(self.pending_) != 0:
+            start = min(match[1] for match in self.pending_)
+            if start >= bound:
+                return
+            best = min((match for match in self.pending_ if match[1] == start), key=self.key_)
+            self.matches_.append(best)
+            self.end_ = best[2]
+            self.pending_ = [match for match in self.pending_ if match[1] >= self.end_]
+
+    def finish(self):
+        self.resolve_(float('inf'))
+        return self.pop_matches()
+
+
+def create_matches(automaton, semantics):
+    """
+    :return: sink resolving the matches found by automaton according to semantics
+    """
+    if semantics == ALL:
+        return AllMatches()
+    if semantics == NON_OVERLAPPING:
+        return NonOverlappingMatches()
+    if semantics == LEFTMOST_LONGEST:
+        return LeftmostMatches(automaton.get_max_output_length(), lambda match: -match[2], automaton.get_state_depth)
+    if semantics == LEFTMOST_FIRST:
+        return LeftmostMatches(automaton.get_max_output_length(),
+                               lambda match: automaton.get_output_rank(match[0]), automaton.get_state_depth)
+    raise ValueError('Unknown match semantics : %s' % str(semantics))
@@ -0,0 +1,43 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import codecs
+
+CHUNK_SIZE = 1 << 16
+
+
+def iter_chunks(source, chunk_size=CHUNK_SIZE):
+    """
+    :param source: a string, an iterable of chunks or a file object
+    :param chunk_size: size of the chunks read from a file object
+    :return: generator of the chunks of source
+    """
+    if isinstance(source, (str, bytes, bytearray, memoryview)):
+        yield source
+    elif hasattr(source, 'read'):
+        chunk = source.read(chunk_size)
+        while len(chunk) != 0:
+            yield chunk
+            chunk = source.read(chunk_size)
+    else:
+        for chunk in source:
+            yield chunk
+
+
+def decode_chunks(chunks, encoding='utf-8'):
+    """
+    decode the bytes chunks, a character split between two chunks is decoded once
+    :param chunks:
+    :param encoding: None to keep the bytes chunks
+    :return: generator of decoded chunks
+    """
+    if encoding is None:
+        for chunk in chunks:
+            yield chunk
+        return
+    decoder = codecs.getincrementaldecoder(encoding)()
+    for chunk in chunks:
+        yield chunk if isinstance(chunk, str) else decoder.decode(chunk)
+    rest = decoder.decode(b'', True)
+    if len(rest) != 0:
+        yield rest
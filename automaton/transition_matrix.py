@@ -1,13 +1,23 @@
 # -*- coding: utf-8 -*-
 # @author <lambda.coder@gmail.com>
 
-import copy
+from array import array
+from bisect import bisect_left
+from bisect import insort
+from collections import Counter
+
+# max number of transitions of a state kept in sorted arrays, the larger states use a dict
+MAX_SORTED_TRANSITIONS = 8
 
 
 class MutableTransitionMatrix:
     def __init__(self, initial):
         self.tm_ = {initial: {}}
         self.lastState_ = initial
+        # kept up to date by add_transition
+        self.numTransitions_ = 0
+        self.letterCounts_ = Counter()
+        self.sortedLetters_ = []
 
     def add_state(self):
         self.lastState_ += 1
@@ -16,9 +26,20 @@ class MutableTransitionMatrix:
         return new
 
     def add_transition(self, source, letter, target):
-        self.tm_[source][letter] = target
+        successors = self.tm_[source]
+        if letter not in successors:
+            count_transition_(self, letter)
+        successors[letter] = target
         return self
 
+    def add_states_(self, successors, letterCounts):
+        # states added after the last one with their transitions, see trie.build_trie_parallel
+        first = self.lastState_ + 1
+        self.tm_.update(zip(range(first, first + len(successors)), successors))
+        self.lastState_ += len(successors)
+        add_letter_counts_(self, letterCounts)
+        return first
+
     def get_target(self, source, letter):
         successors = self.tm_.get(source, None)
         if successors is None:
@@ -28,23 +49,45 @@ class MutableTransitionMatrix:
     def get_transitions(self, source):
         return self.tm_[source]
 
+    def iter_transitions(self):
+        for source, successors in self.tm_.items():
+            for letter, target in successors.items():
+                yield source, letter, target
+
     def get_num_transitions(self):
-        return sum(len(transitions) for transitions in self.tm_.values())
+        return self.numTransitions_
+
+    def get_letter_counts(self):
+        return Counter(self.letterCounts_)
 
     def has_state(self, state):
         return state in self.tm_
 
     def get_num_states(self):
-        return len(self.tm_.keys())
+        return len(self.tm_)
 
     def get_states(self):
-        return sorted(self.tm_.keys())
+        # the states are added in increasing order
+        return list(self.tm_)
 
     def get_letters(self):
-        return sorted(set(letter for successors in self.tm_.values() for letter in successors.keys()))
+        return list(self.sortedLetters_)
 
     def to_dict(self):
-        return copy.deepcopy(self.tm_)
+        return dict((state, dict(successors)) for state, successors in self.tm_.items())
+
+
+def count_transition_(matrix, letter):
+    matrix.numTransitions_ += 1
+    if matrix.letterCounts_[letter] == 0:
+        insort(matrix.sortedLetters_, letter)
+    matrix.letterCounts_[letter] += 1
+
+
+def add_letter_counts_(matrix, letterCounts):
+    matrix.numTransitions_ += sum(letterCounts.values())
+    matrix.letterCounts_.update(letterCounts)
+    matrix.sortedLetters_ = sorted(matrix.letterCounts_)
 
 
 class MutableTransitionMatrixWithDefaultSuccessor(MutableTransitionMatrix):
@@ -57,11 +100,275 @@ class MutableTransitionMatrixWithDefaultSuccessor(MutableTransitionMatrix):
         return self.defaultSuccessor_ if target is None else target
 
     def to_dict(self):
-        tm = copy.deepcopy(self.tm_)
-        letters = self.get_letters()
-        states = self.get_states()
-        for state in states:
-            for letter in letters:
-                if self.get_target(state, letter) is None:
-                    tm[state][letter] = self.defaultSuccessor_
+        default = dict.fromkeys(self.sortedLetters_, self.defaultSuccessor_)
+        tm = {}
+        for state, successors in self.tm_.items():
+            tm[state] = dict(default)
+            tm[state].update(successors)
         return tm
+
+
+class SortedTransitions:
+    __slots__ = ('letters_', 'targets_')
+
+    def __init__(self, letters, targets):
+        self.letters_ = letters
+        self.targets_ = targets
+
+    def get_target(self, letter):
+        i = bisect_left(self.letters_, letter)
+        if i != len(self.letters_) and self.letters_[i] == letter:
+            return self.targets_[i]
+        return None
+
+    def add_transition(self, letter, target):
+        i = bisect_left(self.letters_, letter)
+        if i != len(self.letters_) and self.letters_[i] == letter:
+            self.targets_[i] = target
+        else:
+            self.letters_.insert(i, letter)
+            self.targets_.insert(i, target)
+
+    def items(self):
+        return zip(self.letters_, self.targets_)
+
+    def __len__(self):
+        return len(self.letters_)
+
+
+class CompactTransitionMatrix:
+    """
+    transition matrix with the interface of MutableTransitionMatrix using a few bytes per state :
+    the letter of a state with a single transition is kept in letters_ and its target in targets_,
+    a state with up to MAX_SORTED_TRANSITIONS transitions keeps them in sorted parallel arrays,
+    only the larger states use a dict
+    """
+    def __init__(self, initial):
+        self.initial_ = initial
+        # state - initial -> None, letter of the single transition, SortedTransitions or dict
+        self.letters_ = [None]
+        self.targets_ = array('i', [-1])
+        self.numTransitions_ = 0
+        self.letterCounts_ = Counter()
+        self.sortedLetters_ = []
+
+    def add_state(self):
+        self.letters_.append(None)
+        self.targets_.append(-1)
+        return self.initial_ + len(self.letters_) - 1
+
+    def add_states_(self, successors, letterCounts):
+        # states added after the last one with their transitions, see trie.build_trie_parallel
+        first = self.initial_ + len(self.letters_)
+        for transitions in successors:
+            if len(transitions) == 0:
+                self.letters_.append(None)
+                self.targets_.append(-1)
+            elif len(transitions) == 1:
+                for letter, target in transitions.items():
+                    self.letters_.append(letter)
+                    self.targets_.append(target)
+            elif len(transitions) <= MAX_SORTED_TRANSITIONS:
+                letters = sorted(transitions)
+                targets = array('i', [transitions[letter] for letter in letters])
+                self.letters_.append(SortedTransitions(letters, targets))
+                self.targets_.append(-1)
+            else:
+                self.letters_.append(dict(transitions))
+                self.targets_.append(-1)
+        add_letter_counts_(self, letterCounts)
+        return first
+
+    def get_index_(self, state):
+        i = state - self.initial_
+        if i < 0 or i >= len(self.letters_):
+            raise RuntimeError('Unknown source state : %s' % str(state))
+        return i
+
+    def add_transition(self, source, letter, target):
+        i = self.get_index_(source)
+        transitions = self.letters_[i]
+        if self.get_target(source, letter) is None:
+            count_transition_(self, letter)
+        if transitions is None:
+            self.letters_[i] = letter
+            self.targets_[i] = target
+        elif isinstance(transitions, SortedTransitions):
+            transitions.add_transition(letter, target)
+            if len(transitions) > MAX_SORTED_TRANSITIONS:
+                self.letters_[i] = dict(transitions.items())
+        elif isinstance(transitions, dict):
+            transitions[letter] = target
+        elif transitions == letter:
+            self.targets_[i] = target
+        else:
+            self.letters_[i] = SortedTransitions([transitions], array('i', [self.targets_[i]]))
+            self.letters_[i].add_transition(letter, target)
+            self.targets_[i] = -1
+        return self
+
+    def get_target(self, source, letter):
+        i = self.get_index_(source)
+        transitions = self.letters_[i]
+        if transitions is None:
+            return None
+        if isinstance(transitions, SortedTransitions):
+            return transitions.get_target(letter)
+        if isinstance(transitions, dict):
+            return transitions.get(letter, None)
+        return self.targets_[i] if transitions == letter else None
+
+    def get_transitions(self, source):
+        i = self.get_index_(source)
+        transitions = self.letters_[i]
+        if transitions is None:
+            return {}
+        if isinstance(transitions, (SortedTransitions, dict)):
+            return dict(transitions.items())
+        return {transitions: self.targets_[i]}
+
+    def iter_transitions(self):
+        for state in self.get_states():
+            for letter, target in self.get_transitions(state).items():
+                yield state, letter, target
+
+    def get_num_transitions(self):
+        return self.numTransitions_
+
+    def get_letter_counts(self):
+        return Counter(self.letterCounts_)
+
+    def has_state(self, state):
+        return 0 <= state - self.initial_ < len(self.letters_)
+
+    def get_num_states(self):
+        return len(self.letters_)
+
+    def get_states(self):
+        return list(range(self.initial_, self.initial_ + len(self.letters_)))
+
+    def get_letters(self):
+        return list(self.sortedLetters_)
+
+    def to_dict(self):
+        return {state: self.get_transitions(state) for state in self.get_states()}
+
+
+class LetterClassTransitionMatrix:
+    """
+    transition matrix with the interface of MutableTransitionMatrix storing one row of targets per state,
+    indexed by the class ids of the letters ( see alphabet.get_word_classes ) :
+    the letters of a class share their transitions, a missing transition is stored as -1
+    a letter added after the construction gets its own class and widens every row
+    """
+    def __init__(self, initial, letterIds, width):
+        self.initial_ = initial
+        self.letterIds_ = dict(letterIds)
+        # class id -> letters of the class
+        self.classLetters_ = [[] for _ in range(width)]
+        for letter, classId in sorted(self.letterIds_.items()):
+            self.classLetters_[classId].append(letter)
+        self.rows_ = [array('i', [-1]) * width]
+        self.numTransitions_ = 0
+        # classes with at least one transition
+        self.usedClasses_ = set()
+
+    def get_width(self):
+        return len(self.classLetters_)
+
+    def add_state(self):
+        self.rows_.append(array('i', [-1]) * len(self.classLetters_))
+        return self.initial_ + len(self.rows_) - 1
+
+    def get_row_(self, state):
+        i = state - self.initial_
+        if i < 0 or i >= len(self.rows_):
+            raise RuntimeError('Unknown source state : %s' % str(state))
+        return self.rows_[i]
+
+    def set_rows_(self, rows):
+        # rows built by build_dma_complete, one per state from the initial state
+        self.rows_ = rows
+        self.numTransitions_ = 0
+        unused = set(range(len(self.classLetters_)))
+        for row in rows:
+            self.numTransitions_ += len(row) - row.count(-1)
+            if len(unused) != 0:
+                unused = set(classId for classId in unused if row[classId] < 0)
+        self.usedClasses_ = set(range(len(self.classLetters_))) - unused
+        # the classes of the letters outside the words may have several letters or none
+        for classId in self.usedClasses_:
+            numLetters = len(self.classLetters_[classId])
+            if numLetters != 1:
+                self.numTransitions_ += (numLetters - 1) * sum(1 for row in rows if row[classId] >= 0)
+        return self
+
+    def add_class_(self, letter, previous):
+        # new class of letter, its transitions are copied from its previous class if any
+        classId = len(self.classLetters_)
+        for row in self.rows_:
+            row.append(-1 if previous is None else row[previous])
+        if previous is not None:
+            self.classLetters_[previous].remove(letter)
+            if previous in self.usedClasses_:
+                self.usedClasses_.add(classId)
+        self.classLetters_.append([letter])
+        self.letterIds_[letter] = classId
+        return classId
+
+    def add_transition(self, source, letter, target):
+        row = self.get_row_(source)
+        classId = self.letterIds_.get(letter, None)
+        if classId is None or len(self.classLetters_[classId]) != 1:
+            classId = self.add_class_(letter, classId)
+        if row[classId] < 0:
+            self.numTransitions_ += 1
+        row[classId] = target
+        self.usedClasses_.add(classId)
+        return self
+
+    def get_target(self, source, letter):
+        row = self.get_row_(source)
+        classId = self.letterIds_.get(letter, None)
+        if classId is None or row[classId] < 0:
+            return None
+        return row[classId]
+
+    def get_transitions(self, source):
+        row = self.get_row_(source)
+        return dict((letter, row[classId]) for classId in sorted(self.usedClasses_) if row[classId] >= 0
+                    for letter in self.classLetters_[classId])
+
+    def iter_transitions(self):
+        for state in self.get_states():
+            for letter, target in self.get_transitions(state).items():
+                yield state, letter, target
+
+    def get_num_transitions(self):
+        return self.numTransitions_
+
+    def get_letter_counts(self):
+        counts = Counter()
+        for classId in self.usedClasses_:
+            count = sum(1 for row in self.rows_ if row[classId] >= 0)
+            for letter in self.classLetters_[classId]:
+                counts[letter] = count
+        return counts
+
+    def get_letter_classes(self):
+        return dict(self.letterIds_), len(self.classLetters_)
+
+    def has_state(self, state):
+        return isinstance(state, int) and 0 <= state - self.initial_ < len(self.rows_)
+
+    def get_num_states(self):
+        return len(self.rows_)
+
+    def get_states(self):
+        return list(range(self.initial_, self.initial_ + len(self.rows_)))
+
+    def get_letters(self):
+        return sorted(letter for classId in self.usedClasses_ for letter in self.classLetters_[classId])
+
+    def to_dict(self):
+        return {state: self.get_transitions(state) for state in self.get_states()}
@@ -1,20 +1,183 @@
 # -*- coding: utf-8 -*-
 # @author <lambda.coder@gmail.com>
 
+from collections import Counter
+from os.path import commonprefix
+
+from .automaton import AutomatonException
 from .automaton import MutableAutomaton
+from .encoding import encode_words
+from .patterns import PatternTable
 
 
-def build_trie(words, fst_factory=MutableAutomaton):
+def build_trie(words, fst_factory=MutableAutomaton, encoding=None, workers=None, weights=None, wildcard=None):
+    """
+    :param words: iterable of words or PatternTable, the outputs are then the ids of the patterns
+    :param fst_factory:
+    :param encoding: if not None, the words are encoded and the letters of the trie are bytes
+    :param workers: if not None, number of processes building the trie, see build_trie_parallel
+    :param weights: if not None, iterable of the weights of the words used by complete,
+    each state keeps the max weight of the words going through it
+    :param wildcard: must be None, an AutomatonException is raised otherwise : a trie has no wildcard transitions,
+    the patterns with wildcards are matched by wildcard.build_wildcard_matcher
+    :return: trie of the words
+    """
+    if wildcard is not None:
+        raise AutomatonException('A trie has no wildcard transitions, use wildcard.build_wildcard_matcher')
+    if encoding is not None:
+        words = encode_words(words, encoding)
+    if workers is not None:
+        if weights is not None:
+            raise AutomatonException('Weighted words are not supported by the parallel build')
+        return build_trie_parallel(words, fst_factory, workers)
     automaton = fst_factory()
-    for word in words:
+    if isinstance(words, PatternTable):
+        automaton.set_patterns(words)
+        outputs = ((word, patternId) for patternId, word in words.items())
+    else:
+        outputs = ((word, word) for word in words)
+    if weights is not None:
+        weights = iter(weights)
+    for word, output in outputs:
+        weight = None if weights is None else next(weights)
         if len(word) != 0:
             state = automaton.get_initial_state()
+            if weight is not None:
+                automaton.set_max_weight(state, weight)
             for letter in word:
                 target = automaton.get_target(state, letter)
                 if target is None:
                     target = automaton.add_state()
                     automaton.add_transition(state, letter, target)
                 state = target
+                if weight is not None:
+                    automaton.set_max_weight(state, weight)
             automaton.set_final_state(state)
-            automaton.add_output(state, word)
+            automaton.add_output(state, output)
+            if weight is not None:
+                automaton.set_weight(state, weight)
     return automaton
+
+
+def build_sub_trie_(task):
+    # the states of the sub-trie are numbered from offset + 1 in the order of their creation,
+    # 0 is the root shared by all the sub-tries
+    offset, partition = task
+    root = {}
+    successors = []  # transitions of the states offset + 1, offset + 2, ...
+    finals = []
+    for index, word in partition:
+        transitions = root
+        state = 0
+        for letter in word:
+            state = transitions.get(letter, None)
+            if state is None:
+                successors.append({})
+                state = offset + len(successors)
+                transitions[letter] = state
+            transitions = successors[state - offset - 1]
+        finals.append((index, state))
+    letterCounts = Counter(letter for transitions in successors for letter in transitions)
+    return root, successors, letterCounts, finals
+
+
+def count_prefixes_(partition):
+    # number of states of the sub-trie of a partition : its distinct non empty prefixes
+    words = sorted(set(word for _, word in partition))
+    numPrefixes = len(words[0])
+    for previous, word in zip(words, words[1:]):
+        numPrefixes += len(word) - len(commonprefix((previous, word)))
+    return numPrefixes
+
+
+def build_partition_(connection, partition):
+    # process of a partition : it sends the number of states of its sub-trie, receives its offset
+    # and sends its sub-trie, so the partition is given once to the process
+    try:
+        connection.send(count_prefixes_(partition))
+        connection.send(build_sub_trie_((connection.recv(), partition)))
+    except Exception as e:
+        connection.send(e)
+    finally:
+        connection.close()
+
+
+def receive_(connection):
+    # object sent by build_partition_, its exception is raised again in the parent process
+    received = connection.recv()
+    if isinstance(received, Exception):
+        raise received
+    return received
+
+
+def partition_words_(words, numPartitions):
+    # the words are grouped by first letter so that the sub-tries only share the root,
+    # the groups are dealt to the partitions from the largest one to balance their sizes
+    groups = {}
+    for index, word in enumerate(words):
+        if len(word) != 0:
+            groups.setdefault(word[0], []).append((index, word))
+    partitions = [[] for _ in range(numPartitions)]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(partitions, key=len).extend(group)
+    return [partition for partition in partitions if len(partition) != 0]
+
+
+def build_trie_parallel(words, fst_factory=MutableAutomaton, workers=None):
+    """
+    build the sub-tries of the words partitioned by first letter in a process per partition
+    and append them to a trie equivalent to the one of build_trie :
+    each process counts the states of its sub-trie and receives its offset, so it numbers its states
+    from the right offset and its transitions are added as they are, without going through add_transition
+    multiprocessing is only imported by the first call
+    the outputs are added in the order of the words so the ranks of the outputs are kept
+    :param words: list of words or PatternTable
+    :param fst_factory:
+    :param workers: max number of processes, None for the sequential build as in build_trie
+    :return: trie of the words
+    """
+    if workers is None:
+        return build_trie(words, fst_factory)
+    automaton = fst_factory()
+    if isinstance(words, PatternTable):
+        automaton.set_patterns(words)
+        outputs = range(len(words))
+    else:
+        words = words if isinstance(words, list) else list(words)
+        outputs = words
+    initial = automaton.get_initial_state()
+    partitions = partition_words_(words, workers)
+    finals = [None] * len(words)
+    import multiprocessing
+    connections = []
+    processes = []
+    try:
+        for partition in partitions:
+            connection, child = multiprocessing.Pipe()
+            process = multiprocessing.Process(target=build_partition_, args=(child, partition), daemon=True)
+            process.start()
+            child.close()
+            connections.append(connection)
+            processes.append(process)
+        offset = initial
+        for connection in connections:
+            numStates = receive_(connection)
+            connection.send(offset)
+            offset += numStates
+        for connection in connections:
+            root, successors, letterCounts, subFinals = receive_(connection)
+            automaton.add_states_(successors, letterCounts)
+            for letter, target in root.items():
+                automaton.add_transition(initial, letter, target)
+            for index, state in subFinals:
+                finals[index] = state
+    except BaseException:
+        for process in processes:
+            process.terminate()
+        raise
+    finally:
+        for connection in connections:
+            connection.close()
+        for process in processes:
+            process.join()
+    return automaton.add_final_outputs_(finals, outputs)
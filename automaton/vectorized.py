@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+try:
+    import numpy
+except ImportError:  # numpy is optional, only batch_search needs it
+    numpy = None
+
+from .alphabet import OTHER_CLASS
+from .automaton import AutomatonException
+from .frozen import FrozenAutomaton
+from .frozen import freeze
+
+
+def get_class_ids_(matrix, words):
+    # class ids of the letters of the concatenated words
+    if all(isinstance(word, (bytes, bytearray)) for word in words):
+        if matrix.byteIds_ is None:
+            raise AutomatonException('Bytes can only be searched by an automaton with bytes letters')
+        codes = numpy.frombuffer(b''.join(words), dtype=numpy.uint8)
+        return numpy.frombuffer(matrix.byteIds_, dtype=numpy.uint8)[codes]
+    if not all(isinstance(letter, str) and len(letter) == 1 for letter in matrix.letters_):
+        raise AutomatonException('Strings can only be searched by an automaton with characters letters')
+    codes = numpy.frombuffer(''.join(words).encode('utf-32-le'), dtype=numpy.uint32)
+    # lookup table of the code points up to the greatest letter, the last entry is for the greater code points
+    size = max([ord(letter) for letter in matrix.letters_], default=-1) + 2
+    lookup = numpy.full(size, OTHER_CLASS, dtype=numpy.int32)
+    for letter, classId in matrix.letterIds_.items():
+        lookup[ord(letter)] = classId
+    return lookup[numpy.minimum(codes, size - 1)]
+
+
+def batch_search(automaton, words):
+    """
+    search many short words at once : the words are encoded in a padded matrix of letter classes
+    and the transition table of the frozen automaton is applied to all the words position by position
+    :param automaton: FrozenAutomaton, other automata are frozen first
+    :param words: list of strings or list of bytes
+    :return: list of the det_search results of the words
+    """
+    if numpy is None:
+        raise ImportError('batch_search requires numpy')
+    if automaton.get_profiler() is not None:
+        # the words of a profiled automaton are scanned one by one, so the profiler sees their letters
+        return [automaton.det_search(word) for word in words]
+    if not isinstance(automaton, FrozenAutomaton):
+        automaton = freeze(automaton)
+    words = list(words)
+    matrix = automaton.transitionMatrix_
+    numStates = matrix.get_num_states()
+    width = matrix.width_ + 1
+    # the state numStates is a sink replacing the missing transitions,
+    # the last column is the padding of the words : it keeps the state unchanged
+    table = numpy.empty((numStates + 1, width), dtype=numpy.int32)
+    table[:numStates, :-1] = numpy.asarray(matrix.table_, dtype=numpy.int32).reshape(numStates, width - 1)
+    table[table < 0] = numStates
+    table[numStates, :] = numStates
+    table[:, -1] = numpy.arange(numStates + 1)
+    table = table.ravel()
+    finals = numpy.zeros(numStates + 1, dtype=bool)
+    finals[:numStates] = numpy.unpackbits(numpy.frombuffer(bytes(automaton.finals_), dtype=numpy.uint8),
+                                          bitorder='little')[:numStates]
+    # one row per position, one column per word
+    lengths = numpy.array([len(word) for word in words], dtype=numpy.int64)
+    classes = numpy.full((int(lengths.max(initial=0)), len(words)), width - 1, dtype=numpy.int32)
+    if lengths.sum() != 0:
+        starts = numpy.cumsum(lengths) - lengths
+        columns = numpy.repeat(numpy.arange(len(words)), lengths)
+        rows = numpy.arange(lengths.sum()) - numpy.repeat(starts, lengths)
+        classes[rows, columns] = get_class_ids_(matrix, words)
+    visited = numpy.empty(classes.shape, dtype=numpy.int32)
+    states = numpy.full(len(words), automaton.get_initial_state(), dtype=numpy.int32)
+    for position in range(classes.shape[0]):
+        states = table[states * width + classes[position]]
+        visited[position] = states
+    hits = finals[visited]
+    hits &= numpy.arange(classes.shape[0])[:, None] < lengths
+    outputs = [[] for _ in words]
+    stateOutputs = automaton.output_
+    length = automaton.get_output_length_function()
+    indices, positions = numpy.nonzero(hits.T)
+    for index, i, state in zip(indices.tolist(), (positions + 1).tolist(), visited[positions, indices].tolist()):
+        for x in stateOutputs[state]:
+            outputs[index].append((x, i - length(x), i))
+    return outputs
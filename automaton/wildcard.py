@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import re
+
+from .automaton import AutomatonException
+from .bitparallel import ShiftAndMatcher
+
+WILDCARD = '?'
+# the letter after it is a literal letter, e.g. a literal wildcard
+ESCAPE = '\\'
+# bound of the total length of the variants of the patterns, i.e. of the size of the state of a WildcardMatcher
+MAX_BITS = 1 << 16
+
+
+def parse_pattern(pattern, wildcard=WILDCARD, escape=ESCAPE):
+    """
+    :param pattern: letters, wildcard matching any letter, wildcard{n} or wildcard{m,n} matching m to n letters,
+    escape followed by a letter matching this letter, e.g. a literal wildcard
+    :param wildcard:
+    :param escape:
+    :return: list of letters and (min, max) gaps
+    """
+    gap = re.compile(r'%s(?:\{(\d+)(?:,(\d+))?\})?' % re.escape(wildcard))
+    elements = []
+    i = 0
+    while i < len(pattern):
+        if pattern[i] == escape:
+            if i + 1 == len(pattern):
+                raise ValueError('Bad escape at the end of pattern %s' % pattern)
+            elements.append(pattern[i + 1])
+            i += 2
+            continue
+        match = gap.match(pattern, i)
+        if match is None:
+            elements.append(pattern[i])
+            i += 1
+            continue
+        low = 1 if match.group(1) is None else int(match.group(1))
+        high = low if match.group(2) is None else int(match.group(2))
+        if low > high:
+            raise ValueError('Bad gap in pattern %s : %s' % (pattern, match.group(0)))
+        elements.append((low, high))
+        i = match.end()
+    return elements
+
+
+def get_variants_(elements):
+    # fixed length variants of the elements of a pattern, None for the letters matched by a wildcard
+    variants = [()]
+    for element in elements:
+        if isinstance(element, tuple):
+            low, high = element
+            variants = [variant + (None,) * n for variant in variants for n in range(low, high + 1)]
+        else:
+            variants = [variant + (element,) for variant in variants]
+    # the variants of several gap lengths may be the same
+    return [variant for variant in dict.fromkeys(variants) if len(variant) != 0]
+
+
+def count_bits_(elements, size):
+    # total length of the variants of the elements of a pattern without expanding them, size(letter) being its length
+    counts = {0: 1}
+    for element in elements:
+        lengths = range(element[0], element[1] + 1) if isinstance(element, tuple) else (size(element),)
+        shifted = {}
+        for length, count in counts.items():
+            for n in lengths:
+                shifted[length + n] = shifted.get(length + n, 0) + count
+        counts = shifted
+    return sum(length * count for length, count in counts.items())
+
+
+def expand_pattern(pattern, wildcard=WILDCARD, escape=ESCAPE):
+    """
+    :return: list of the fixed length variants of pattern, the gaps being replaced by wildcards,
+    e.g. ['foobar', 'foo?bar', 'foo??bar'] for foo?{0,2}bar, the literal wildcards stay escaped
+    """
+    return [''.join(wildcard if letter is None else escape + letter if letter in (wildcard, escape) else letter
+                    for letter in variant) for variant in get_variants_(parse_pattern(pattern, wildcard, escape))]
+
+
+class WildcardMatcher(ShiftAndMatcher):
+    """
+    matcher of patterns with wildcards and bounded gaps with the search interface of the automata
+    the fixed length variants of the patterns ( see expand_pattern ) are laid in the bits of a ShiftAndMatcher,
+    a wildcard position is in the masks of all the letters and in the mask of the other letters :
+    the state is the set of the positions reached by the text, so there is no subset construction
+    and the size of the state is the total length of the variants
+    the outputs are the patterns, each match being as long as the variant of the pattern it comes from
+    the number of variants grows with the product of the widths of the gaps of a pattern, so the size of the state
+    is bounded by max_bits
+    """
+
+    def __init__(self, words, letters=None, encoding=None, wildcard=WILDCARD, escape=ESCAPE, max_bits=MAX_BITS):
+        ShiftAndMatcher.__init__(self, [])
+        # final bits -> tuple of the sorted (output, length), computed on the first hit
+        self.sortedMatches_ = {}
+        for word in words:
+            output = word if encoding is None else word.encode(encoding)
+            if output in self.ranks_:
+                continue
+            self.ranks_[output] = len(self.ranks_)
+            elements = parse_pattern(word, wildcard, escape)
+            size = len if encoding is None else lambda letter: len(letter.encode(encoding))
+            if self.numBits_ + count_bits_(elements, size) > max_bits:
+                raise AutomatonException('The variants of pattern %s exceed %d bits' % (word, max_bits))
+            for variant in get_variants_(elements):
+                if encoding is not None:
+                    # a wildcard matches a single byte
+                    variant = [byte for letter in variant
+                               for byte in ((None,) if letter is None else letter.encode(encoding))]
+                self.add_pattern_(variant, output)
+        # the letters of the patterns outside letters only match the wildcards
+        self.masks_ = dict((letter, mask | self.otherMask_) for letter, mask in self.masks_.items()
+                           if letters is None or letter in letters)
+
+    def get_output_length_function(self):
+        raise AutomatonException('The length of a match depends on the variant of its pattern')
+
+    def get_max_output_length(self):
+        return max(self.depths_, default=0)
+
+    def get_sorted_matches_(self, hits):
+        # (output, length) of the final bits of the state, by output then by start
+        matches = self.sortedMatches_.get(hits, None)
+        if matches is None:
+            matches = []
+            bits = hits
+            while bits != 0:
+                bit = bits & -bits
+                position = bit.bit_length() - 1
+                matches.append((self.outputs_[position], self.depths_[position]))
+                bits ^= bit
+            matches = self.sortedMatches_[hits] = tuple(sorted(matches, key=lambda match: (match[0], -match[1])))
+        return matches
+
+    def det_search_(self, state, word, offset, outputs):
+        # see Automaton.det_search_, the length of a match is the one of its variant
+        get_sorted_matches = self.get_sorted_matches_
+        append = outputs.append
+
+        def visit(hits, end):
+            for output, length in get_sorted_matches(hits):
+                append((output, end - length, end))
+
+        return self.scan_(state, word, offset, visit)
+
+
+def build_wildcard_matcher(words, letters=None, encoding=None, wildcard=WILDCARD, escape=ESCAPE, max_bits=MAX_BITS):
+    """
+    build a matcher of patterns with wildcards and bounded gaps, with the search methods of a DMA
+    it is not an automaton : it can not be frozen, dumped or loaded
+    :param words: patterns, see parse_pattern
+    :param letters: alphabet of the patterns, None for the letters of the patterns
+    :param encoding: if not None, the patterns are encoded and the matcher searches bytes,
+    a wildcard then matches a single byte
+    :param wildcard: single letter
+    :param escape: single letter, see parse_pattern
+    :param max_bits: bound of the total length of the variants of the patterns,
+    an AutomatonException is raised above it
+    :return: WildcardMatcher, its outputs are the patterns ( encoded if encoding is not None )
+    """
+    return WildcardMatcher(words, letters, encoding, wildcard, escape, max_bits)
+
+
+def to_regex(pattern, wildcard=WILDCARD, escape=ESCAPE):
+    """
+    :return: regular expression string matching the same texts as pattern
+    """
+    return ''.join('.' if element == (1, 1) else '.{%d,%d}' % element if isinstance(element, tuple)
+                   else re.escape(element) for element in parse_pattern(pattern, wildcard, escape))
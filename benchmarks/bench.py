@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+"""
+benchmark of the construction and the search of the automata on synthetic dictionaries and texts
+
+    python -m benchmarks.bench --preset small --output results.jsonl
+    python -m benchmarks.bench --preset small --compare results.jsonl
+
+each dictionary is benchmarked in its own process, so that the reported peak RSS is its own
+"""
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import time
+
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.frozen import freeze
+from automaton.trie import build_trie
+
+from .generators import ALPHABETS
+from .generators import generate_chunks
+from .generators import generate_words
+from .generators import iter_text
+
+CHUNK_SIZE = 1 << 20
+
+PRESETS = {
+    'small': {'patterns': [1000, 10000], 'text_sizes': [1 << 20], 'alphabets': ['dna', 'latin', 'cjk']},
+    'medium': {'patterns': [1000, 10000, 100000], 'text_sizes': [1 << 20, 1 << 26],
+               'alphabets': ['dna', 'latin', 'cjk']},
+    'large': {'patterns': [1000, 10000, 100000, 1000000], 'text_sizes': [1 << 20, 1 << 27, 1 << 30],
+              'alphabets': ['dna', 'latin', 'cjk']},
+}
+
+
+def get_peak_rss():
+    # ru_maxrss is in kilobytes on linux and in bytes on macOS
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss if sys.platform == 'darwin' else rss * 1024
+
+
+def timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def count_matches(automaton, chunks):
+    return sum(1 for _ in automaton.iter_search(chunks))
+
+
+def run_case(numPatterns, alphabet, textSizes, seed=0):
+    """
+    :return: record of the timings, throughputs and sizes for one dictionary
+    """
+    letters = ALPHABETS[alphabet]
+    words = generate_words(numPatterns, letters, seed=seed)
+    record = {'numPatterns': len(words), 'alphabet': alphabet, 'alphabetSize': len(letters), 'seed': seed,
+              'python': sys.version.split()[0], 'build': {}, 'search': {}}
+    automata = {}
+    for name, builder in (('build_trie', build_trie), ('build_dma_complete', build_dma_complete),
+                          ('build_dma_default', build_dma_default)):
+        automaton, seconds = timed(builder, words)
+        record['build'][name] = dict(automaton.get_stats(), seconds=seconds,
+                                     patternsPerSecond=len(words) / seconds if seconds > 0 else None)
+        automata[name] = automaton
+    automata['freeze'], seconds = timed(freeze, automata['build_dma_complete'])
+    record['build']['freeze'] = dict(automata['freeze'].get_stats(), seconds=seconds)
+    record['peakRssAfterBuild'] = get_peak_rss()
+    chunks = generate_chunks(words, letters, 4, min(CHUNK_SIZE, max(textSizes)), seed=seed)
+    for textSize in textSizes:
+        results = record['search'][str(textSize)] = {}
+        for name in ('build_dma_complete', 'build_dma_default', 'freeze'):
+            numMatches, seconds = timed(count_matches, automata[name], iter_text(chunks, textSize))
+            results[name] = {'seconds': seconds, 'numMatches': numMatches,
+                             'lettersPerSecond': textSize / seconds if seconds > 0 else None}
+    record['peakRss'] = get_peak_rss()
+    return record
+
+
+def run_case_in_child(args):
+    with multiprocessing.get_context().Pool(1, maxtasksperchild=1) as pool:
+        return pool.apply(run_case, args)
+
+
+def iter_throughputs(record):
+    for name, results in record['build'].items():
+        if results.get('patternsPerSecond') is not None:
+            yield 'build.%s' % name, results['patternsPerSecond']
+    for textSize, results in record['search'].items():
+        for name, result in results.items():
+            if result['lettersPerSecond'] is not None:
+                yield 'search.%s.%s' % (textSize, name), result['lettersPerSecond']
+
+
+def compare(records, baselineFileName, tolerance):
+    """
+    :return: list of the throughputs lower than the baseline by more than tolerance
+    """
+    with open(baselineFileName) as baselineFile:
+        baseline = dict(((record['numPatterns'], record['alphabet']), dict(iter_throughputs(record)))
+                        for record in map(json.loads, baselineFile) if record)
+    regressions = []
+    for record in records:
+        reference = baseline.get((record['numPatterns'], record['alphabet']), {})
+        for name, throughput in iter_throughputs(record):
+            if name in reference and throughput < reference[name] * (1 - tolerance):
+                regressions.append({'numPatterns': record['numPatterns'], 'alphabet': record['alphabet'],
+                                    'metric': name, 'baseline': reference[name], 'current': throughput})
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--preset', choices=sorted(PRESETS), default='small')
+    parser.add_argument('--patterns', type=int, nargs='+', help='numbers of patterns, overrides the preset')
+    parser.add_argument('--text-sizes', type=int, nargs='+', help='text sizes in letters, overrides the preset')
+    parser.add_argument('--alphabets', choices=sorted(ALPHABETS), nargs='+', help='overrides the preset')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help='write the records as json lines to this file instead of stdout')
+    parser.add_argument('--compare', help='json lines file of baseline records, exit with 1 on regression')
+    parser.add_argument('--tolerance', type=float, default=0.2, help='allowed relative throughput loss')
+    args = parser.parse_args(argv)
+    preset = PRESETS[args.preset]
+    records = []
+    output = open(args.output, 'w') if args.output else sys.stdout
+    try:
+        for numPatterns in args.patterns or preset['patterns']:
+            for alphabet in args.alphabets or preset['alphabets']:
+                record = run_case_in_child((numPatterns, alphabet, args.text_sizes or preset['text_sizes'], args.seed))
+                records.append(record)
+                output.write(json.dumps(record, sort_keys=True) + '\n')
+                output.flush()
+    finally:
+        if output is not sys.stdout:
+            output.close()
+    if args.compare:
+        regressions = compare(records, args.compare, args.tolerance)
+        for regression in regressions:
+            sys.stderr.write(json.dumps(regression, sort_keys=True) + '\n')
+        return 1 if len(regressions) != 0 else 0
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
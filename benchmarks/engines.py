@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+"""
+benchmark of the Shift-And matcher against the DMA to find their crossover, with the choice of the planner
+
+    python -m benchmarks.engines --patterns 4 16 64 256 1024 --alphabets dna latin
+"""
+
+import argparse
+import json
+import sys
+
+from automaton.bitparallel import ShiftAndMatcher
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.frozen import freeze
+from automaton.planner import choose_engine
+
+from .bench import timed
+from .generators import ALPHABETS
+from .generators import generate_chunks
+from .generators import generate_words
+
+
+def run_case(numPatterns, alphabet, textSize, seed=0):
+    letters = ALPHABETS[alphabet]
+    words = generate_words(numPatterns, letters, minLength=4, maxLength=8, seed=seed)
+    text = generate_chunks(words, letters, 1, textSize, seed=seed)[0]
+    record = {'numPatterns': len(words), 'alphabet': alphabet, 'textSize': textSize, 'seed': seed,
+              'totalLength': sum(len(word) for word in words), 'planner': choose_engine(words)}
+    complete = build_dma_complete(words)
+    engines = (('shift-and', ShiftAndMatcher(words)), ('complete', complete),
+               ('default', build_dma_default(words)), ('frozen', freeze(complete)))
+    for name, engine in engines:
+        _, seconds = timed(engine.det_search, text)
+        record[name] = textSize / seconds if seconds > 0 else None
+    record['fastest'] = max((name for name, _ in engines), key=lambda name: record[name] or 0)
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patterns', type=int, nargs='+', default=[1, 4, 16, 64, 128, 256, 1024])
+    parser.add_argument('--text-size', type=int, default=1 << 18)
+    parser.add_argument('--alphabets', choices=sorted(ALPHABETS), nargs='+', default=['dna', 'latin'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    for alphabet in args.alphabets:
+        for numPatterns in args.patterns:
+            record = run_case(numPatterns, alphabet, args.text_size, args.seed)
+            sys.stdout.write(json.dumps(record, sort_keys=True) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,57 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+import string
+
+ALPHABETS = {
+    'dna': 'acgt',
+    'latin': string.ascii_lowercase,
+    'cjk': ''.join(chr(letter) for letter in range(0x4e00, 0x4e00 + 4096)),
+}
+
+
+def generate_words(numWords, alphabet, minLength=3, maxLength=12, seed=0):
+    """
+    :return: sorted list of numWords distinct random words over alphabet ( fewer if the alphabet is too small )
+    """
+    rng = random.Random(seed)
+    words = set()
+    attempts = 0
+    while len(words) < numWords and attempts < 10 * numWords:
+        words.add(''.join(rng.choice(alphabet) for _ in range(rng.randint(minLength, maxLength))))
+        attempts += 1
+    return sorted(words)
+
+
+def generate_chunks(words, alphabet, numChunks, chunkSize, density=0.01, seed=0):
+    """
+    :param density: probability to insert a word at each position
+    :return: list of numChunks random texts of chunkSize letters containing occurrences of words
+    """
+    rng = random.Random(seed)
+    chunks = []
+    for _ in range(numChunks):
+        chunk = []
+        size = 0
+        while size < chunkSize:
+            if len(words) != 0 and rng.random() < density:
+                word = rng.choice(words)
+            else:
+                word = ''.join(rng.choice(alphabet) for _ in range(16))
+            chunk.append(word)
+            size += len(word)
+        chunks.append(''.join(chunk)[:chunkSize])
+    return chunks
+
+
+def iter_text(chunks, size):
+    """
+    :return: generator of the chunks repeated until size letters are produced
+    """
+    i = 0
+    while size > 0:
+        chunk = chunks[i % len(chunks)][:size]
+        yield chunk
+        size -= len(chunk)
+        i += 1
@@ -0,0 +1,85 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+"""
+benchmark of the wildcard matcher against re on the same patterns with wildcards and gaps
+
+    python -m benchmarks.wildcards --patterns 100 500 --text-size 1048576
+"""
+
+import argparse
+import json
+import random
+import re
+import sys
+
+from automaton.wildcard import WILDCARD
+from automaton.wildcard import build_wildcard_matcher
+from automaton.wildcard import to_regex
+
+from .bench import timed
+from .generators import ALPHABETS
+from .generators import generate_chunks
+from .generators import generate_words
+from .generators import iter_text
+
+
+def generate_patterns(words, seed=0):
+    """
+    :return: the words with a wildcard or a bounded gap inserted at a random position
+    """
+    rng = random.Random(seed)
+    patterns = []
+    for word in words:
+        i = rng.randint(1, len(word) - 1)
+        gap = WILDCARD if rng.random() < 0.5 else '%s{0,%d}' % (WILDCARD, rng.randint(1, 3))
+        patterns.append(word[:i] + gap + word[i:])
+    return patterns
+
+
+def search_regex_loop(regexes, text):
+    return sum(1 for regex in regexes for _ in regex.finditer(text))
+
+
+def search_regex_alternation(regex, text):
+    return sum(1 for _ in regex.finditer(text))
+
+
+def run_case(numPatterns, alphabet, textSize, seed=0):
+    letters = ALPHABETS[alphabet]
+    words = generate_words(numPatterns, letters, minLength=4, seed=seed)
+    patterns = generate_patterns(words, seed)
+    text = ''.join(iter_text(generate_chunks(words, letters, 1, textSize, seed=seed), textSize))
+    record = {'numPatterns': len(patterns), 'alphabet': alphabet, 'textSize': textSize, 'seed': seed}
+    matcher, record['buildSeconds'] = timed(build_wildcard_matcher, patterns, None, None, WILDCARD)
+    # the state has a bit per letter of the variants of the patterns
+    record['numBits'] = matcher.get_num_bits()
+    regexes = [re.compile(to_regex(pattern)) for pattern in patterns]
+    alternation = re.compile('|'.join(to_regex(pattern) for pattern in patterns))
+    # the matcher reports the overlapping matches, re the non overlapping ones
+    cases = [('matcher', matcher.det_search, (text,)),
+             ('regexLoop', search_regex_loop, (regexes, text)),
+             ('regexAlternation', search_regex_alternation, (alternation, text))]
+    for name, function, args in cases:
+        result, seconds = timed(function, *args)
+        record[name] = {'seconds': seconds, 'numMatches': result if isinstance(result, int) else len(result),
+                        'lettersPerSecond': textSize / seconds if seconds > 0 else None}
+    return record
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--patterns', type=int, nargs='+', default=[10, 50, 100])
+    parser.add_argument('--text-size', type=int, default=1 << 20)
+    parser.add_argument('--alphabets', choices=sorted(ALPHABETS), nargs='+', default=['latin'])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    for numPatterns in args.patterns:
+        for alphabet in args.alphabets:
+            record = run_case(numPatterns, alphabet, args.text_size, args.seed)
+            sys.stdout.write(json.dumps(record, sort_keys=True) + '\n')
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
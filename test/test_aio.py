@@ -0,0 +1,77 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import asyncio
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from unittest import TestCase
+
+from automaton.dma import build_dma_complete
+from automaton.frozen import freeze
+from automaton.semantics import LEFTMOST_LONGEST
+
+
+def create_reader(chunks):
+    reader = asyncio.StreamReader()
+    for chunk in chunks:
+        reader.feed_data(chunk)
+    reader.feed_eof()
+    return reader
+
+
+async def collect(automaton, chunks, **kwargs):
+    return [output async for output in automaton.search_stream(create_reader(chunks), **kwargs)]
+
+
+class SearchStreamTestCase(TestCase):
+    def test_search_stream(self):
+        words = ['ab', 'babb', 'bb', 'été']
+        text = 'babba un été abbb'
+        data = text.encode('utf-8')
+        for d in (build_dma_complete(words), freeze(build_dma_complete(words))):
+            expected = d.det_search(text)
+            # the reads split the text anywhere, even inside a character
+            self.assertEqual(asyncio.run(collect(d, [data], chunk_size=3, slice_size=2)), expected)
+            self.assertEqual(asyncio.run(collect(d, [data[:10], data[10:]])), expected)
+            self.assertEqual(asyncio.run(collect(d, [data], chunk_size=4, semantics=LEFTMOST_LONGEST)),
+                             d.search(text, LEFTMOST_LONGEST))
+            self.assertEqual(asyncio.run(collect(d, [])), [])
+
+    def test_bytes(self):
+        d = build_dma_complete(['été'], encoding='utf-8')
+        data = 'un été'.encode('utf-8')
+        self.assertEqual(asyncio.run(collect(d, [data], chunk_size=2)), d.det_search(data))
+
+    def test_executor(self):
+        d = freeze(build_dma_complete(['ab', 'babb', 'bb']))
+        text = 'babba' * 100
+        with ThreadPoolExecutor(1) as executor:
+            self.assertEqual(asyncio.run(collect(d, [text.encode()], chunk_size=64, executor=executor,
+                                                 offload_size=32)), d.det_search(text))
+
+    def test_interleaving(self):
+        d = build_dma_complete(['ab'])
+        ticks = []
+
+        async def tick():
+            while True:
+                ticks.append(None)
+                await asyncio.sleep(0)
+
+        async def run():
+            task = asyncio.create_task(tick())
+            outputs = await collect(d, [b'ab' * 100], chunk_size=200, slice_size=10)
+            task.cancel()
+            return outputs
+
+        self.assertEqual(len(asyncio.run(run())), 100)
+        # the scan of the single read gives the hand back to the event loop between its slices
+        self.assertGreaterEqual(len(ticks), 10)
+
+
+class ImportTestCase(TestCase):
+    def test_lazy_imports(self):
+        # the core automaton does not pay for asyncio and multiprocessing
+        code = 'import sys, automaton.automaton; print(sorted({"asyncio", "multiprocessing"} & set(sys.modules)))'
+        self.assertEqual(subprocess.check_output([sys.executable, '-c', code]).strip(), b'[]')
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+from unittest import TestCase
+
+from automaton.alphabet import OTHER_CLASS
+from automaton.alphabet import get_letter_classes
+from automaton.automaton import MutableAutomaton
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.frozen import freeze
+
+
+class LetterClassesTestCase(TestCase):
+    def test_classes(self):
+        f = MutableAutomaton()
+        s0 = f.get_initial_state()
+        s1 = f.add_state()
+        f.add_transition(s0, 'a', s1).add_transition(s0, 'b', s1).add_transition(s0, 'c', s0)
+        f.add_transition(s1, 'a', s0).add_transition(s1, 'b', s0).add_transition(s1, 'c', s1)
+        f.add_transition(s0, 'd', s0).add_transition(s1, 'd', s1)
+        letterClasses, numClasses = get_letter_classes(f)
+        self.assertEqual(numClasses, 3)
+        self.assertEqual(letterClasses['a'], letterClasses['b'])
+        self.assertEqual(letterClasses['c'], letterClasses['d'])
+        self.assertNotEqual(letterClasses['a'], letterClasses['c'])
+        self.assertNotIn(OTHER_CLASS, letterClasses.values())
+        # the letters leading to the same states as the letters outside the alphabet are in the other class
+        f.set_other_successor(s0)
+        f.add_transition(s1, 'c', s0).add_transition(s1, 'd', s0)
+        letterClasses, numClasses = get_letter_classes(f)
+        self.assertEqual(numClasses, 2)
+        self.assertEqual(letterClasses['c'], OTHER_CLASS)
+        self.assertEqual(freeze(f).transitionMatrix_.width_, 2)
+        self.assertEqual(freeze(f).det_search('abcaxa'), f.det_search('abcaxa'))
+
+
+class OtherLettersTestCase(TestCase):
+    def test_complete_dma_letters(self):
+        words = ['ab', 'babb', 'bb']
+        d = build_dma_complete(words, letters='abcdef')
+        self.assertEqual(d.get_letters(), ['a', 'b', 'c', 'd', 'e', 'f'])
+        initial = d.get_initial_state()
+        for state in d.get_states():
+            self.assertEqual(d.get_target(state, 'c'), initial)
+        self.assertEqual(d.det_search('abcbb'), build_dma_complete(words).det_search('abcbb'))
+        # the extra letters share the class of the letters outside the alphabet
+        self.assertEqual(freeze(d).transitionMatrix_.width_, 3)
+        # the letters of the words outside letters only keep their transitions of the trie
+        d = build_dma_complete(words, letters='a')
+        b = d.get_target(initial, 'b')
+        self.assertEqual(d.get_target(d.get_target(initial, 'a'), 'a'), d.get_target(initial, 'a'))
+        self.assertEqual(d.get_transitions(b), {'a': d.get_target(b, 'a'), 'b': d.get_target(b, 'b')})
+        self.assertFalse(d.is_final_state(d.get_target(initial, 'a')))
+
+    def test_search_letters_outside_alphabet(self):
+        words = ['ab', 'babb', 'bb']
+        text = 'xab bb;babbz'
+        expected = [('ab', 1, 3), ('bb', 4, 6), ('ab', 8, 10), ('babb', 7, 11), ('bb', 9, 11)]
+        for d in (build_dma_complete(words), build_dma_default(words)):
+            self.assertEqual(d.det_search(text), expected)
+            self.assertEqual(freeze(d).det_search(text), expected)
+            self.assertTrue(d.accept('xbb'))
+            self.assertFalse(d.accept('bbx'))
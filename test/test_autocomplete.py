@@ -0,0 +1,33 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+from unittest import TestCase
+
+from automaton.automaton import AutomatonException
+from automaton.trie import build_trie
+
+
+class CompleteTestCase(TestCase):
+    def test_complete(self):
+        t = build_trie(['car', 'cart', 'care', 'cat', 'dog', 'car'], weights=[5, 9, 1, 7, 3, 6])
+        self.assertEqual(t.get_max_weight(t.get_initial_state()), 9)
+        self.assertEqual(t.complete('ca', 2), [('cart', 9), ('cat', 7)])
+        self.assertEqual(t.complete('', 10), [('cart', 9), ('cat', 7), ('car', 6), ('dog', 3), ('care', 1)])
+        self.assertEqual(t.complete('cart', 3), [('cart', 9)])
+        self.assertEqual(t.complete('x', 3), [])
+        self.assertEqual(t.complete('c', 0), [])
+        # a trie without weights has no completions
+        self.assertEqual(build_trie(['car']).complete('c', 1), [])
+        self.assertRaises(AutomatonException, build_trie, ['car'], workers=2, weights=[1])
+
+    def test_random(self):
+        rng = random.Random(11)
+        words = sorted(set(''.join(rng.choice('abc') for _ in range(rng.randint(1, 6))) for _ in range(300)))
+        weights = [rng.randint(0, 20) for _ in words]
+        t = build_trie(words, weights=weights, encoding='utf-8')
+        for prefix in ('', 'a', 'ab', 'cba', 'ccc'):
+            expected = sorted(((word.encode('utf-8'), weight) for word, weight in zip(words, weights)
+                               if word.startswith(prefix)), key=lambda item: (-item[1], item[0]))
+            for k in (1, 5, 1000):
+                self.assertEqual(t.complete(prefix.encode('utf-8'), k), expected[:k])
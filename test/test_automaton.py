@@ -1,6 +1,8 @@
 # -*- coding: utf-8 -*-
 # @author <lambda.coder@gmail.com>
 
+import io
+import json
 from unittest import TestCase
 
 from automaton.automaton import MutableAutomatonException
@@ -215,6 +217,38 @@ class MutableAutomatonTestCase(TestCase):
         # test get_stats
         self.assertEqual(f.get_stats(), {'numStates': 8, 'numFinalStates': 4, 'numTransitions': 16})
 
+    def test_incremental_stats(self):
+        f = MutableAutomaton()
+        s0 = f.get_initial_state()
+        s1 = f.add_state()
+        s2 = f.add_state()
+        f.add_transition(s0, 'a', s1).add_transition(s1, 'b', s2).set_final_state(s2)
+        self.assertEqual(f.get_stats(), {'numStates': 3, 'numFinalStates': 1, 'numTransitions': 2})
+        self.assertEqual(f.get_final_states(), [s2])
+        self.assertEqual(f.get_letters(), ['a', 'b'])
+        # the stats are kept up to date
+        f.add_transition(s0, 'a', s2).add_transition(s0, 'c', s0).set_final_state(s2).set_final_state(s0)
+        self.assertEqual(f.get_stats(), {'numStates': 3, 'numFinalStates': 2, 'numTransitions': 3})
+        self.assertEqual(f.get_final_states(), [s0, s2])
+        self.assertEqual(f.get_letters(), ['a', 'b', 'c'])
+        self.assertEqual(f.transitionMatrix_.get_letter_counts(), {'a': 1, 'b': 1, 'c': 1})
+        self.assertEqual(sorted(f.iter_transitions()), [(s0, 'a', s2), (s0, 'c', s0), (s1, 'b', s2)])
+
+    def test_write(self):
+        f = MutableAutomaton()
+        s0 = f.get_initial_state()
+        s1 = f.add_state()
+        f.add_transition(s0, 'a', s1).set_final_state(s1).add_output(s1, 'a')
+        dotFile = io.StringIO()
+        f.write_dot(dotFile)
+        self.assertEqual(dotFile.getvalue(), f.to_dot())
+        jsonFile = io.StringIO()
+        f.write_json_lines(jsonFile)
+        self.assertEqual([json.loads(line) for line in jsonFile.getvalue().splitlines()], [
+            {'initial': 0, 'numStates': 2, 'numFinalStates': 1, 'numTransitions': 1},
+            {'state': 0, 'final': False, 'outputs': [], 'transitions': [['a', 1]]},
+            {'state': 1, 'final': True, 'outputs': ['a'], 'transitions': []}])
+
     def test_to_dot(self):
         f = MutableAutomaton()
         # initial state
@@ -270,6 +304,14 @@ nodesep = "0.25";
 
 
 class MutableAutomatonDTestCase(TestCase):
+    def test_to_dict(self):
+        f = MutableAutomatonWithDefaultSuccessor()
+        s0 = f.get_initial_state()
+        s1 = f.add_state()
+        f.add_transition(s0, 'a', s1).add_transition(s1, 'b', s1)
+        self.assertEqual(f.to_dict()['transitions'], {s0: {'a': s1, 'b': s0}, s1: {'a': s0, 'b': s1}})
+        self.assertEqual(list(f.iter_transitions()), [(s0, 'a', s1), (s1, 'b', s1)])
+
     def test_matching(self):
         f = MutableAutomatonWithDefaultSuccessor()
         s0 = f.get_initial_state()
@@ -0,0 +1,62 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+from unittest import TestCase
+
+from automaton.bitparallel import ShiftAndMatcher
+from automaton.dma import build_dma_complete
+from automaton.frozen import FrozenAutomaton
+from automaton.patterns import PatternTable
+from automaton.planner import COMPLETE
+from automaton.planner import DEFAULT
+from automaton.planner import SHIFT_AND
+from automaton.planner import build_matcher
+from automaton.planner import choose_engine
+from automaton.semantics import LEFTMOST_FIRST
+from automaton.semantics import LEFTMOST_LONGEST
+
+
+class ShiftAndMatcherTestCase(TestCase):
+    def test_search(self):
+        words = ['ab', 'babb', 'bb', 'ab', '']
+        m = ShiftAndMatcher(words)
+        d = build_dma_complete(words)
+        self.assertEqual(m.get_num_bits(), 8)
+        for text in ('', 'babba xbb', 'abababbbb'):
+            self.assertEqual(m.det_search(text), d.det_search(text))
+            self.assertEqual(m.contains_any(text), d.contains_any(text))
+            self.assertEqual(m.count_matches(text), d.count_matches(text))
+            for semantics in (LEFTMOST_LONGEST, LEFTMOST_FIRST):
+                self.assertEqual(m.search(text, semantics), d.search(text, semantics))
+        self.assertEqual(list(m.iter_search(['aba', 'bb'])), d.det_search('ababb'))
+        e = ShiftAndMatcher(['été'], encoding='utf-8')
+        self.assertEqual(e.det_search('un été'.encode('utf-8')), [('été'.encode('utf-8'), 3, 8)])
+
+    def test_random(self):
+        rng = random.Random(2)
+        for _ in range(20):
+            words = [''.join(rng.choice('abc') for _ in range(rng.randint(1, 5))) for _ in range(rng.randint(1, 30))]
+            text = ''.join(rng.choice('abcd') for _ in range(100))
+            self.assertEqual(ShiftAndMatcher(words).det_search(text), build_dma_complete(words).det_search(text))
+
+
+class PlannerTestCase(TestCase):
+    def test_choose_engine(self):
+        self.assertEqual(choose_engine(['ab', 'babb', 'bb']), SHIFT_AND)
+        self.assertEqual(choose_engine(PatternTable(['ab'])), COMPLETE)
+        # many short patterns hit at most positions
+        self.assertEqual(choose_engine(['%02d' % i for i in range(100)]), COMPLETE)
+        words = ['%06d' % i for i in range(1000)]
+        self.assertEqual(choose_engine(words), COMPLETE)
+        cjk = [chr(0x4e00 + i) + chr(0x4e00 + i // 7) + chr(0x5e00 + i % 13) for i in range(2000)]
+        self.assertEqual(choose_engine(cjk), DEFAULT)
+
+    def test_build_matcher(self):
+        self.assertIsInstance(build_matcher(['ab', 'bb']), ShiftAndMatcher)
+        # the engines find the same matches
+        self.assertEqual(build_matcher(['ab', 'xb']).det_search('xbab'), [('xb', 0, 2), ('ab', 2, 4)])
+        words = ['%06d' % i for i in range(1000)]
+        m = build_matcher(words, encoding='utf-8')
+        self.assertIsInstance(m, FrozenAutomaton)
+        self.assertEqual(m.det_search(b'x000999x'), [(b'000999', 1, 7)])
@@ -1,9 +1,15 @@
 # -*- coding: utf-8 -*-
 # @author <lambda.coder@gmail.com>
 
+import io
+from collections import Counter
 from unittest import TestCase
 
+from automaton.dma import build_dma_complete
 from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.dma import build_dma_lazy
+from automaton.frozen import freeze
 
 
 class BuildDMATestCase(TestCase):
@@ -67,3 +73,98 @@ class BuildDMATestCase(TestCase):
         # babba
         # 012345
         self.assertEqual(d.det_search('babba'), [('ab', 1, 3), ('babb', 0, 4), ('bb', 2, 4)])
+
+
+class BuildDMAFailureTestCase(TestCase):
+    def test_aa_abaaa_abab(self):
+        words = ['aa', 'abaaa', 'abab']
+        d = build_dma_failure(words)
+        # outputs are only stored in the states of the trie
+        self.assertEqual(dict(d.output_), {2: {'aa'}, 6: {'abaaa'}, 7: {'abab'}})
+        self.assertEqual(d.failures_, {1: 0, 2: 1, 3: 0, 4: 1, 5: 2, 6: 2, 7: 3})
+        self.assertEqual(d.outputLinks_, {5: 2, 6: 2})
+        self.assertEqual(d.get_outputs(6), {'aa', 'abaaa'})
+        self.assertEqual(d.to_dict()['outputs'], build_dma_default(words).to_dict()['outputs'])
+        self.assertEqual(d.get_final_states(), [2, 5, 6, 7])
+        self.assertTrue(d.accept('abaaa'))
+        self.assertFalse(d.accept('ab'))
+
+    def test_same_results_as_dma_default(self):
+        for words in (['a', 'ab'], ['ab', 'babb', 'bb'], ['he', 'she', 'his', 'hers'], ['a', 'aa', 'aaa', 'ba']):
+            d = build_dma_default(words)
+            f = build_dma_failure(words)
+            for text in ('', 'babba', 'ushers', 'aaaa baa', 'abababbab hishe'):
+                self.assertEqual(f.det_search(text), d.det_search(text))
+
+
+class IterSearchTestCase(TestCase):
+    def test_chunks(self):
+        words = ['ab', 'babb', 'bb']
+        text = 'babbabbab'
+        for d in (build_dma_default(words), build_dma_failure(words)):
+            expected = d.det_search(text)
+            self.assertEqual(list(d.iter_search(text)), expected)
+            self.assertEqual(list(d.iter_search(['ba', 'b', '', 'babba', 'b'])), expected)
+            self.assertEqual(list(d.iter_search(io.StringIO(text), chunk_size=2)), expected)
+            self.assertEqual(list(d.iter_search(io.BytesIO(text.encode('utf-8')), chunk_size=3)), expected)
+
+    def test_split_character(self):
+        d = build_dma_default(['été', 'té'])
+        data = 'un été'.encode('utf-8')
+        chunks = [data[i:i + 1] for i in range(len(data))]
+        self.assertEqual(list(d.iter_search(chunks)), [('té', 4, 6), ('été', 3, 6)])
+
+    def test_bytes(self):
+        # the bytes chunks are not decoded for an automaton searching bytes
+        d = build_dma_complete(['ab'], encoding='utf-8')
+        self.assertEqual(list(d.iter_search([b'xab', b'ab'])), [(b'ab', 1, 3), (b'ab', 3, 5)])
+        self.assertEqual(list(freeze(d).iter_search(io.BytesIO(b'xabab'), chunk_size=2)), d.det_search(b'xabab'))
+        self.assertEqual(list(build_dma_complete(['ab']).iter_search([b'xa', b'b'], encoding='ascii')), [('ab', 1, 3)])
+
+
+class CountTestCase(TestCase):
+    def test_contains_any_count_matches(self):
+        words = ['ab', 'babb', 'bb']
+        for d in (build_dma_complete(words), build_dma_default(words), build_dma_failure(words),
+                  freeze(build_dma_complete(words))):
+            self.assertTrue(d.contains_any('babba'))
+            self.assertTrue(d.contains_any('xxab'))
+            self.assertFalse(d.contains_any('ba ba'))
+            self.assertFalse(d.contains_any(''))
+            self.assertEqual(d.count_matches('babbabb xbb'), {'ab': 2, 'babb': 2, 'bb': 3})
+            self.assertEqual(d.count_matches('aaa'), {})
+            text = 'abbabbbab ab babbb'
+            self.assertEqual(d.count_matches(text), Counter(output for output, _, _ in d.det_search(text)))
+
+    def test_sorted_outputs_of_output_links(self):
+        # only the own outputs are cached, the outputs of the output links are merged at each hit
+        words = ['a' * i for i in range(1, 41)]
+        d = build_dma_failure(words)
+        self.assertEqual(len(d.det_search('a' * 40)), 40 * 41 // 2)
+        self.assertEqual(sum(len(outputs) for outputs in d.sortedOutputs_.values()), 40)
+        self.assertEqual(d.det_search('aaa'), build_dma_default(words).det_search('aaa'))
+
+
+class BuildDMALazyTestCase(TestCase):
+    def test_same_results_as_dma_default(self):
+        words = ['he', 'she', 'his', 'hers']
+        d = build_dma_default(words)
+        text = 'ushers his shehe xhers'
+        for maxCacheSize in (0, 2, 1000):
+            lazy = build_dma_lazy(words, max_cache_size=maxCacheSize)
+            self.assertEqual(lazy.get_cache_size(), 0)
+            for _ in range(2):
+                self.assertEqual(lazy.det_search(text), d.det_search(text))
+            self.assertLessEqual(lazy.get_cache_size(), maxCacheSize)
+            self.assertEqual(lazy.get_stats()['numCachedTransitions'], lazy.get_cache_size())
+        self.assertEqual(lazy.get_target_lazily(5, 'r'), 8)
+        self.assertEqual(lazy.clear_cache().get_cache_size(), 0)
+
+    def test_lru(self):
+        lazy = build_dma_lazy(['ab', 'b'], max_cache_size=2)
+        lazy.det_search('aa')
+        self.assertEqual(list(lazy.cache_), [(1, 'a')])
+        lazy.det_search('bba')
+        self.assertEqual(list(lazy.cache_), [(3, 'b'), (3, 'a')])
+        lazy.det_search('bb')
+        self.assertEqual(list(lazy.cache_), [(3, 'a'), (3, 'b')])
@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+import threading
+from unittest import TestCase
+
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_failure
+from automaton.dynamic import DynamicDMA
+from automaton.semantics import LEFTMOST_FIRST
+from automaton.semantics import LEFTMOST_LONGEST
+from automaton.semantics import NON_OVERLAPPING
+
+
+class DynamicDMATestCase(TestCase):
+    def test_add_remove(self):
+        d = DynamicDMA(['ab', 'babb'])
+        snapshot = d.get_snapshot()
+        d.add_word('bb').add_word('a').remove_word('babb')
+        self.assertEqual(d.get_words(), ['a', 'ab', 'bb'])
+        self.assertTrue(d.has_word('bb'))
+        self.assertFalse(d.has_word('babb'))
+        self.assertEqual(d.det_search('babba'), build_dma_complete(['a', 'ab', 'bb']).det_search('babba'))
+        # the previous snapshot is unchanged
+        self.assertEqual(snapshot.det_search('babba'), [('ab', 1, 3), ('babb', 0, 4)])
+        d.add_word('babb').remove_word('a')
+        self.assertEqual(d.det_search('babba'), [('ab', 1, 3), ('babb', 0, 4), ('bb', 2, 4)])
+
+    def test_background_rebuild(self):
+        gate = threading.Event()
+
+        def builder(words):
+            # the background rebuild waits for the gate
+            if threading.current_thread() is not threading.main_thread():
+                gate.wait()
+            return build_dma_complete(words)
+
+        d = DynamicDMA(['ab', 'babb'], builder=builder, max_delta=2)
+        base = d.get_snapshot().base_
+        d.add_word('bb').add_word('a').add_word('b')
+        # the rebuild does not block the updates and the searches
+        self.assertIs(d.get_snapshot().base_, base)
+        d.remove_word('ab').add_word('aa').remove_word('b')
+        words = ['a', 'aa', 'babb', 'bb']
+        self.assertEqual(d.get_words(), words)
+        self.assertEqual(d.det_search('babbaab'), build_dma_complete(words).det_search('babbaab'))
+        gate.set()
+        d.wait_rebuild()
+        snapshot = d.get_snapshot()
+        self.assertIsNot(snapshot.base_, base)
+        self.assertEqual(snapshot.get_words(), words)
+        self.assertLessEqual(len(snapshot.deltaWords_) + len(snapshot.removed_), 2)
+        self.assertEqual(d.det_search('babbaab'), build_dma_complete(words).det_search('babbaab'))
+
+    def test_same_results_as_rebuild(self):
+        random.seed(7)
+        pool = [''.join(random.choice('abc') for _ in range(random.randint(1, 4))) for _ in range(40)]
+        text = ''.join(random.choice('abcd') for _ in range(200))
+        for builder, maxDelta in ((build_dma_complete, 5), (build_dma_failure, 1000)):
+            d = DynamicDMA(pool[:10], builder=builder, max_delta=maxDelta)
+            words = set(pool[:10])
+            for _ in range(60):
+                word = random.choice(pool)
+                if word in words:
+                    d.remove_word(word)
+                    words.remove(word)
+                else:
+                    d.add_word(word)
+                    words.add(word)
+                if random.random() < 0.2:
+                    d.wait_rebuild()
+                self.assertEqual(d.get_words(), sorted(words))
+                self.assertEqual(d.det_search(text), build_dma_complete(words).det_search(text))
+            d.compact()
+            self.assertEqual(d.det_search(text), build_dma_complete(words).det_search(text))
+
+    def test_searches(self):
+        random.seed(11)
+        pool = [''.join(random.choice('abc') for _ in range(random.randint(1, 4))) for _ in range(30)]
+        text = ''.join(random.choice('abcd') for _ in range(100))
+        chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+        d = DynamicDMA(pool[:10])
+        for word in pool[10:20]:
+            d.add_word(word)
+        for word in pool[5:15:2]:
+            d.remove_word(word)
+        dma = build_dma_complete(d.get_words())
+        for semantics in (NON_OVERLAPPING, LEFTMOST_LONGEST):
+            self.assertEqual(d.search(text, semantics), dma.search(text, semantics))
+            self.assertEqual(list(d.iter_search(chunks, semantics=semantics)), dma.search(text, semantics))
+        self.assertEqual(list(d.iter_search(chunks)), dma.det_search(text))
+        self.assertEqual(d.count_matches(text), dma.count_matches(text))
+        self.assertEqual(d.contains_any(text), dma.contains_any(text))
+        # a removed word is not found, an added word is
+        d = DynamicDMA(['ab', 'bc']).remove_word('bc').add_word('abc')
+        self.assertFalse(d.contains_any('xbcx'))
+        self.assertTrue(d.contains_any('abc'))
+        self.assertEqual(d.count_matches('abcbc'), {'ab': 1, 'abc': 1})
+        # the added words come after the words of the base
+        self.assertEqual(d.search('abc', LEFTMOST_FIRST), [('ab', 0, 2)])
+        self.assertEqual(list(d.iter_search([b'ab', b'c'])), [('ab', 0, 2), ('abc', 0, 3)])
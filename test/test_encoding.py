@@ -0,0 +1,51 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+from unittest import TestCase
+
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.encoding import encode_words
+from automaton.encoding import to_char_offsets
+from automaton.frozen import freeze
+from automaton.trie import build_trie
+
+
+class EncodingTestCase(TestCase):
+    def test_encode_words(self):
+        self.assertEqual(encode_words(['été', b'ab']), [b'\xc3\xa9t\xc3\xa9', b'ab'])
+
+    def test_build_trie(self):
+        t = build_trie(['aé'], encoding='utf-8')
+        self.assertEqual(t.to_dict(), {'initial': 0, 'finals': {3}, 'outputs': {3: ['aé'.encode('utf-8')]},
+                                       'transitions': {0: {97: 1}, 1: {0xc3: 2}, 2: {0xa9: 3}, 3: {}}})
+        self.assertTrue(t.accept('aé'.encode('utf-8')))
+        self.assertFalse(t.accept(b'a'))
+
+    def test_det_search_bytes(self):
+        words = ['été', 'té', 'un']
+        text = 'un été, deux étés'
+        data = text.encode('utf-8')
+        expected = [(b'un', 0, 2), (b't\xc3\xa9', 5, 8), (b'\xc3\xa9t\xc3\xa9', 3, 8),
+                    (b't\xc3\xa9', 17, 20), (b'\xc3\xa9t\xc3\xa9', 15, 20)]
+        for d in (build_dma_default(words, encoding='utf-8'), build_dma_failure(words, encoding='utf-8'),
+                  freeze(build_dma_default(words, encoding='utf-8'))):
+            self.assertEqual(d.det_search(data), expected)
+            self.assertEqual(d.det_search(bytearray(data)), expected)
+            self.assertEqual(d.det_search(memoryview(data)), expected)
+            self.assertEqual(list(d.iter_search([data[:4], data[4:]], encoding=None)), expected)
+        matches = to_char_offsets(data, expected)
+        self.assertEqual(matches, [(b'un', 0, 2), (b't\xc3\xa9', 4, 6), (b'\xc3\xa9t\xc3\xa9', 3, 6),
+                                   (b't\xc3\xa9', 14, 16), (b'\xc3\xa9t\xc3\xa9', 13, 16)])
+        for output, start, end in matches:
+            self.assertEqual(text[start:end].encode('utf-8'), output)
+
+    def test_frozen_bytes(self):
+        words = [bytes([letter, letter]) for letter in range(256)]
+        d = build_dma_complete(words)
+        f = freeze(d)
+        self.assertEqual(len(f.get_letters()), 256)
+        data = bytes(range(256)) + bytes([0, 0, 255, 255])
+        self.assertEqual(f.det_search(data), d.det_search(data))
+        self.assertEqual(f.det_search(data), [(b'\x00\x00', 256, 258), (b'\xff\xff', 258, 260)])
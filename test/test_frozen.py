@@ -0,0 +1,112 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import os
+import tempfile
+from unittest import TestCase
+
+from automaton.automaton import AutomatonException
+from automaton.automaton import MutableAutomaton
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.frozen import FrozenAutomaton
+from automaton.frozen import freeze
+from automaton.frozen import load_binary
+from automaton.semantics import LEFTMOST_FIRST
+
+
+class FreezeTestCase(TestCase):
+    def test_a_ab(self):
+        f = freeze(build_dma_default(['a', 'ab']))
+        self.assertEqual(f.to_dict(), {'initial': 0, 'finals': {1, 2}, 'outputs': {1: ['a'], 2: ['ab']},
+                                       'transitions': {0: {'a': 1, 'b': 0}, 1: {'a': 1, 'b': 2}, 2: {'a': 1, 'b': 0}}})
+        self.assertEqual(f.get_stats(), {'numStates': 3, 'numFinalStates': 2, 'numTransitions': 6})
+        self.assertEqual(list(f.iter_transitions())[:2], [(0, 'a', 1), (0, 'b', 0)])
+        self.assertEqual(f.get_target(0, 'a'), 1)
+        # letters outside the alphabet follow the default successor
+        self.assertEqual(f.get_target(2, 'c'), 0)
+        self.assertRaises(AutomatonException, f.is_final_state, 3)
+
+    def test_ab_babb_bb(self):
+        words = ['ab', 'babb', 'bb']
+        for d in (build_dma_complete(words), build_dma_default(words)):
+            f = freeze(d)
+            self.assertEqual(f.get_num_states(), d.get_num_states())
+            self.assertEqual(f.get_final_states(), d.get_final_states())
+            self.assertEqual(f.det_search('babba'), [('ab', 1, 3), ('babb', 0, 4), ('bb', 2, 4)])
+            for text in ('', 'a', 'bb', 'abab', 'aabbbabba'):
+                self.assertEqual(f.det_search(text), d.det_search(text))
+                self.assertEqual(f.accept(text), d.accept(text))
+            self.assertEqual(list(f.iter_search(['aabb', 'babba'])), d.det_search('aabbbabba'))
+
+    def test_unknown_letter(self):
+        words = ['aa', 'ab']
+        d = build_dma_default(words)
+        self.assertEqual(freeze(d).det_search('a ab aa'), d.det_search('a ab aa'))
+        f = MutableAutomaton()
+        s0 = f.get_initial_state()
+        s1 = f.add_state()
+        s2 = f.add_state()
+        f.add_transition(s0, 'a', s1).add_transition(s1, 'a', s2).set_final_state(s2).add_output(s2, 'aa')
+        self.assertEqual(freeze(f).det_search('aaa'), [('aa', 0, 2)])
+        self.assertEqual(freeze(f).det_search('a aa'), [])
+        self.assertFalse(freeze(f).accept('a a'))
+
+    def test_constructor(self):
+        f = freeze(build_dma_complete(['ab', 'b']))
+        g = FrozenAutomaton(f.get_initial_state(), f.transitionMatrix_, f.finals_, f.output_, f.ranks_)
+        self.assertIsNone(g.get_binary_file_name())
+        self.assertIsNone(g.get_patterns())
+        self.assertEqual(g.det_search('abb'), f.det_search('abb'))
+        # without fork, the automaton without binary file is pickled to the workers
+        self.assertEqual(list(g.search_many(['abb', 'b'], workers=1, start_method='spawn')),
+                         [g.det_search('abb'), g.det_search('b')])
+
+
+class BinaryTestCase(TestCase):
+    def setUp(self):
+        fd, self.fileName = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+
+    def tearDown(self):
+        os.remove(self.fileName)
+
+    def test_dump_load(self):
+        words = ['ab', 'babb', 'bb', 'été']
+        f = freeze(build_dma_default(words))
+        f.dump_binary(self.fileName)
+        g = load_binary(self.fileName)
+        self.assertEqual(g.to_dict(), f.to_dict())
+        self.assertEqual(g.get_stats(), f.get_stats())
+        self.assertIsInstance(g.transitionMatrix_.table_, memoryview)
+        for text in ('babba', 'un été abbb'):
+            self.assertEqual(g.det_search(text), f.det_search(text))
+            self.assertEqual(g.search(text, LEFTMOST_FIRST), f.search(text, LEFTMOST_FIRST))
+        self.assertEqual(g.get_output_rank('babb'), 1)
+        # a loaded automaton can be dumped again, in another file since its own file is mapped
+        fd, fileName = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        self.addCleanup(os.remove, fileName)
+        g.dump_binary(fileName)
+        self.assertEqual(load_binary(fileName).det_search('babba'), f.det_search('babba'))
+
+    def test_bad_file(self):
+        with open(self.fileName, 'wb') as binaryFile:
+            binaryFile.write(b'not an automaton, really not an automaton')
+        self.assertRaises(AutomatonException, load_binary, self.fileName)
+
+    def test_empty_or_truncated_file(self):
+        open(self.fileName, 'wb').close()
+        self.assertRaises(AutomatonException, load_binary, self.fileName)
+        freeze(build_dma_default(['ab', 'babb', 'bb'])).dump_binary(self.fileName)
+        with open(self.fileName, 'rb') as binaryFile:
+            data = binaryFile.read()
+        for size in (8, len(data) // 2, len(data) - 1):
+            with open(self.fileName, 'wb') as binaryFile:
+                binaryFile.write(data[:size])
+            self.assertRaises(AutomatonException, load_binary, self.fileName)
+
+    def test_unsupported_outputs(self):
+        f = MutableAutomaton()
+        f.set_final_state(f.get_initial_state()).add_output(f.get_initial_state(), 1)
+        self.assertRaises(AutomatonException, freeze(f).dump_binary, self.fileName)
@@ -0,0 +1,48 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+from unittest import TestCase
+
+from automaton.minimize import build_minimal_acyclic
+from automaton.trie import build_trie
+
+
+def levenshtein(a, b):
+    row = list(range(len(b) + 1))
+    for i, x in enumerate(a, 1):
+        previous, row[0] = row[0], i
+        for j, y in enumerate(b, 1):
+            previous, row[j] = row[j], min(row[j] + 1, row[j - 1] + 1, previous + (x != y))
+    return row[-1]
+
+
+class LookupFuzzyTestCase(TestCase):
+    def test_lookup(self):
+        t = build_trie(['hello', 'help', 'hell', 'yellow', 'world'])
+        self.assertEqual(t.lookup_fuzzy('hello', 0), [('hello', 0)])
+        self.assertEqual(t.lookup_fuzzy('helo', 1), [('hell', 1), ('hello', 1), ('help', 1)])
+        self.assertEqual(t.lookup_fuzzy('jello', 2), [('hell', 2), ('hello', 1), ('yellow', 2)])
+        self.assertEqual(t.lookup_fuzzy('', 4), [('hell', 4), ('help', 4)])
+
+    def test_random(self):
+        rng = random.Random(5)
+        words = sorted(set(''.join(rng.choice('abc') for _ in range(rng.randint(1, 7))) for _ in range(200)))
+        t = build_trie(words)
+        for _ in range(30):
+            query = ''.join(rng.choice('abcd') for _ in range(rng.randint(0, 8)))
+            for maxDistance in range(3):
+                expected = [(word, levenshtein(word, query)) for word in words
+                            if levenshtein(word, query) <= maxDistance]
+                self.assertEqual(t.lookup_fuzzy(query, maxDistance), expected)
+
+    def test_search(self):
+        t = build_trie(['hello', 'world'])
+        self.assertEqual(t.search_fuzzy('say helo to the wrld', 1), [('hello', 4, 8, 1), ('world', 16, 20, 1)])
+        self.assertEqual(t.search_fuzzy('hello world', 0), [('hello', 0, 5, 0), ('world', 6, 11, 0)])
+        self.assertEqual(t.search_fuzzy('hellp', 1), [('hello', 0, 4, 1)])
+        self.assertEqual(t.search_fuzzy('', 1), [])
+
+    def test_dawg(self):
+        words = ['tap', 'taps', 'top', 'tops']
+        self.assertEqual(build_minimal_acyclic(words).lookup_fuzzy('tip', 1), [('tap', 1), ('top', 1)])
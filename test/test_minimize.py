@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+import tracemalloc
+from unittest import TestCase
+
+from automaton.automaton import AutomatonException
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.dma import build_dma_lazy
+from automaton.frozen import freeze
+from automaton.minimize import build_minimal_acyclic
+from automaton.minimize import minimize
+from automaton.trie import build_trie
+
+
+class BuildMinimalAcyclicTestCase(TestCase):
+    def test_tap_taps_top_tops(self):
+        words = ['tap', 'taps', 'top', 'tops']
+        m = build_minimal_acyclic(words)
+        self.assertEqual(m.to_dict(), {'initial': 0, 'finals': {3, 4}, 'outputs': {},
+                                       'transitions': {0: {'t': 1}, 1: {'a': 2, 'o': 2}, 2: {'p': 3},
+                                                       3: {'s': 4}, 4: {}}})
+        self.assertEqual(m.get_stats(), {'numStates': 5, 'numFinalStates': 2, 'numTransitions': 5,
+                                         'numOriginalStates': 8, 'numOriginalTransitions': 7})
+        for word in words:
+            self.assertTrue(m.accept(word))
+        for word in ('', 't', 'ta', 'tas', 'tapss', 'tips'):
+            self.assertFalse(m.accept(word))
+
+    def test_duplicates_and_emptyword(self):
+        m = build_minimal_acyclic(['', 'a', 'a', 'ab', 'b'])
+        self.assertEqual(m.to_dict(), {'initial': 0, 'finals': {1, 2}, 'outputs': {},
+                                       'transitions': {0: {'a': 1, 'b': 2}, 1: {'b': 2}, 2: {}}})
+        self.assertTrue(m.accept('ab'))
+        self.assertTrue(m.accept('b'))
+        self.assertFalse(m.accept('ba'))
+
+    def test_memory(self):
+        rng = random.Random(5)
+        words = sorted(set(''.join(rng.choice('abcdefgh') for _ in range(rng.randint(4, 10))) +
+                           rng.choice(['', 's', 'ed', 'ing']) for _ in range(3000)))
+
+        def measure(build):
+            tracemalloc.start()
+            automaton = build(words)
+            peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+            return automaton, peak
+
+        m, peak = measure(build_minimal_acyclic)
+        t, triePeak = measure(build_trie)
+        self.assertEqual(m.get_stats()['numOriginalStates'], t.get_num_states())
+        # the replaced states are freed during the construction
+        self.assertLess(2 * peak, triePeak)
+
+    def test_unsorted(self):
+        self.assertRaises(AutomatonException, build_minimal_acyclic, ['b', 'a'])
+
+
+class MinimizeTestCase(TestCase):
+    def test_trie(self):
+        words = ['tap', 'taps', 'top', 'tops', 'stop', 'stops']
+        t = build_trie(words)
+        # outputs prevent merging final states
+        t.output_.clear()
+        m = minimize(t)
+        self.assertEqual(m.get_num_states(), build_minimal_acyclic(sorted(words)).get_num_states())
+        self.assertEqual(m.get_stats()['numOriginalStates'], t.get_num_states())
+        for word in words + ['', 'sto', 'tapss']:
+            self.assertEqual(m.accept(word), t.accept(word))
+
+    def test_dma(self):
+        words = ['ab', 'babb', 'bb', 'aab']
+        for d in (build_dma_complete(words), build_dma_default(words), build_dma_failure(words),
+                  build_dma_lazy(words, max_cache_size=2), freeze(build_dma_complete(words))):
+            m = minimize(d)
+            self.assertLessEqual(m.get_num_states(), d.get_num_states())
+            for text in ('', 'babba', 'aabbxbab', 'xxabb'):
+                self.assertEqual(m.det_search(text), d.det_search(text))
+        # without outputs, the states reached by 'a' and 'c', 'ab' and 'cb' are merged
+        d = build_dma_complete(['ab', 'cb'])
+        d.output_.clear()
+        m = minimize(d)
+        self.assertEqual(m.get_stats(), {'numStates': 3, 'numFinalStates': 1, 'numTransitions': 7,
+                                         'numOriginalStates': 5, 'numOriginalTransitions': 15})
+        for text in ('', 'abcb', 'aabxcbb'):
+            self.assertEqual(m.det_search(text), d.det_search(text))
+            self.assertEqual(m.accept(text), d.accept(text))
+
+    def test_sparse(self):
+        # the signatures only hold the stored transitions, whatever the size of the alphabet
+        words = [chr(0x4e00 + i) + chr(0x4e00 + 2 * i) for i in range(2000)]
+        t = build_trie(words)
+        t.output_.clear()
+        tracemalloc.start()
+        m = minimize(t)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        self.assertEqual(m.get_num_states(), len(words) + 2)
+        # a dense target list per state would take 8 bytes per letter
+        self.assertLess(peak, t.get_num_states() * len(t.get_letters()))
@@ -0,0 +1,49 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import os
+import tempfile
+from unittest import TestCase
+
+from automaton.dma import build_dma_complete
+from automaton.frozen import freeze
+from automaton.frozen import load_binary
+from automaton.parallel import create_pool_
+from automaton.parallel import iter_batches_
+from automaton.parallel import search_batch_
+
+
+class SearchManyTestCase(TestCase):
+    def test_iter_batches(self):
+        self.assertEqual(list(iter_batches_(iter('abcde'), 2)), [(0, ['a', 'b']), (2, ['c', 'd']), (4, ['e'])])
+        self.assertEqual(list(iter_batches_([], 2)), [])
+
+    def test_search_many(self):
+        d = freeze(build_dma_complete(['ab', 'babb', 'bb']))
+        documents = ['babba', '', 'abab', 'xbbx'] * 10
+        expected = [d.det_search(document) for document in documents]
+        self.assertEqual(list(d.search_many(documents, workers=2, batch_size=3)), expected)
+        unordered = list(d.search_many(iter(documents), workers=2, batch_size=3, ordered=False))
+        self.assertEqual(sorted(i for i, _ in unordered), list(range(len(documents))))
+        for i, outputs in unordered:
+            self.assertEqual(outputs, expected[i])
+
+    def test_respawned_workers(self):
+        d = freeze(build_dma_complete(['ab', 'babb', 'bb']))
+        batches = list(iter_batches_(['babba', 'abab'] * 4, 1))
+        # every task runs in a new worker
+        with create_pool_(d, 2, maxtasksperchild=1) as pool:
+            self.assertEqual(pool.map(search_batch_, batches),
+                             [(start, [d.det_search(document) for document in batch]) for start, batch in batches])
+
+    def test_spawned_workers(self):
+        fd, fileName = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        self.addCleanup(os.remove, fileName)
+        freeze(build_dma_complete(['ab', 'babb', 'bb'])).dump_binary(fileName)
+        d = load_binary(fileName)
+        self.assertEqual(d.get_binary_file_name(), fileName)
+        documents = ['babba', '', 'abab', 'xbbx'] * 3
+        # the workers map the file of the automaton instead of unpickling it
+        self.assertEqual(list(d.search_many(documents, workers=2, batch_size=4, start_method='spawn')),
+                         [d.det_search(document) for document in documents])
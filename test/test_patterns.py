@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import os
+import tempfile
+from unittest import TestCase
+
+from automaton.automaton import AutomatonException
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.frozen import freeze
+from automaton.frozen import load_binary
+from automaton.patterns import OutputIds
+from automaton.patterns import PatternTable
+from automaton.semantics import LEFTMOST_FIRST
+from automaton.semantics import LEFTMOST_LONGEST
+from automaton.trie import build_trie
+
+
+class PatternTableTestCase(TestCase):
+    def test_add(self):
+        patterns = PatternTable(['ab', 'été'])
+        self.assertEqual(patterns.add('bb', payload={'category': 'x'}), 2)
+        self.assertEqual(len(patterns), 3)
+        self.assertEqual(list(patterns), ['ab', 'été', 'bb'])
+        self.assertEqual(patterns.get_word(1), 'été')
+        self.assertEqual(patterns.get_length(1), 3)
+        self.assertEqual(patterns.get_payload(0), None)
+        self.assertEqual(patterns.get_payload(2), {'category': 'x'})
+        self.assertRaises(ValueError, patterns.add, b'ab')
+        encoded = patterns.encode('utf-8')
+        self.assertEqual(list(encoded), [b'ab', 'été'.encode('utf-8'), b'bb'])
+        self.assertEqual(encoded.get_payload(2), {'category': 'x'})
+
+    def test_trie(self):
+        patterns = PatternTable(['a', 'b'])
+        t = build_trie(patterns)
+        self.assertEqual(t.to_dict(), {'initial': 0, 'finals': {1, 2}, 'outputs': {1: [0], 2: [1]},
+                                       'transitions': {0: {'a': 1, 'b': 2}, 1: {}, 2: {}}})
+        self.assertIs(t.get_patterns(), patterns)
+
+    def test_search(self):
+        words = ['ab', 'babb', 'bb']
+        patterns = PatternTable()
+        for word in words:
+            patterns.add(word, payload=word.upper())
+        text = 'babba xbb'
+        for d in (build_dma_complete(patterns), build_dma_default(patterns), build_dma_failure(patterns),
+                  freeze(build_dma_default(patterns))):
+            matches = d.det_search(text)
+            self.assertEqual(matches, [(0, 1, 3), (1, 0, 4), (2, 2, 4), (2, 7, 9)])
+            self.assertEqual(patterns.resolve(matches), build_dma_complete(words).det_search(text))
+            self.assertEqual(patterns.resolve(matches[:1], payloads=True), [('ab', 1, 3, 'AB')])
+            self.assertEqual(d.search(text, LEFTMOST_LONGEST), [(1, 0, 4), (2, 7, 9)])
+            self.assertEqual(d.count_matches(text), {0: 1, 1: 1, 2: 2})
+
+    def test_encoding(self):
+        patterns = PatternTable(['été'])
+        d = build_dma_complete(patterns, encoding='utf-8')
+        self.assertEqual(d.det_search('un été'.encode('utf-8')), [(0, 3, 8)])
+
+    def test_output_ids(self):
+        outputs = OutputIds()
+        outputs.add(3, 7)
+        outputs.add(1, 2)
+        outputs.add(3, 5)
+        outputs.add(3, 7)
+        self.assertEqual(outputs[3], {5, 7})
+        self.assertEqual(outputs.get(0, set()), set())
+        self.assertEqual(outputs.get(8), None)
+        self.assertEqual(list(outputs.items()), [(1, {2}), (3, {5, 7})])
+        t = build_trie(PatternTable(['a', 'b']))
+        self.assertIsInstance(t.output_, OutputIds)
+        self.assertEqual(t.ranks_, {})
+
+    def test_dump_load_binary(self):
+        patterns = PatternTable()
+        for word in ['ab', 'babb', 'bb', 'été']:
+            patterns.add(word, payload={'word': word.upper()})
+        f = freeze(build_dma_default(patterns))
+        fd, fileName = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        self.addCleanup(os.remove, fileName)
+        f.dump_binary(fileName)
+        g = load_binary(fileName)
+        self.assertEqual(g.to_dict(), f.to_dict())
+        text = 'babba un été xbb'
+        self.assertEqual(g.det_search(text), f.det_search(text))
+        self.assertEqual(g.search(text, LEFTMOST_FIRST), f.search(text, LEFTMOST_FIRST))
+        self.assertEqual(g.get_patterns().resolve(g.det_search(text)[:1], payloads=True),
+                         [('ab', 1, 3, {'word': 'AB'})])
+        self.assertEqual(list(g.get_patterns()), list(patterns))
+        patterns = PatternTable([b'ab'])
+        patterns.add(b'bb', payload=object())
+        self.assertRaises(AutomatonException, freeze(build_dma_default(patterns)).dump_binary, os.devnull)
+        # g maps the first file
+        fd, bytesFileName = tempfile.mkstemp(suffix='.bin')
+        os.close(fd)
+        self.addCleanup(os.remove, bytesFileName)
+        freeze(build_dma_default(PatternTable([b'ab', b'bb']))).dump_binary(bytesFileName)
+        self.assertEqual(load_binary(bytesFileName).det_search(b'xabb'), [(0, 1, 3), (1, 2, 4)])
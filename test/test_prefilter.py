@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+from unittest import TestCase
+
+from automaton.automaton import MutableAutomaton
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.dma import build_dma_lazy
+from automaton.frozen import freeze
+from automaton.prefilter import NO_PREFILTER
+from automaton.prefilter import build_prefilter
+from automaton.trie import build_trie
+
+
+def without_prefilter(automaton):
+    automaton.prefilter_ = NO_PREFILTER
+    return automaton
+
+
+class PrefilterTestCase(TestCase):
+    def test_build_prefilter(self):
+        self.assertEqual(build_prefilter(build_dma_complete(['ab', 'bc']))[1].pattern, '[ab]')
+        self.assertEqual(build_prefilter(build_dma_default(['ab', 'bc'], encoding='utf-8'))[1].pattern, b'[ab]')
+        self.assertEqual(build_prefilter(freeze(build_dma_failure(['x.', 'y'])))[1].pattern, r'[xy]')
+        # a trie stops on the letters without transition
+        self.assertEqual(build_prefilter(build_trie(['ab'])), NO_PREFILTER)
+        f = MutableAutomaton()
+        s0 = f.get_initial_state()
+        s1 = f.add_state()
+        f.add_transition(s0, 'a', s1).add_transition(s0, 'b', s0).add_transition(s1, 'c', s0)
+        self.assertEqual(f.get_prefilter_('abc').pattern, '[^b]')
+        self.assertEqual(f.det_search('bbbab'), [])
+        # the prefilter follows the mutations
+        f.set_final_state(s0)
+        self.assertEqual(f.get_prefilter_('abc'), None)
+
+    def test_search(self):
+        rng = random.Random(4)
+        for _ in range(20):
+            words = [''.join(rng.choice('abcd') for _ in range(rng.randint(1, 4))) for _ in range(rng.randint(1, 6))]
+            text = ''.join(rng.choice('abcdexyz  ') for _ in range(200))
+            expected = build_dma_complete(words).det_search(text)
+            for builder in (build_dma_complete, build_dma_default, build_dma_failure, build_dma_lazy):
+                for d in (builder(words), freeze(builder(words))):
+                    self.assertEqual(d.det_search(text), expected)
+                    self.assertEqual(without_prefilter(d).det_search(text), expected)
+            d = freeze(build_dma_complete(words, encoding='utf-8'))
+            self.assertEqual(d.det_search(text.encode('utf-8')), [(output.encode('utf-8'), start, end)
+                                                                  for output, start, end in expected])
+            chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+            self.assertEqual(list(build_dma_complete(words).iter_search(chunks)), expected)
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import json
+import os
+import tempfile
+from unittest import TestCase
+
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.frozen import freeze
+from automaton.profiling import SearchProfiler
+from automaton.semantics import LEFTMOST_LONGEST
+from automaton.vectorized import batch_search
+from automaton.vectorized import numpy
+
+
+class SearchProfilerTestCase(TestCase):
+    def test_counters(self):
+        words = ['ab', 'babb', 'bb']
+        text = 'babba xab'
+        for d in (build_dma_complete(words), build_dma_default(words), build_dma_failure(words),
+                  freeze(build_dma_default(words))):
+            expected = d.det_search(text)
+            profiler = SearchProfiler(d)
+            self.assertEqual(profiler.det_search(text), expected)
+            counters = profiler.get_counters()
+            self.assertEqual(counters['calls'], 1)
+            # the x following the space loops on the initial state, it is skipped by the prefilter
+            self.assertEqual(counters['letters'], len(text) - 1)
+            self.assertEqual(counters['skippedLetters'], 1)
+            self.assertEqual(counters['transitions'], len(text) - 1)
+            self.assertEqual(counters['matches'], 4)
+            self.assertEqual(counters['finalHits'], 3)
+            self.assertEqual(sum(profiler.get_heatmap().values()), len(text) - 1)
+            self.assertEqual(sum(profiler.get_latencies().values()), 1)
+            self.assertEqual(profiler.detach().get_counters()['calls'], 1)
+            d.det_search(text)
+            self.assertEqual(profiler.get_counters()['calls'], 1)
+        profiler = SearchProfiler(build_dma_complete(words))
+        profiler.det_search(text)
+        self.assertEqual(profiler.get_counters()['otherFallbacks'], 1)
+        self.assertEqual(profiler.get_counters()['defaultFallbacks'], 0)
+        profiler = SearchProfiler(build_dma_default(words))
+        profiler.det_search(text)
+        self.assertEqual(profiler.get_counters()['defaultFallbacks'], 1)
+        self.assertEqual(profiler.get_counters()['otherFallbacks'], 0)
+        self.assertEqual(profiler.reset().get_counters()['letters'], 0)
+
+    def test_search_paths(self):
+        words = ['ab', 'babb', 'bb']
+        text = 'babba xab'
+        for d in (build_dma_default(words), freeze(build_dma_default(words))):
+            profiler = SearchProfiler(d)
+            self.assertEqual(list(d.iter_search(['babba', ' xab'])), d.det_search(text))
+            self.assertEqual(profiler.get_counters()['calls'], 3)
+            self.assertTrue(d.contains_any(text))
+            d.count_matches(text)
+            d.search(text, LEFTMOST_LONGEST)
+            counters = profiler.get_counters()
+            self.assertEqual(counters['calls'], 6)
+            # contains_any stops at the first match, after 3 letters
+            self.assertEqual(counters['letters'], 4 * (len(text) - 1) + 3)
+            self.assertEqual(counters['finalHits'], 4 * 3 + 1)
+            if numpy is not None:
+                self.assertEqual(batch_search(d, [text, 'bb']), [d.det_search(text), d.det_search('bb')])
+                self.assertEqual(profiler.get_counters()['calls'], 10)
+
+    def test_dump_json(self):
+        profiler = SearchProfiler(build_dma_default(['ab']))
+        profiler.det_search('abab')
+        fd, jsonFileName = tempfile.mkstemp(suffix='.json')
+        os.close(fd)
+        try:
+            profiler.dump_json(jsonFileName)
+            with open(jsonFileName) as jsonFile:
+                d = json.load(jsonFile)
+        finally:
+            os.remove(jsonFileName)
+        self.assertEqual(d['counters']['matches'], 2)
+        self.assertEqual(d['heatmap'], {'1': 2, '2': 2})
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+from unittest import TestCase
+
+from automaton.bitparallel import ShiftAndMatcher
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.frozen import freeze
+from automaton.semantics import ALL
+from automaton.semantics import LEFTMOST_FIRST
+from automaton.semantics import LEFTMOST_LONGEST
+from automaton.semantics import NON_OVERLAPPING
+
+
+def leftmost(matches, key):
+    # reference implementation on the list of all the matches
+    resolved = []
+    end = 0
+    while True:
+        candidates = [match for match in matches if match[1] >= end]
+        if len(candidates) == 0:
+            return resolved
+        start = min(match[1] for match in candidates)
+        best = min((match for match in candidates if match[1] == start), key=key)
+        resolved.append(best)
+        end = best[2]
+
+
+def non_overlapping(matches):
+    resolved = []
+    end = 0
+    for position in sorted(set(match[2] for match in matches)):
+        candidates = [match for match in matches if match[2] == position and match[1] >= end]
+        if len(candidates) != 0:
+            resolved.append(min(candidates, key=lambda match: match[1]))
+            end = position
+    return resolved
+
+
+class SearchSemanticsTestCase(TestCase):
+    def test_examples(self):
+        d = build_dma_complete(['abcd', 'b', 'bcd', 'bc'])
+        self.assertEqual(d.search('abcde'), [('b', 1, 2), ('bc', 1, 3), ('abcd', 0, 4), ('bcd', 1, 4)])
+        self.assertEqual(d.search('abcde', ALL), d.det_search('abcde'))
+        self.assertEqual(d.search('abcde', NON_OVERLAPPING), [('b', 1, 2)])
+        self.assertEqual(d.search('abcde', LEFTMOST_LONGEST), [('abcd', 0, 4)])
+        self.assertEqual(d.search('xbcde', LEFTMOST_LONGEST), [('bcd', 1, 4)])
+        self.assertEqual(d.search('xbcde', LEFTMOST_FIRST), [('b', 1, 2)])
+        d = build_dma_complete(['bc', 'b', 'bcd'])
+        self.assertEqual(d.search('xbcde', LEFTMOST_FIRST), [('bc', 1, 3)])
+        self.assertRaises(ValueError, d.search, 'abc', 'longest')
+
+    def test_same_results_as_reference(self):
+        random.seed(5)
+        for _ in range(20):
+            words = list(set(''.join(random.choice('abc') for _ in range(random.randint(1, 5))) for _ in range(8)))
+            ranks = dict((word, i) for i, word in enumerate(words))
+            text = ''.join(random.choice('abcd') for _ in range(60))
+            for d in (build_dma_complete(words), build_dma_default(words), build_dma_failure(words),
+                      freeze(build_dma_default(words)), ShiftAndMatcher(words)):
+                matches = d.det_search(text)
+                expected = {NON_OVERLAPPING: non_overlapping(matches),
+                            LEFTMOST_LONGEST: leftmost(matches, lambda match: -match[2]),
+                            LEFTMOST_FIRST: leftmost(matches, lambda match: ranks[match[0]])}
+                for semantics, resolved in expected.items():
+                    self.assertEqual(d.search(text, semantics), resolved)
+                    chunks = [text[i:i + 7] for i in range(0, len(text), 7)]
+                    self.assertEqual(list(d.iter_search(chunks, semantics=semantics)), resolved)
+
+    def test_iter_search_emits_early(self):
+        d = build_dma_complete(['abcd', 'bc', 'e'])
+        for m in (d, freeze(d), ShiftAndMatcher(['abcd', 'bc', 'e'])):
+            chunks = []
+
+            def source():
+                for chunk in ('xabc', 'x', 'abc', 'd'):
+                    chunks.append(chunk)
+                    yield chunk
+
+            results = m.iter_search(source(), semantics=LEFTMOST_LONGEST)
+            # abcd can still start before bc at the end of xabc, not any more at the end of x
+            self.assertEqual(next(results), ('bc', 2, 4))
+            self.assertEqual(chunks, ['xabc', 'x'])
+            self.assertEqual(list(results), [('abcd', 5, 9)])
+            results = m.iter_search(iter(['xbcx', 'abc']), semantics=NON_OVERLAPPING)
+            self.assertEqual(next(results), ('bc', 1, 3))
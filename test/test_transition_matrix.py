@@ -1,10 +1,20 @@
 # -*- coding: utf-8 -*-
 # @author <lambda.coder@gmail.com>
 
+import random
+import tracemalloc
 from unittest import TestCase
 
+from automaton.automaton import CompactMutableAutomaton
+from automaton.automaton import CompactMutableAutomatonWithFailureLinks
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_failure
+from automaton.transition_matrix import CompactTransitionMatrix
+from automaton.transition_matrix import LetterClassTransitionMatrix
+from automaton.transition_matrix import MAX_SORTED_TRANSITIONS
 from automaton.transition_matrix import MutableTransitionMatrix
 from automaton.transition_matrix import MutableTransitionMatrixWithDefaultSuccessor
+from automaton.trie import build_trie
 
 
 class MutableTransitionMatrixTestCase(TestCase):
@@ -79,3 +89,85 @@ class MutableTransitionMatrixWithDefaultSuccessorTestCase(TestCase):
         self.assertEqual(tm.get_target_by_default(s0, 'a'), s1)
         self.assertEqual(tm.get_target(s0, 'b'), None)
         self.assertEqual(tm.get_target_by_default(s0, 'b'), s0)
+
+
+class CompactTransitionMatrixTestCase(TestCase):
+    def test_add_transition(self):
+        tm = CompactTransitionMatrix(0)
+        states = [tm.add_state() for _ in range(MAX_SORTED_TRANSITIONS + 1)]
+        self.assertEqual(states, list(range(1, MAX_SORTED_TRANSITIONS + 2)))
+        self.assertTrue(tm.has_state(states[-1]))
+        self.assertFalse(tm.has_state(len(states) + 1))
+        self.assertRaises(RuntimeError, tm.get_target, len(states) + 1, 'a')
+        self.assertEqual(tm.get_target(0, 'a'), None)
+        self.assertEqual(tm.get_transitions(0), {})
+        expected = {}
+        # the state goes through the inline, sorted and dict storages
+        for i, letter in enumerate('kbxadefghz'[:MAX_SORTED_TRANSITIONS + 1]):
+            tm.add_transition(0, letter, states[i])
+            expected[letter] = states[i]
+            self.assertEqual(tm.get_transitions(0), expected)
+            for letter in 'kbxadefghzc':
+                self.assertEqual(tm.get_target(0, letter), expected.get(letter, None))
+        tm.add_transition(1, 'a', 2).add_transition(1, 'a', 3)
+        self.assertEqual(tm.get_target(1, 'a'), 3)
+        self.assertEqual(tm.get_num_transitions(), MAX_SORTED_TRANSITIONS + 2)
+        self.assertEqual(tm.to_dict()[1], {'a': 3})
+        self.assertEqual(tm.get_letters(), sorted(expected))
+
+    def test_automaton(self):
+        words = ['ab', 'babb', 'bb', 'été']
+        text = 'babba un été abbb'
+        d = build_dma_failure(words, fst_factory=CompactMutableAutomatonWithFailureLinks)
+        self.assertEqual(d.det_search(text), build_dma_failure(words).det_search(text))
+        self.assertIsInstance(d.transitionMatrix_, CompactTransitionMatrix)
+
+    def test_memory(self):
+        rng = random.Random(7)
+        words = [''.join(rng.choice('abcdefghij') for _ in range(rng.randint(5, 15))) for _ in range(2000)]
+        trie = build_trie(words, fst_factory=CompactMutableAutomaton)
+        transitions = [(state, letter, target) for state in trie.get_states()
+                       for letter, target in trie.get_transitions(state).items()]
+
+        def measure(factory):
+            tracemalloc.start()
+            tm = factory(0)
+            for _ in range(trie.get_num_states() - 1):
+                tm.add_state()
+            for source, letter, target in transitions:
+                tm.add_transition(source, letter, target)
+            size = tracemalloc.get_traced_memory()[0]
+            tracemalloc.stop()
+            self.assertEqual(tm.to_dict(), trie.transitionMatrix_.to_dict())
+            return size
+
+        self.assertLess(4 * measure(CompactTransitionMatrix), measure(MutableTransitionMatrix))
+
+
+class LetterClassTransitionMatrixTestCase(TestCase):
+    def test_add_transition(self):
+        # 'c' and 'd' share the class 0
+        tm = LetterClassTransitionMatrix(0, {'a': 1, 'b': 2, 'c': 0, 'd': 0}, 3)
+        s1 = tm.add_state()
+        tm.add_transition(0, 'a', s1).add_transition(s1, 'b', 0)
+        self.assertEqual(tm.get_width(), 3)
+        self.assertEqual(tm.get_target(0, 'a'), s1)
+        self.assertIsNone(tm.get_target(0, 'b'))
+        # a letter of a shared class gets its own class, a new letter too
+        tm.add_transition(0, 'c', 0).add_transition(s1, 'e', s1)
+        self.assertEqual(tm.get_width(), 5)
+        self.assertIsNone(tm.get_target(0, 'd'))
+        self.assertEqual(tm.to_dict(), {0: {'a': s1, 'c': 0}, s1: {'b': 0, 'e': s1}})
+        self.assertEqual(tm.get_num_transitions(), 4)
+        self.assertEqual(tm.get_letters(), ['a', 'b', 'c', 'e'])
+        self.assertRaises(RuntimeError, tm.get_target, 2, 'a')
+
+    def test_automaton(self):
+        words = ['ab', 'babb', 'bb']
+        d = build_dma_complete(words, letters='abcd')
+        tm = d.transitionMatrix_
+        self.assertIsInstance(tm, LetterClassTransitionMatrix)
+        # 'c' and 'd' are stored once per state, in the class of the letters outside the alphabet
+        self.assertEqual(tm.get_width(), 3)
+        self.assertEqual(tm.get_num_transitions(), 4 * d.get_num_states())
+        self.assertEqual(tm.get_letter_counts(), dict((letter, d.get_num_states()) for letter in 'abcd'))
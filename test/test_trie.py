@@ -1,9 +1,20 @@
 # -*- coding: utf-8 -*-
 # @author <lambda.coder@gmail.com>
 
+import subprocess
+import sys
 from unittest import TestCase
 
+from automaton.automaton import AutomatonException
+from automaton.automaton import CompactMutableAutomaton
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.patterns import PatternTable
 from automaton.trie import build_trie
+from automaton.trie import build_trie_parallel
+from automaton.trie import count_prefixes_
+from automaton.trie import partition_words_
 
 
 class BuildTrieTestCase(TestCase):
@@ -60,3 +71,44 @@ class BuildTrieTestCase(TestCase):
         self.assertFalse(t.accept('b'))
         self.assertTrue(t.accept('aa'))
         self.assertTrue(t.accept('ab'))
+
+
+class BuildTrieParallelTestCase(TestCase):
+    def test_partition(self):
+        self.assertEqual(partition_words_(['ab', 'b', '', 'ac', 'c'], 2),
+                         [[(0, 'ab'), (3, 'ac')], [(1, 'b'), (4, 'c')]])
+        self.assertEqual(count_prefixes_([(0, 'ab'), (3, 'ac'), (5, 'a'), (6, 'ab')]), 3)
+
+    def test_sequential(self):
+        words = ['ab', 'babb', 'bb']
+        self.assertEqual(build_trie_parallel(words).to_dict(), build_trie(words).to_dict())
+
+    def test_equivalent(self):
+        words = ['ab', 'babb', 'bb', 'a', 'été', 'ab', '', 'cab']
+        t = build_trie(words)
+        p = build_trie(words, workers=2)
+        self.assertEqual(p.get_stats(), t.get_stats())
+        self.assertEqual(p.get_states(), t.get_states())
+        self.assertEqual(build_trie(words, fst_factory=CompactMutableAutomaton, workers=2).to_dict(), p.to_dict())
+        self.assertEqual(p.transitionMatrix_.get_letter_counts(), t.transitionMatrix_.get_letter_counts())
+        for word in words + ['b', 'ba', 'abc']:
+            self.assertEqual(p.accept(word), t.accept(word))
+        self.assertEqual([p.get_output_rank(word) for word in words], [t.get_output_rank(word) for word in words])
+        text = 'xbabbab un été cabab'
+        for builder in (build_dma_complete, build_dma_default, build_dma_failure):
+            self.assertEqual(builder(words, workers=2).det_search(text), builder(words).det_search(text))
+        self.assertEqual(build_dma_complete(words, encoding='utf-8', workers=3).det_search(text.encode('utf-8')),
+                         build_dma_complete(words, encoding='utf-8').det_search(text.encode('utf-8')))
+        patterns = PatternTable(words)
+        self.assertEqual(build_dma_complete(patterns, workers=2).det_search(text),
+                         build_dma_complete(patterns).det_search(text))
+
+    def test_errors(self):
+        # the exception of a process is raised again in the parent process
+        self.assertRaises(TypeError, build_trie_parallel, ['ab', 'b', ('c', ['d'])], workers=2)
+        self.assertRaises(AutomatonException, build_trie, ['ab'], workers=2, weights=[1])
+
+    def test_lazy_import(self):
+        # multiprocessing is only imported by the parallel build
+        code = 'import sys, automaton.dma; print("multiprocessing" in sys.modules)'
+        self.assertEqual(subprocess.check_output([sys.executable, '-c', code]).strip(), b'False')
@@ -0,0 +1,40 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+from unittest import TestCase
+from unittest import skipIf
+
+from automaton.automaton import MutableAutomaton
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.frozen import freeze
+from automaton.vectorized import batch_search
+from automaton.vectorized import numpy
+
+
+@skipIf(numpy is None, 'numpy is not installed')
+class BatchSearchTestCase(TestCase):
+    def test_same_results_as_det_search(self):
+        random.seed(3)
+        words = ['ab', 'babb', 'bb', 'été']
+        texts = ['', 'babba', 'x', 'un été bab'] + \
+                [''.join(random.choice('abé tx') for _ in range(random.randint(0, 30))) for _ in range(50)]
+        for d in (build_dma_complete(words), build_dma_default(words)):
+            self.assertEqual(batch_search(d, texts), [d.det_search(text) for text in texts])
+            self.assertEqual(batch_search(freeze(d), texts), [d.det_search(text) for text in texts])
+        self.assertEqual(batch_search(build_dma_complete(words), []), [])
+
+    def test_bytes(self):
+        d = freeze(build_dma_complete(['été', 'ab'], encoding='utf-8'))
+        texts = [text.encode('utf-8') for text in ('un été', 'abab', '', 'ét')]
+        self.assertEqual(batch_search(d, texts), [d.det_search(text) for text in texts])
+
+    def test_stopped_scan(self):
+        f = MutableAutomaton()
+        s0 = f.get_initial_state()
+        s1 = f.add_state()
+        s2 = f.add_state()
+        f.add_transition(s0, 'a', s1).add_transition(s1, 'a', s2).set_final_state(s2).add_output(s2, 'aa')
+        texts = ['aa', 'aaa', 'a aa']
+        self.assertEqual(batch_search(f, texts), [f.det_search(text) for text in texts])
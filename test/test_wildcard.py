@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# @author <lambda.coder@gmail.com>
+
+import random
+import re
+from unittest import TestCase
+
+from automaton.automaton import AutomatonException
+from automaton.dma import build_dma_complete
+from automaton.dma import build_dma_default
+from automaton.dma import build_dma_failure
+from automaton.semantics import LEFTMOST_FIRST
+from automaton.trie import build_trie
+from automaton.wildcard import build_wildcard_matcher
+from automaton.wildcard import expand_pattern
+from automaton.wildcard import parse_pattern
+from automaton.wildcard import to_regex
+
+
+def find_all(patterns, text):
+    # overlapping matches of the variants of the patterns computed with re
+    return sorted(set((pattern, m.start(), m.end(1)) for pattern in patterns for variant in expand_pattern(pattern)
+                      for m in re.finditer('(?=(%s))' % to_regex(variant), text)))
+
+
+class WildcardTestCase(TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_pattern('ab?d'), ['a', 'b', (1, 1), 'd'])
+        self.assertEqual(parse_pattern('f?{0,2}b?{3}'), ['f', (0, 2), 'b', (3, 3)])
+        self.assertEqual(parse_pattern('a.b', wildcard='.'), ['a', (1, 1), 'b'])
+        self.assertRaises(ValueError, parse_pattern, 'a?{3,1}b')
+        self.assertEqual(expand_pattern('foo?{0,2}bar'), ['foobar', 'foo?bar', 'foo??bar'])
+        self.assertEqual(expand_pattern('?{0,1}'), ['?'])
+        self.assertEqual(to_regex('a.?{0,2}b?'), r'a\..{0,2}b.')
+        # escaped wildcard
+        self.assertEqual(parse_pattern(r'a\?b\\'), ['a', '?', 'b', '\\'])
+        self.assertEqual(expand_pattern(r'a\??'), [r'a\??'])
+        self.assertEqual(to_regex(r'a\??'), r'a\?.')
+        self.assertRaises(ValueError, parse_pattern, 'ab\\')
+
+    def test_search(self):
+        patterns = ['ab?d', 'foo?{0,3}bar', 'x?y', 'abcd']
+        d = build_wildcard_matcher(patterns)
+        text = 'abcd abzd foobar foo12bar fooxyzwbar xzy x€y'
+        # the outputs are the patterns
+        expected = [('ab?d', 0, 4), ('abcd', 0, 4), ('ab?d', 5, 9), ('foo?{0,3}bar', 10, 16),
+                    ('foo?{0,3}bar', 17, 25), ('x?y', 37, 40), ('x?y', 41, 44)]
+        self.assertEqual(d.det_search(text), expected)
+        for builder in (build_trie, build_dma_complete, build_dma_default, build_dma_failure):
+            self.assertRaises(AutomatonException, builder, patterns, wildcard='?')
+        self.assertEqual(d.search(text, LEFTMOST_FIRST)[:1], [('ab?d', 0, 4)])
+        self.assertEqual(list(d.iter_search(text, chunk_size=3)), expected)
+        self.assertEqual(d.count_matches(text)['foo?{0,3}bar'], 2)
+        self.assertTrue(d.contains_any('xxy'))
+        self.assertFalse(d.contains_any('xy'))
+        # several variants of a pattern may end at the same position
+        self.assertEqual(d.det_search('foofoobar'), [('foo?{0,3}bar', 0, 9), ('foo?{0,3}bar', 3, 9)])
+        # a literal wildcard
+        self.assertEqual(build_wildcard_matcher([r'a\?b']).det_search('a?b axb'), [(r'a\?b', 0, 3)])
+        # a wildcard matches a single byte of the encoded text
+        e = build_wildcard_matcher(patterns, encoding='utf-8')
+        self.assertEqual(e.det_search(text.encode('utf-8')), [(output.encode('utf-8'), start, end)
+                                                              for output, start, end in expected[:-1]])
+        self.assertEqual(build_wildcard_matcher(patterns, letters='abdfor').det_search(text),
+                         [('ab?d', 0, 4), ('ab?d', 5, 9), ('foo?{0,3}bar', 10, 16), ('foo?{0,3}bar', 17, 25)])
+
+    def test_random(self):
+        rng = random.Random(3)
+        for _ in range(20):
+            patterns = [''.join(rng.choice('ab??') for _ in range(rng.randint(1, 4))) + rng.choice(['', '?{0,2}a'])
+                        for _ in range(3)]
+            text = ''.join(rng.choice('abc') for _ in range(40))
+            d = build_wildcard_matcher(patterns)
+            self.assertEqual(sorted(d.det_search(text)), find_all(patterns, text))
+
+    def test_num_bits(self):
+        # the state has a bit per letter of the variants, whatever the gaps
+        patterns = ['a?{0,8}b', 'b?{0,8}a', 'ab?{2,6}ba?c']
+        d = build_wildcard_matcher(patterns)
+        self.assertEqual(d.get_num_bits(), sum(len(variant) for pattern in patterns
+                                               for variant in expand_pattern(pattern)))
+        text = ''.join(random.Random(5).choice('abc') for _ in range(2000))
+        self.assertEqual(sorted(d.det_search(text)), find_all(patterns, text))
+        self.assertRaises(AutomatonException, d.get_output_length_function)
+
+    def test_max_bits(self):
+        # the number of variants is the product of the widths of the gaps
+        pattern = 'a' + 'b?{0,7}' * 5 + 'c'
+        self.assertRaises(AutomatonException, build_wildcard_matcher, [pattern])
+        self.assertRaises(AutomatonException, build_wildcard_matcher, ['a?{0,8}b', 'b?{0,8}a'], max_bits=107)
+        d = build_wildcard_matcher(['a?{0,8}b', 'b?{0,8}a'], max_bits=108)
+        self.assertEqual(d.get_num_bits(), 108)